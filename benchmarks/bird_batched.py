@@ -0,0 +1,80 @@
+"""Compares the exploration time of a grid world with bird.build_bird and with bird.build_bird_batched.
+
+The model is the grid world of bird_exploration.py. With build_bird_batched, the delta function is written
+with numpy and is called once per level of the breadth first search instead of once per state-action pair.
+
+Run with: python benchmarks/bird_batched.py [largest number of states]
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+
+from stormvogel import bird
+from stormvogel.model import ModelType
+
+NAMES = ["up", "down", "left", "right"]
+MOVES = np.array([[0, 1], [0, -1], [-1, 0], [1, 0]])
+
+
+def explore(width: int) -> float:
+    """Builds the grid world with build_bird and returns the time."""
+
+    def delta(s: bird.State, action: bird.Action):
+        dx, dy = MOVES[NAMES.index(action[0])].tolist()
+        x = min(max(s.x + dx, 0), width - 1)
+        y = min(max(s.y + dy, 0), width - 1)
+        return [(0.9, bird.State(x=x, y=y)), (0.1, s)]
+
+    start = time.perf_counter()
+    bird.build_bird(
+        delta=delta,
+        init=bird.State(x=0, y=0),
+        available_actions=lambda s: [[name] for name in NAMES],
+        modeltype=ModelType.MDP,
+        max_size=width * width,
+    )
+    return time.perf_counter() - start
+
+
+def explore_batched(width: int) -> float:
+    """Builds the grid world with build_bird_batched and returns the time."""
+
+    def delta_batch(states: np.ndarray, action_ids: np.ndarray):
+        moved = np.clip(states + MOVES[action_ids], 0, width - 1)
+        rows = np.arange(len(states))
+        return (
+            np.concatenate([rows, rows]),
+            np.concatenate([np.full(len(rows), 0.9), np.full(len(rows), 0.1)]),
+            np.concatenate([moved, states]),
+        )
+
+    start = time.perf_counter()
+    bird.build_bird_batched(
+        delta_batch,
+        init=[0, 0],
+        actions=[[name] for name in NAMES],
+        modeltype=ModelType.MDP,
+        max_size=width * width,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'states':>10} {'bird (s)':>10} {'batched (s)':>12} {'speedup':>8}")
+    nr_states = 1000
+    while nr_states <= largest:
+        width = math.isqrt(nr_states)
+        seconds = explore(width)
+        batched = explore_batched(width)
+        print(
+            f"{width * width:>10} {seconds:>10.3f} {batched:>12.3f} {seconds / batched:>8.2f}"
+        )
+        nr_states *= 10
+
+
+if __name__ == "__main__":
+    main()
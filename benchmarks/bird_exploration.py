@@ -0,0 +1,88 @@
+"""Measures how the exploration time of bird.build_bird scales with the number of states.
+
+The model is a grid world in which a robot moves in four directions and slips (stays in place) with probability 0.1.
+If the exploration is linear, the time per state stays roughly the same as the grid grows.
+The grid world is built without and with labels, rewards and valuations, and with the latter both with
+and without checking the values that the functions return (trusted).
+
+Run with: python benchmarks/bird_exploration.py [largest number of states]
+"""
+
+import math
+import sys
+import time
+
+from stormvogel import bird
+from stormvogel.model import ModelType
+
+MOVES = {"up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)}
+
+
+def grid_world(width: int):
+    """Returns the delta and available actions functions of a width x width grid world."""
+
+    def available_actions(s: bird.State) -> list[bird.Action]:
+        return [[name] for name in MOVES]
+
+    def delta(s: bird.State, action: bird.Action):
+        dx, dy = MOVES[action[0]]
+        x = min(max(s.x + dx, 0), width - 1)
+        y = min(max(s.y + dy, 0), width - 1)
+        return [(0.9, bird.State(x=x, y=y)), (0.1, s)]
+
+    return delta, available_actions
+
+
+def labels(s: bird.State) -> list[str]:
+    return ["corner"] if s.x == s.y == 0 else []
+
+
+def rewards(s: bird.State, a: bird.Action) -> dict[str, float]:
+    return {"steps": 1.0}
+
+
+def valuations(s: bird.State) -> dict[str, int]:
+    return {"x": s.x, "y": s.y}
+
+
+def explore(
+    nr_states: int, callbacks: bool = False, trusted: bool = False
+) -> tuple[int, float]:
+    """Builds a grid world with (about) the given number of states. Returns the number of states and the time."""
+    width = math.isqrt(nr_states)
+    delta, available_actions = grid_world(width)
+    start = time.perf_counter()
+    model = bird.build_bird(
+        delta=delta,
+        init=bird.State(x=0, y=0),
+        available_actions=available_actions,
+        labels=labels if callbacks else None,
+        rewards=rewards if callbacks else None,
+        valuations=valuations if callbacks else None,
+        modeltype=ModelType.MDP,
+        max_size=width * width,
+        trusted=trusted,
+    )
+    return len(model.states), time.perf_counter() - start
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(
+        f"{'states':>10} {'time (s)':>10} {'us/state':>10}"
+        f" {'+callbacks':>11} {'trusted':>10} (us/state)"
+    )
+    nr_states = 1000
+    while nr_states <= largest:
+        states, seconds = explore(nr_states)
+        _, checked = explore(nr_states, callbacks=True)
+        _, trusted = explore(nr_states, callbacks=True, trusted=True)
+        print(
+            f"{states:>10} {seconds:>10.3f} {1e6 * seconds / states:>10.2f}"
+            f" {1e6 * checked / states:>11.2f} {1e6 * trusted / states:>10.2f}"
+        )
+        nr_states *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures the speedup of exploring a bird model with several worker processes.
+
+The model is the grid world of bird_exploration.py, but the delta function does some extra work per call,
+like the deltas of models that simulate a physical system or solve a small problem per transition.
+
+Run with: python benchmarks/bird_parallel.py [number of states] [microseconds of work per delta call]
+"""
+
+import math
+import os
+import sys
+import time
+
+from stormvogel import bird
+from stormvogel.model import ModelType
+
+MOVES = {"up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)}
+
+
+def grid_world(width: int, work: float):
+    """Returns the delta and available actions functions of a width x width grid world
+    whose delta function keeps the cpu busy for the given number of seconds."""
+
+    def available_actions(s: bird.State) -> list[bird.Action]:
+        return [[name] for name in MOVES]
+
+    def delta(s: bird.State, action: bird.Action):
+        end = time.perf_counter() + work
+        while time.perf_counter() < end:
+            pass
+        dx, dy = MOVES[action[0]]
+        x = min(max(s.x + dx, 0), width - 1)
+        y = min(max(s.y + dy, 0), width - 1)
+        return [(0.9, bird.State(x=x, y=y)), (0.1, s)]
+
+    return delta, available_actions
+
+
+def explore(nr_states: int, work: float, workers: int) -> float:
+    """Builds the grid world with the given number of workers and returns the time."""
+    width = math.isqrt(nr_states)
+    delta, available_actions = grid_world(width, work)
+    start = time.perf_counter()
+    bird.build_bird(
+        delta=delta,
+        init=bird.State(x=0, y=0),
+        available_actions=available_actions,
+        modeltype=ModelType.MDP,
+        max_size=width * width,
+        workers=workers,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    nr_states = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    work = (float(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1e6
+    print(f"{'workers':>8} {'time (s)':>10} {'speedup':>8}")
+    baseline = explore(nr_states, work, 1)
+    print(f"{1:>8} {baseline:>10.3f} {1:>8.2f}")
+    workers = 2
+    while workers <= (os.cpu_count() or 1):
+        seconds = explore(nr_states, work, workers)
+        print(f"{workers:>8} {seconds:>10.3f} {baseline / seconds:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compares the number of state lookups per second for the kinds of states that bird models can use.
+
+The legacy state is the previous bird.State, which formatted its arguments to a string on every hash.
+Lookups are measured both for states that are created right before the lookup (as in delta functions)
+and for states that already exist (where the cached hash of bird.State is reused).
+
+Run with: python benchmarks/bird_state_hashing.py [number of states]
+"""
+
+import sys
+import time
+
+from stormvogel import bird
+
+
+class LegacyState:
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __hash__(self):
+        return hash(str(self.__dict__))
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyState):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+def fields(i: int) -> dict:
+    """The arguments of a moderately rich state, like a position with some status flags."""
+    return {
+        "x": i % 1000,
+        "y": i // 1000,
+        "fuel": i % 7,
+        "carrying": i % 3 == 0,
+        "mode": "explore",
+    }
+
+
+KINDS = {
+    "legacy": lambda i: LegacyState(**fields(i)),
+    "bird.State": lambda i: bird.State(**fields(i)),
+    "tuple": lambda i: tuple(fields(i).values()),
+    "int": lambda i: i,
+}
+
+
+def measure(make, n: int) -> tuple[float, float]:
+    """Returns the lookups per second of fresh and of existing states."""
+    table = {make(i): i for i in range(n)}
+
+    start = time.perf_counter()
+    for i in range(n):
+        table[make(i)]
+    fresh = n / (time.perf_counter() - start)
+
+    states = list(table)
+    start = time.perf_counter()
+    for _ in range(5):
+        for state in states:
+            table[state]
+    existing = 5 * n / (time.perf_counter() - start)
+    return fresh, existing
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'kind':>12} {'fresh lookups/s':>16} {'existing lookups/s':>19}")
+    for name, make in KINDS.items():
+        fresh, existing = measure(make, n)
+        print(f"{name:>12} {fresh:>16,.0f} {existing:>19,.0f}")
+
+
+if __name__ == "__main__":
+    main()
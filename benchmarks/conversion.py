@@ -0,0 +1,86 @@
+"""Compares building the stormpy transition matrix entry by entry (SparseMatrixBuilder.add_next_value,
+which is how stormvogel_to_stormpy used to work) with building it from numpy CSR arrays,
+and reports the time of the full conversion.
+
+Run with: python benchmarks/conversion.py [max_states]
+"""
+
+import random
+import sys
+import time
+
+import stormpy
+
+import stormvogel.model
+from stormvogel.native.compact import transition_arrays
+from stormvogel.stormpy_utils.mapping import (
+    sparse_matrix_from_csr,
+    stormvogel_to_stormpy,
+)
+
+
+def random_mdp(nr_states: int, nr_actions: int = 3, nr_successors: int = 4):
+    """Creates an MDP with random transitions. Every state has a valuation, as required by the conversion."""
+    rng = random.Random(42)
+    mdp = stormvogel.model.new_mdp(create_initial_state=False)
+    states = [mdp.new_state(valuations={"x": i}) for i in range(nr_states)]
+    actions = [mdp.new_action(f"a{i}") for i in range(nr_actions)]
+    for state in states:
+        choice = {}
+        for action in actions:
+            successors = rng.sample(states, nr_successors)
+            choice[action] = stormvogel.model.Branch(
+                [(1 / nr_successors, s) for s in successors]
+            )
+        state.set_choice(stormvogel.model.Choice(choice))
+    return mdp
+
+
+def entrywise_matrix(model: stormvogel.model.Model):
+    builder = stormpy.SparseMatrixBuilder(
+        rows=0,
+        columns=0,
+        entries=0,
+        force_dimensions=False,
+        has_custom_row_grouping=True,
+        row_groups=0,
+    )
+    row = 0
+    for state_id in model.states:
+        builder.new_row_group(row)
+        for _, branch in model.choices[state_id]:
+            for value, target in sorted(branch, key=lambda entry: entry[1].id):
+                builder.add_next_value(row=row, column=target.id, value=value)
+            row += 1
+    return builder.build()
+
+
+def csr_matrix(model: stormvogel.model.Model):
+    row_group_starts, row_starts, columns, values, _ = transition_arrays(model)
+    return sparse_matrix_from_csr(row_group_starts, row_starts, columns, values, True)
+
+
+def main(max_states: int):
+    print(
+        f"{'states':>10}{'entries':>12}{'entrywise':>12}{'csr':>12}{'conversion':>12}"
+    )
+    nr_states = 1000
+    while nr_states <= max_states:
+        mdp = random_mdp(nr_states)
+        timings = []
+        for build in [entrywise_matrix, csr_matrix]:
+            start = time.perf_counter()
+            matrix = build(mdp)
+            timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        stormvogel_to_stormpy(mdp, use_cache=False)
+        timings.append(time.perf_counter() - start)
+        print(
+            f"{nr_states:>10}{matrix.nr_entries:>12}"
+            + "".join(f"{t:>12.3f}" for t in timings)
+        )
+        nr_states *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16_000)
@@ -0,0 +1,93 @@
+"""Compares the iteration counts and wall times of the value iteration variants in stormvogel.native.
+
+The bundled examples are tiny, so they are scaled up by chaining copies of them:
+every transition into a target state of copy i is redirected to the initial state of copy i+1,
+and only the target states of the last copy are targets.
+In a backward chain the copies are linked the other way around (copy i leads to copy i-1), so the values flow
+from higher to lower state indices. gauss_seidel updates the states in index order and only profits in that case.
+
+Run with: python benchmarks/value_iteration.py [copies]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import stormvogel.examples as examples
+from stormvogel.native.compact import CompactModel, to_compact
+from stormvogel.native.iteration import iterate
+
+EXAMPLES = {
+    "die": (examples.create_die_dtmc, "rolled6"),
+    "lion": (examples.create_lion_mdp, "dead"),
+    "car": (examples.create_car_mdp, "accident"),
+    "study": (examples.create_study_mdp, "pass test"),
+    "monty_hall": (examples.create_monty_hall_mdp, "target"),
+}
+
+
+def chain(
+    compact: CompactModel, target: str, copies: int, backward: bool = False
+) -> tuple[CompactModel, np.ndarray]:
+    """Chain copies of a compact model. Returns the chained model and the target mask."""
+    n, rows, entries = compact.nr_states, compact.nr_rows, compact.nr_entries
+    is_target = compact.state_set(target)
+
+    state_offsets = np.repeat(np.arange(copies) * n, entries)
+    columns = np.tile(compact.columns, copies) + state_offsets
+    # redirect transitions into targets (except in the last copy) to the next initial state
+    step, last = (-n, 0) if backward else (n, copies - 1)
+    redirect = np.tile(is_target[compact.columns], copies)
+    redirect[last * entries : (last + 1) * entries] = False
+    columns[redirect] = state_offsets[redirect] + step + compact.initial_state
+
+    chained = CompactModel(
+        type=compact.type,
+        state_ids=np.arange(copies * n),
+        row_group_starts=np.append(
+            np.tile(compact.row_group_starts[:-1], copies)
+            + np.repeat(np.arange(copies) * rows, n),
+            copies * rows,
+        ),
+        row_starts=np.append(
+            np.tile(compact.row_starts[:-1], copies)
+            + np.repeat(np.arange(copies) * entries, rows),
+            copies * entries,
+        ),
+        columns=columns,
+        values=np.tile(compact.values, copies),
+        actions=compact.actions * copies,
+        labels={},
+        initial_state=(copies - 1 - last) * n + compact.initial_state,
+    )
+    targets = np.zeros(copies * n, dtype=bool)
+    targets[last * n : (last + 1) * n] = is_target
+    return chained, targets
+
+
+def main(copies: int):
+    print(
+        f"{'example':<12}{'chain':>10}{'states':>10}{'method':>14}{'iterations':>12}{'seconds':>10}"
+    )
+    for name, (create, target) in EXAMPLES.items():
+        for backward in [False, True]:
+            chained, targets = chain(to_compact(create()), target, copies, backward)
+            for method in ["jacobi", "gauss_seidel", "block_jacobi"]:
+                start = time.perf_counter()
+                _, iterations = iterate(
+                    chained,
+                    targets.astype(float),
+                    targets,
+                    method=method,
+                    epsilon=1e-6,
+                )
+                seconds = time.perf_counter() - start
+                direction = "backward" if backward else "forward"
+                print(
+                    f"{name:<12}{direction:>10}{chained.nr_states:>10}{method:>14}{iterations:>12}{seconds:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
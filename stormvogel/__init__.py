@@ -1,5 +1,13 @@
 """The stormvogel package"""
 
+import importlib.metadata
+
+try:
+    __version__ = importlib.metadata.version("stormvogel")
+except importlib.metadata.PackageNotFoundError:
+    # e.g., when running from a source checkout that is not installed
+    __version__ = "unknown"
+
 from stormvogel import layout  # NOQA
 from stormvogel.layout import Layout  # NOQA
 
@@ -13,7 +21,10 @@ from stormvogel.simulator import *  # NOQA
 from stormvogel import bird  # NOQA
 from stormvogel import examples  # NOQA
 from stormvogel import extensions  # NOQA
+from stormvogel import native  # NOQA
 from stormvogel import stormpy_utils  # NOQA
+from stormvogel import parallel  # NOQA
+from stormvogel import result_cache  # NOQA
 from stormvogel.visualization import JSVisualization  # NOQA
 from stormvogel.stormpy_utils.model_checking import *  # NOQA
 
@@ -1,29 +1,82 @@
 import stormvogel.model
-from dataclasses import dataclass
-from typing import cast, Any, Callable
+import stormvogel.native.compact
+from concurrent.futures import ProcessPoolExecutor
+from typing import cast, Any, Callable, NamedTuple
+import gc
 import inspect
+import multiprocessing
+import pickle
+import sys
+import threading
+
+import numpy as np
 
 
-@dataclass
 class State:
-    """bird state object. Can contain any number of any type of arguments"""
+    """bird state object. Can contain any number of any type of arguments.
+
+    States are immutable records: their hash is computed once when they are created,
+    which makes the lookups during the exploration cheap. Plain hashable values such as ints, strings
+    and tuples can also be used as states directly, which is even faster.
+    """
+
+    # the arguments are stored in __dict__, the hash in a slot so it is not part of the record
+    __slots__ = ("__dict__", "_hash")
 
     def __init__(self, **kwargs):
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        self.__dict__.update(kwargs)
+        object.__setattr__(self, "_hash", _hash_fields(kwargs))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("bird states are immutable, create a new state instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("bird states are immutable, create a new state instead")
+
+    def __reduce__(self):
+        # the hash is recomputed when unpickling, because string hashes differ between processes
+        return (_state_from_fields, (dict(self.__dict__),))
 
     def __repr__(self):
         return f"state({self.__dict__})"
 
     def __hash__(self):
-        return hash(str(self.__dict__))
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, State):
-            return self.__dict__ == other.__dict__
+            return self._hash == other._hash and self.__dict__ == other.__dict__
         return False
 
 
+def _freeze(value: Any) -> Any:
+    """Returns a hashable value that is equal for equal (possibly unhashable) values."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def _hash_fields(fields: dict[str, Any]) -> int:
+    """The hash of the arguments of a state, independent of their order."""
+    try:
+        return hash(frozenset(fields.items()))
+    except TypeError:
+        try:
+            return hash(frozenset((k, _freeze(v)) for k, v in fields.items()))
+        except TypeError:
+            return hash(repr(sorted(fields.items())))
+
+
+def _state_from_fields(fields: dict[str, Any]) -> State:
+    return State(**fields)
+
+
 type Action = list[str]
 
 
@@ -123,6 +176,291 @@ def valid_input(
             )
 
 
+class _Expansion(NamedTuple):
+    """Everything the callbacks of a bird model return for one state.
+
+    Args:
+        choices: For each action (None for models without actions), the transitions as (value, state) pairs,
+            or None if the state has a self loop.
+        rewards: For each action, the reward dictionary (or a single dictionary for models without actions).
+        labels: The labels of the state.
+        valuations: The valuations of the state.
+        observation: The observation of the state.
+        rate: The exit rate of the state.
+    """
+
+    choices: list[tuple[Action | None, list[tuple[Any, Any]] | None]]
+    rewards: (
+        list[dict[str, stormvogel.model.Value]]
+        | dict[str, stormvogel.model.Value]
+        | None
+    )
+    labels: list[str]
+    valuations: dict[str, float | int | bool] | None
+    observation: int | None
+    rate: stormvogel.model.Value | None
+
+
+class _Explorer:
+    """Evaluates all callbacks of a bird model on a state at once, when the state is expanded.
+    Unless trusted, the values that the callbacks return are checked. The reward names and the valuation variables
+    are taken from the first state that is expanded, and every other state must have the same ones."""
+
+    def __init__(
+        self,
+        delta: Callable[[Any, Action], Any] | Callable[[Any], Any],
+        rewards: Callable[[Any, Action], dict[str, stormvogel.model.Value]]
+        | Callable[[Any], dict[str, stormvogel.model.Value]]
+        | None,
+        labels: Callable[[Any], list[str] | str | None] | None,
+        available_actions: Callable[[Any], list[Action]] | None,
+        observations: Callable[[Any], int] | None,
+        rates: Callable[[Any], float] | None,
+        valuations: Callable[[Any], dict[str, float | int | bool]] | None,
+        supports_actions: bool,
+        trusted: bool,
+    ):
+        # the casts are done once, they are expensive when done for every call
+        self.action_delta = cast(Callable[[Any, Action], Any], delta)
+        self.state_delta = cast(Callable[[Any], Any], delta)
+        self.action_rewards = cast(
+            Callable[[Any, Action], dict[str, stormvogel.model.Value]] | None, rewards
+        )
+        self.state_rewards = cast(
+            Callable[[Any], dict[str, stormvogel.model.Value]] | None, rewards
+        )
+        self.labels = labels
+        self.available_actions = available_actions
+        self.observations = observations
+        self.rates = rates
+        self.valuations = valuations
+        self.supports_actions = supports_actions
+        self.trusted = trusted
+        self.reward_names: list[str] | None = None
+        self.variables: list[str] | None = None
+
+    def expand(self, state: Any) -> _Expansion:
+        """Calls all callbacks on the given state."""
+        if self.supports_actions:
+            assert self.available_actions is not None
+            actions = self.available_actions(state)
+            if not self.trusted:
+                if actions is None:
+                    raise ValueError(
+                        f"On input {state}, the available actions function does not have a return value"
+                    )
+                if not isinstance(actions, list):
+                    raise ValueError(
+                        f"On input {state}, the available actions function does not return a list. Make sure to change it to [{actions}]"
+                    )
+            choices = [
+                (action, self._branch(state, action, self.action_delta(state, action)))
+                for action in actions
+            ]
+            rewards = None
+            if self.action_rewards is not None:
+                rewards = []
+                for action, branch in choices:
+                    reward_dict = self.action_rewards(state, action)
+                    if not self.trusted:
+                        self._check_rewards(reward_dict, f"pair {state} {action}")
+                        if branch == []:
+                            raise RuntimeError(
+                                "This action is not available in this state"
+                            )
+                    rewards.append(reward_dict)
+        else:
+            choices = [(None, self._branch(state, None, self.state_delta(state)))]
+            rewards = None
+            if self.state_rewards is not None:
+                rewards = self.state_rewards(state)
+                if not self.trusted:
+                    self._check_rewards(rewards, str(state))
+
+        return _Expansion(
+            choices,
+            rewards,
+            [] if self.labels is None else self._labels(state),
+            None if self.valuations is None else self._valuations(state),
+            None if self.observations is None else self._observation(state),
+            None if self.rates is None else self._rate(state),
+        )
+
+    def _branch(
+        self, state: Any, action: Action | None, tuples: Any
+    ) -> list[tuple[Any, Any]] | None:
+        """Brings the transitions that delta returns into the form (value, state)."""
+        if tuples is None:
+            return None
+        if not isinstance(tuples, list):
+            if action is None:
+                raise ValueError(
+                    f"On input {state}, the delta function does not return a list. Make sure to change the format to [(<value>,<state>),...]"
+                )
+            raise ValueError(
+                f"On input pair {state} {action}, the delta function does not return a list. Make sure to change the format to [(<value>,<state>),...]"
+            )
+        branch = []
+        for tup in tuples:
+            # in case only a state is provided, we assume the probability is 1
+            if not isinstance(tup, tuple):
+                branch.append((1, tup))
+            elif len(tup) == 2:
+                branch.append((tup[0], tup[1]))
+            else:
+                raise ValueError(
+                    f"Invalid transition tuple {tup}. Expected (probability, state) or (state)."
+                )
+        return branch
+
+    def _check_rewards(self, reward_dict: Any, on_input: str):
+        # we check for the rewards when the function does not return a dict object
+        # or the length is not always the same
+        if reward_dict is None:
+            raise ValueError(
+                f"On input {on_input}, the rewards function does not have a return value"
+            )
+        if not isinstance(reward_dict, dict):
+            raise ValueError(
+                f"On input {on_input}, the rewards function does not return a dictionary. Make sure to change it to the format {{<rewardmodel>:<reward>,...}}"
+            )
+        if self.reward_names is None:
+            self.reward_names = list(reward_dict)
+        elif reward_dict.keys() != set(self.reward_names):
+            raise ValueError(
+                "Make sure that the rewards function returns a dictionary with the same keys on each return"
+            )
+
+    def _labels(self, state: Any) -> list[str]:
+        assert self.labels is not None
+        label_list = self.labels(state)
+
+        # if the labels function has no return value we assume this state simply has no labels
+        if label_list is None:
+            return []
+        # if we don't get a list, we assume there is just one label
+        if isinstance(label_list, str):
+            return [label_list]
+        # we check for the labels when the function does not return a list object, or when
+        # the list does not consist of strings
+        if not self.trusted and (
+            not isinstance(label_list, list)
+            or not all(isinstance(label, str) for label in label_list)
+        ):
+            raise ValueError(
+                f"On input {state}, the labels function does not return a string or a list of strings"
+            )
+        return label_list
+
+    def _valuations(self, state: Any) -> dict[str, float | int | bool]:
+        assert self.valuations is not None
+        valuation_dict = self.valuations(state)
+        if self.trusted:
+            return valuation_dict
+        if valuation_dict is None:
+            raise ValueError(
+                f"On input {state}, the valuations function does not have a return value"
+            )
+        if not isinstance(valuation_dict, dict):
+            raise ValueError(
+                f"On input {state}, the valuations function does not return a dictionary. Make sure to change the format to [<variable>: <value>,...]"
+            )
+        if self.variables is None:
+            self.variables = list(valuation_dict)
+        elif valuation_dict.keys() != set(self.variables):
+            raise RuntimeError(
+                "Make sure that you have a value for each variable in each state"
+            )
+        for val in valuation_dict.values():
+            if not isinstance(val, (int, bool, float)):
+                raise ValueError(
+                    f"On input {state}, the dictionary that the valuations function returns contains a value {val} which is not of type int, float or"
+                )
+        return valuation_dict
+
+    def _observation(self, state: Any) -> int:
+        assert self.observations is not None
+        o = self.observations(state)
+        if not self.trusted:
+            # we check for the observations when it does not return an integer
+            if o is None:
+                raise ValueError(
+                    f"On input {state}, the observations function does not have a return value"
+                )
+            if not isinstance(o, int):
+                raise ValueError(
+                    f"On input {state}, the observations function does not return an integer"
+                )
+        return o
+
+    def _rate(self, state: Any) -> stormvogel.model.Value:
+        assert self.rates is not None
+        r = self.rates(state)
+        if not self.trusted and not isinstance(r, stormvogel.model.Value):
+            raise ValueError(
+                f"On input {state}, the rates function does not return a number"
+            )
+        return r
+
+
+# the explorer of the build_bird call that uses worker processes, which inherit it when they are forked
+# (the callbacks are usually closures or lambdas, which cannot be sent to another process)
+_worker_explorer: _Explorer | None = None
+
+
+def _expand_in_worker(state: Any) -> _Expansion:
+    assert _worker_explorer is not None
+    return _worker_explorer.expand(state)
+
+
+def _init_worker(explorer: _Explorer):
+    global _worker_explorer
+    _worker_explorer = explorer
+
+
+def _start_workers(explorer: _Explorer, workers: int) -> ProcessPoolExecutor:
+    """Starts a pool of worker processes that expand states with the given explorer.
+    If the callbacks can be pickled, the explorer is sent to workers that are not forked. Otherwise (e.g., for
+    lambdas or functions defined in a notebook) the workers must be forked, which is unsafe on macOS and in
+    processes that run other threads (such as Jupyter kernels), so it is refused there."""
+    global _worker_explorer
+    try:
+        pickle.dumps(explorer)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        pass
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(explorer,),
+        )
+
+    if (
+        "fork" not in multiprocessing.get_all_start_methods()
+        or sys.platform == "darwin"
+    ):
+        raise RuntimeError(
+            "The functions of the model cannot be pickled, so exploring with several workers requires processes to be forked, which is not supported or unsafe on this platform. Define the functions at module level or use workers=1 instead."
+        )
+    if threading.active_count() > 1:
+        raise RuntimeError(
+            "The functions of the model cannot be pickled, so exploring with several workers requires processes to be forked, which can deadlock while other threads are running (e.g., in Jupyter). Define the functions at module level or use workers=1 instead."
+        )
+    _worker_explorer = explorer
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    )
+    # the workers are forked when the first states are submitted, so they get the explorer in its current state
+    executor.submit(int).result()
+    _worker_explorer = None
+    return executor
+
+
 def build_bird(
     delta: Callable[[Any, Action], Any] | Callable[[Any], Any],
     init: Any,
@@ -136,6 +474,8 @@ def build_bird(
     valuations: Callable[[Any], dict[str, float | int | bool]] | None = None,
     modeltype: stormvogel.model.ModelType = stormvogel.model.ModelType.MDP,
     max_size: int = 10000,
+    trusted: bool = False,
+    workers: int = 1,
 ) -> stormvogel.model.Model:
     """
     function that converts a delta function, an available_actions function an initial state and a model type
@@ -144,38 +484,19 @@ def build_bird(
     this works analogous to a prism file, where the delta is the module in this case.
 
     (this function uses the bird classes state and action instead of the ones from stormvogel.model)
-    """
 
-    def add_new_choices(tuples, state):
-        """
-        helper function to add all the newly found choices and states to the model
-        """
-        branch = []
-        if tuples is not None:
-            for tup in tuples:
-                # in case only a state is provided, we assume the probability is 1
-                if not isinstance(tup, tuple):
-                    s = tup
-                    val = 1
-                elif len(tup) == 2:
-                    s = tup[1]
-                    val = tup[0]
-                else:
-                    raise ValueError(
-                        f"Invalid transition tuple {tup}. Expected (probability, state) or (state)."
-                    )
+    All functions are called once per state (or state-action pair), when the state is explored.
+    If trusted is True, the values that the functions return are not checked, which saves time for large models.
 
-                if s not in state_lookup:
-                    new_state = model.new_state(id=len(model.get_states()))
-                    state_lookup[s] = new_state
-                    branch.append((val, new_state))
-                    states_to_be_visited.append(s)
-                else:
-                    branch.append((val, state_lookup[s]))
-        else:
-            # if we have no return value, we add a self loop
-            branch.append((1, state_lookup[state]))
-        return branch
+    If workers is larger than 1, the model is explored level by level (breadth first), and the states of each level
+    are expanded by that many worker processes. The states get the same ids as with a single worker.
+    The states, labels and rewards that the functions return must be picklable. If the functions themselves are
+    picklable (e.g., defined at module level), they are sent to the workers. Otherwise the workers are forked,
+    which is refused on macOS and while other threads are running (e.g., in Jupyter).
+    This pays off when the functions are expensive.
+    """
+    if workers < 1:
+        raise RuntimeError("The number of workers must be at least 1.")
 
     valid_input(
         delta,
@@ -191,253 +512,310 @@ def build_bird(
 
     # we create the model with the given type and initial state
     model = stormvogel.model.new_model(modeltype=modeltype, create_initial_state=False)
-    init_state = model.new_state(labels=["init"])
+    init_state = model.new_state(labels=["init"], id=0)
+    explorer = _Explorer(
+        delta,
+        rewards,
+        labels,
+        available_actions,
+        observations,
+        rates,
+        valuations,
+        model.supports_actions(),
+        trusted,
+    )
 
-    # we continue calling delta and adding new states until no states are
-    # left to be visited
-    states_to_be_visited = [init]
+    # the actions by their labels, so every action is created once
+    actions: dict[frozenset[str], stormvogel.model.Action] = {
+        frozenset(): stormvogel.model.EmptyAction
+    }
+
+    # the results of the other functions are collected per kind (in the order of the state ids)
+    # and added to the model at the end
+    reward_columns: dict[
+        str, dict[tuple[int, stormvogel.model.Action], stormvogel.model.Value]
+    ] = {}
+    label_column: list[list[str]] = []
+    valuation_column: list[dict[str, float | int | bool] | None] = []
+    observation_column: list[int | None] = []
+    rate_column: list[stormvogel.model.Value | None] = []
+
+    # we expand the model level by level (in the order of the state ids) until no states are left to be visited
+    frontier = [init]
     state_lookup = {init: init_state}
-    while len(states_to_be_visited) > 0:
-        state = states_to_be_visited.pop(0)
-        transition = {}
-
-        if model.supports_actions():
-            # we loop over all available actions and call the delta function for each actions
-            assert available_actions is not None
-            actionslist = available_actions(state)
-
-            if actionslist is None:
-                raise ValueError(
-                    f"On input {state}, the available actions function does not have a return value"
-                )
-
-            if not isinstance(actionslist, list):
-                raise ValueError(
-                    f"On input {state}, the available actions function does not return a list. Make sure to change it to [{actionslist}]"
+    executor = None
+    try:
+        while frontier:
+            if workers > 1 and len(frontier) > 1:
+                if executor is None:
+                    # the initial state has been expanded here, so the workers know the reward names and variables
+                    executor = _start_workers(explorer, workers)
+                expansions = executor.map(
+                    _expand_in_worker,
+                    frontier,
+                    chunksize=max(1, len(frontier) // (4 * workers)),
                 )
+            else:
+                expansions = map(explorer.expand, frontier)
 
-            for action in actionslist:
-                try:
-                    if action != []:
-                        stormvogel_action = model.new_action(
-                            frozenset(
-                                action  # type: ignore
-                            ),  # right now we only look at one label
-                        )
-                    else:
+            next_frontier = []
+            for state, expansion in zip(frontier, expansions):
+                s = state_lookup[state]
+                transition = {}
+                for index, (action, branch) in enumerate(expansion.choices):
+                    if action is None or action == []:
                         stormvogel_action = stormvogel.model.EmptyAction
-                except RuntimeError:
-                    if action != []:
-                        stormvogel_action = model.get_action_with_labels(
-                            frozenset(action)
-                        )
                     else:
-                        stormvogel_action = stormvogel.model.EmptyAction
-
-                delta = cast(Callable[[Any, action], Any], delta)
-                tuples = delta(state, action)
-
-                if not isinstance(tuples, list) and tuples is not None:
-                    raise ValueError(
-                        f"On input pair {state} {action}, the delta function does not return a list. Make sure to change the format to [(<value>,<state>),...]"
+                        labels_of_action = frozenset(action)
+                        stormvogel_action = actions.get(labels_of_action)
+                        if stormvogel_action is None:
+                            stormvogel_action = model.new_action(labels_of_action)
+                            actions[labels_of_action] = stormvogel_action
+
+                    if branch is None:
+                        # if we have no return value, we add a self loop
+                        targets = [(1, s)]
+                    else:
+                        targets = []
+                        for value, target in branch:
+                            new_state = state_lookup.get(target)
+                            if new_state is None:
+                                # states get consecutive ids in the order in which they are discovered
+                                new_state = model.new_state(id=len(state_lookup))
+                                state_lookup[target] = new_state
+                                next_frontier.append(target)
+                            targets.append((value, new_state))
+                    if targets == []:
+                        # an empty branch adds no transition (untrusted explorers refuse it), so it has no rewards
+                        continue
+                    transition[stormvogel_action] = stormvogel.model.Branch(targets)
+
+                    if expansion.rewards is not None:
+                        reward_dict = (
+                            expansion.rewards[index]
+                            if isinstance(expansion.rewards, list)
+                            else expansion.rewards
+                        )
+                        for name, value in reward_dict.items():
+                            reward_columns.setdefault(name, {})[
+                                s.id, stormvogel_action
+                            ] = value
+
+                model.add_choice(s, stormvogel.model.Choice(transition))
+                label_column.append(expansion.labels)
+                valuation_column.append(expansion.valuations)
+                observation_column.append(expansion.observation)
+                rate_column.append(expansion.rate)
+
+                # if at some point we discovered more than max_size states, we complain
+                if len(state_lookup) > max_size:
+                    raise RuntimeError(
+                        f"The model you want te create has a very large amount of states (at least {max_size}), if you wish to proceed, set max_size to some larger number."
                     )
+            frontier = next_frontier
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # we add the collected columns to the model
+    for name, column in reward_columns.items():
+        model.new_reward_model(name).rewards = column
+    for s, state_labels, valuation, observation, rate in zip(
+        model.states.values(),
+        label_column,
+        valuation_column,
+        observation_column,
+        rate_column,
+    ):
+        for label in state_labels:
+            if label not in s.labels:
+                s.labels.append(label)
+        if valuation is not None:
+            s.valuations = valuation
+        if observation is not None:
+            s.set_observation(observation)
+        if rate is not None:
+            model.set_rate(s, rate)
 
-                branch = add_new_choices(tuples, state)
+    return model
 
-                if branch != []:
-                    transition[stormvogel_action] = stormvogel.model.Branch(branch)
-        else:
-            delta = cast(Callable[[Any], Any], delta)
-            tuples = delta(state)
 
-            if not isinstance(tuples, list) and tuples is not None:
-                raise ValueError(
-                    f"On input {state}, the delta function does not return a list. Make sure to change the format to [(<value>,<state>),...]"
-                )
+def _pack(states: np.ndarray) -> np.ndarray:
+    """Packs each row of encoded states into a single (byte string) value, so rows can be compared at once."""
+    states = np.ascontiguousarray(states)
+    return states.view(
+        np.dtype((np.void, states.dtype.itemsize * states.shape[1]))
+    ).ravel()
 
-            branch = add_new_choices(tuples, state)
 
-            if branch != []:
-                transition[stormvogel.model.EmptyAction] = stormvogel.model.Branch(
-                    branch
+def build_bird_batched(
+    delta_batch: Callable[
+        [np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]
+    ],
+    init: np.ndarray | list[int] | int,
+    actions: list[Action] | None = None,
+    labels: Callable[[np.ndarray], dict[str, np.ndarray]] | None = None,
+    rewards: Callable[[np.ndarray, np.ndarray], dict[str, np.ndarray]] | None = None,
+    variables: list[str] | None = None,
+    modeltype: stormvogel.model.ModelType = stormvogel.model.ModelType.MDP,
+    max_size: int = 10000,
+) -> stormvogel.model.Model:
+    """
+    function that converts a batched delta function, an encoded initial state and a model type to a stormvogel model
+
+    Unlike build_bird, the functions are called on all states of a level (breadth first) at once,
+    so they can be written with numpy. States are encoded as a fixed number of integers.
+
+    Args:
+        delta_batch: Gets an (n, k) array of encoded states and an array of n action ids (the positions in actions),
+            and returns the arrays sources, probabilities and targets of the transitions: for each transition,
+            the row of the state-action pair it belongs to, its probability, and its target state (an (m, k) array).
+            State-action pairs without transitions are not available, and states without any transitions get a self loop.
+        init: The encoding of the initial state.
+        actions: The actions of the model (for models with actions).
+        labels: Gets an (n, k) array of encoded states and returns for each label a boolean array
+            that tells which states have it.
+        rewards: Gets the same arguments as delta_batch and returns for each reward model an array with
+            the reward of each state-action pair.
+        variables: If given, the states get valuations with these names for the k integers of their encoding.
+        modeltype: The model type, a DTMC or an MDP.
+        max_size: The maximal number of states.
+
+    The states get the same ids as with build_bird for a delta that returns the transitions of each state
+    in the same order.
+    """
+    if modeltype not in (
+        stormvogel.model.ModelType.DTMC,
+        stormvogel.model.ModelType.MDP,
+    ):
+        raise RuntimeError("Batched bird models can only be DTMCs or MDPs.")
+    if modeltype == stormvogel.model.ModelType.MDP:
+        if not actions:
+            raise RuntimeError("You have to provide the actions of an MDP.")
+        model_actions = [
+            stormvogel.model.Action.create(frozenset(action)) for action in actions
+        ]
+    else:
+        if actions is not None:
+            raise RuntimeError("A DTMC does not have actions.")
+        model_actions = [stormvogel.model.EmptyAction]
+    nr_actions = len(model_actions)
+
+    frontier = np.atleast_2d(np.asarray(init, dtype=np.int64))
+    if frontier.shape[0] != 1:
+        raise RuntimeError("The initial state must be a single encoded state.")
+    width = frontier.shape[1]
+    if variables is not None and len(variables) != width:
+        raise RuntimeError(
+            f"There are {len(variables)} variables, but the states are encoded with {width} integers."
+        )
+
+    # the ids of the states by their packed encoding
+    lookup = {_pack(frontier)[0].tobytes(): 0}
+    encodings = [frontier]
+    label_indices: dict[str, list[np.ndarray]] = {"init": [np.array([0])]}
+    reward_columns: dict[str, list[np.ndarray]] = {}
+    row_counts = []
+    entry_counts = []
+    row_actions = []
+    columns = []
+    probabilities = []
+
+    # the states of a level have consecutive ids, starting at first
+    first = 0
+    while len(frontier) > 0:
+        n = len(frontier)
+        if labels is not None:
+            for label, mask in labels(frontier).items():
+                label_indices.setdefault(label, []).append(
+                    first + np.flatnonzero(np.asarray(mask, dtype=bool))
                 )
 
-        s = state_lookup[state]
-        assert s is not None
-        model.add_choice(
-            s,
-            stormvogel.model.Choice(transition),
+        # every state is paired with every action, in the order of the states
+        pair_states = np.repeat(frontier, nr_actions, axis=0)
+        pair_actions = np.tile(np.arange(nr_actions, dtype=np.int64), n)
+        sources, values, targets = delta_batch(pair_states, pair_actions)
+        sources = np.asarray(sources, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.int64).reshape(len(sources), width)
+
+        # the transitions are grouped by pair, keeping the order of the transitions of a pair
+        order = np.argsort(sources, kind="stable")
+        sources, values, targets = sources[order], values[order], targets[order]
+
+        # the new targets get ids in the order in which they appear
+        packed, first_occurrence, inverse = np.unique(
+            _pack(targets), return_index=True, return_inverse=True
         )
-
-        # if at some point we discovered more than max_size states, we complain
-        if len(list(state_lookup)) > max_size:
+        discovery = np.argsort(first_occurrence)
+        ids = np.empty(len(packed), dtype=np.int64)
+        next_id = len(lookup)
+        new = []
+        for i, key in zip(discovery.tolist(), packed[discovery].tolist()):
+            state_id = lookup.get(key)
+            if state_id is None:
+                state_id = lookup[key] = next_id
+                next_id += 1
+                new.append(i)
+            ids[i] = state_id
+        if next_id > max_size:
             raise RuntimeError(
                 f"The model you want te create has a very large amount of states (at least {max_size}), if you wish to proceed, set max_size to some larger number."
             )
 
-    # we add the rewards
-    if rewards is not None:
-        if model.supports_actions():
-            # we first create the right number of reward models
-            assert available_actions is not None
-            rewards = cast(
-                Callable[[Any, Action], dict[str, stormvogel.model.Value]], rewards
-            )
-            for reward in rewards(init, available_actions(init)[0]).items():
-                model.new_reward_model(reward[0])
-
-            # we take the initial state reward to compare later
-            action = available_actions(init)[0]
-            initial_state_rewards = rewards(init, action)
-
-            for state, s in state_lookup.items():
-                assert available_actions is not None
-                for action in available_actions(state):
-                    rewarddict = rewards(state, action)
-
-                    # we check for the rewards when the function does not return a dict object
-                    # or the length is not always the same
-                    if rewarddict is None:
-                        raise ValueError(
-                            f"On input pair {state} {action}, the rewards function does not have a return value"
-                        )
-
-                    if not isinstance(rewarddict, dict):
-                        raise ValueError(
-                            f"On input pair {state} {action}, the rewards function does not return a dictionary. Make sure to change it to the format {{<rewardmodel>:<reward>,...}}"
-                        )
-                    if rewarddict.keys() != initial_state_rewards.keys():
-                        raise ValueError(
-                            "Make sure that the rewards function returns a dictionary with the same keys on each return"
-                        )
-
-                    assert s is not None
-                    for index, reward in enumerate(rewarddict.items()):
-                        a = model.get_action_with_labels(frozenset(action))
-                        assert a is not None
-                        model.rewards[index].set_state_action_reward(
-                            s,
-                            a,
-                            reward[1],
-                        )
-        else:
-            # we first create the right number of reward models
-            rewards = cast(Callable[[Any], dict[str, stormvogel.model.Value]], rewards)
-            for reward in rewards(init).items():
-                model.new_reward_model(reward[0])
-
-            initial_state_rewards = rewards(init)
-            for state, s in state_lookup.items():
-                rewarddict = rewards(state)
-
-                # we check for the rewards when the function does not return a dict object
-                # or the length is not always the same
-                if rewarddict is None:
-                    raise ValueError(
-                        f"On input {state}, the rewards function does not have a return value"
-                    )
-
-                if not isinstance(rewarddict, dict):
-                    raise ValueError(
-                        f"On input {state}, the rewards function does not return a dictionary. Make sure to change it to the format {{<rewardmodel name>:<reward>,...}}"
-                    )
-                if rewarddict.keys() != initial_state_rewards.keys():
-                    raise ValueError(
-                        "Make sure that the rewards function returns a dictionary with the same keys on each return"
-                    )
-
-                s = state_lookup[state]
-                assert s is not None
-                for index, reward in enumerate(rewarddict.items()):
-                    model.rewards[index].set_state_reward(s, reward[1])
-
-    # we add the observations
-    if observations is not None:
-        for state, s in state_lookup.items():
-            # we check for the observations when it does not return an integer
-            o = observations(state)
-            if o is None:
-                raise ValueError(
-                    f"On input {state}, the observations function does not have a return value"
-                )
-
-            if not isinstance(o, int):
-                raise ValueError(
-                    f"On input {state}, the observations function does not return an integer"
-                )
-
-            s.set_observation(o)
-
-    # we add the exit rates
-    if rates is not None:
-        for state, s in state_lookup.items():
-            r = rates(state)
-            if not isinstance(r, stormvogel.model.Value):
-                raise ValueError(
-                    f"On input {state}, the rates function does not return a number"
+        # only the pairs with transitions become rows
+        rows, row_sizes = np.unique(sources, return_counts=True)
+        row_counts.append(np.bincount(rows // nr_actions, minlength=n))
+        entry_counts.append(row_sizes)
+        row_actions.append(rows % nr_actions)
+        columns.append(ids[inverse.ravel()])
+        probabilities.append(values)
+        if rewards is not None:
+            for name, vector in rewards(pair_states, pair_actions).items():
+                reward_columns.setdefault(name, []).append(
+                    np.asarray(vector, dtype=np.float64)[rows]
                 )
-            model.set_rate(s, r)
 
-    # we add the valuations
-    if valuations is not None:
-        initial_state_valuations = valuations(init)
-        for state, s in state_lookup.items():
-            valuation_list = valuations(state)
-            if valuation_list is None:
-                raise ValueError(
-                    f"On input {state}, the valuations function does not have a return value"
-                )
-
-            if not isinstance(valuation_list, dict):
-                raise ValueError(
-                    f"On input {state}, the valuations function does not return a dictionary. Make sure to change the format to [<variable>: <value>,...]"
-                )
-
-            if valuation_list.keys() != initial_state_valuations.keys():
-                raise RuntimeError(
-                    "Make sure that you have a value for each variable in each state"
-                )
-
-            for val in valuation_list.values():
-                if not (
-                    isinstance(val, int)
-                    or isinstance(val, bool)
-                    or isinstance(val, float)
-                ):
-                    raise ValueError(
-                        f"On input {state}, the dictionary that the valuations function returns contains a value {val} which is not of type int, float or"
-                    )
-
-            s.valuations = valuation_list
-
-    # we add the labels
-    if labels is not None:
-        for state, s in state_lookup.items():
-            labellist = labels(state)
-
-            assert s is not None
-
-            # if the labels function has no return value we assume this state simply has no labels
-            if labellist is None:
-                continue
-
-            # we check for the labels when the function does not return a list object, or when
-            # the list does not consist of strings
-            if not isinstance(labellist, list):
-                if not isinstance(labellist, str):
-                    raise ValueError(
-                        f"On input {state}, the labels function does not return a string or a list of strings"
-                    )
-                # if we don't get a list, we assume there is just one label
-                if labellist not in s.labels:
-                    s.add_label(labellist)
-            else:
-                for label in labellist:
-                    if not isinstance(label, str):
-                        raise ValueError(
-                            f"On input {state}, the labels function does not return a string or a list of strings"
-                        )
-                    if label not in s.labels:
-                        s.add_label(label)
-
-    return model
+        first += n
+        frontier = packed[new].view(np.int64).reshape(len(new), width)
+        encodings.append(frontier)
+
+    nr_states = len(lookup)
+    row_group_starts = np.zeros(nr_states + 1, dtype=np.int64)
+    np.cumsum(np.concatenate(row_counts), out=row_group_starts[1:])
+    entries = np.concatenate(entry_counts)
+    row_starts = np.zeros(len(entries) + 1, dtype=np.int64)
+    np.cumsum(entries, out=row_starts[1:])
+
+    compact = stormvogel.native.compact.CompactModel(
+        type=modeltype,
+        state_ids=np.arange(nr_states, dtype=np.int64),
+        row_group_starts=row_group_starts,
+        row_starts=row_starts,
+        columns=np.concatenate(columns),
+        values=np.concatenate(probabilities),
+        actions=[model_actions[a] for a in np.concatenate(row_actions).tolist()],
+        labels={
+            label: np.concatenate(indices) for label, indices in label_indices.items()
+        },
+        initial_state=0,
+        rewards={
+            name: np.concatenate(column) for name, column in reward_columns.items()
+        },
+    )
+    valuations = None
+    if variables is not None:
+        valuations = [
+            dict(zip(variables, encoding))
+            for encoding in np.concatenate(encodings).tolist()
+        ]
+
+    # creating the model objects triggers many garbage collections, which take most of the time for large models
+    # but find nothing to free, since all objects belong to the model
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return stormvogel.native.compact.from_compact(compact, valuations)
+    finally:
+        if collecting:
+            gc.enable()
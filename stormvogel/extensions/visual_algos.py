@@ -2,13 +2,18 @@
 along with a function to display the workings of the algorithms."""
 
 from typing import Any
+import re
 import stormvogel.model
+import stormvogel.native as native
 import matplotlib.pyplot as plt
 from time import sleep
 
 
 def naive_value_iteration(
-    model: stormvogel.model.Model, epsilon: float, target_state: stormvogel.model.State
+    model: stormvogel.model.Model,
+    epsilon: float,
+    target_state: stormvogel.model.State,
+    method: str = "jacobi",
 ) -> list[list[stormvogel.model.Value]]:
     """Run naive value iteration. The result is a 2D list where result[n][m] is the probability to be in state m at step n.
 
@@ -16,12 +21,17 @@ def naive_value_iteration(
         model (stormvogel.model.Model): Target model.
         steps (int): Amount of steps.
         target_state (stormvogel.model.State): Target state of the model.
+        method (str): Either "jacobi" (every iteration computes new values from the previous iteration)
+            or "gauss_seidel" (values are updated in place in state order, which usually converges faster).
+            For large models, use stormvogel.native.value_iteration instead, which also offers "block_jacobi".
 
     Returns:
         list[list[float]]: The result is a 2D list where result[n][m] is the value of state m at iteration n.
     """
     if epsilon <= 0:
         RuntimeError("The algorithm will not terminate if epsilon is zero.")
+    if method not in ("jacobi", "gauss_seidel"):
+        raise RuntimeError(f"Unknown method {method}, use jacobi or gauss_seidel")
 
     # Create a dynamic matrix (list of lists) to store the result.
     values_matrix = [[0 for state in model.get_states()]]
@@ -31,18 +41,22 @@ def naive_value_iteration(
     while not terminate:
         old_values = values_matrix[len(values_matrix) - 1]
         new_values = [None for state in model.get_states()]
+        # with gauss_seidel we read the values of this iteration as soon as they are available
+        current_values = list(old_values) if method == "gauss_seidel" else old_values
         for sid, state in model:
             choices = model.get_choice(state)
             # Now we have to take a decision for an action.
             action_values = {}
             for action, branch in choices:
                 branch_value = sum(
-                    [prob * old_values[state.id] for (prob, state) in branch]  # type: ignore
+                    [prob * current_values[state.id] for (prob, state) in branch]  # type: ignore
                 )
                 action_values[action] = branch_value
             # We take the action with the highest value.
             highest_value = max(action_values.values())
             new_values[sid] = highest_value
+            if method == "gauss_seidel":
+                current_values[sid] = highest_value
         values_matrix.append(new_values)  # type: ignore
         terminate = (
             sum([abs(x - y) for (x, y) in zip(new_values, old_values)]) < epsilon  # type: ignore
@@ -61,27 +75,13 @@ def dtmc_evolution(model: stormvogel.model.Model, steps: int) -> list[list[float
         list[list[float]]: The result is a 2D list where result[n][m] is the probability to be in state m at step n.
     """
     if steps < 2:
-        RuntimeError("Need at least two steps")
+        raise RuntimeError("Need at least two steps")
     if model.type != stormvogel.model.ModelType.DTMC:
-        RuntimeError("Only works for DTMC")
-
-    # Create a matrix and set the value for the starting state to 1 on the first step.
-    matrix_steps_states = [[0.0 for s in model.get_states()] for x in range(steps)]
-    matrix_steps_states[0][model.get_initial_state().id] = 1
-
-    # Apply the updated values for each step.
-    for current_step in range(steps - 1):
-        next_step = current_step + 1
-        for s_id, s in model:
-            branch = model.get_branch(s)
-            for transition_prob, target in branch:
-                current_prob = matrix_steps_states[current_step][s_id]
-                assert isinstance(transition_prob, (int, float))
-                matrix_steps_states[next_step][target.id] += current_prob * float(
-                    transition_prob
-                )
+        raise RuntimeError("Only works for DTMC")
 
-    return matrix_steps_states
+    # propagate the distribution with vectorized vector-matrix products
+    compact = native.to_compact(model)
+    return [distribution.tolist() for distribution in native.evolve(compact, steps - 1)]
 
 
 def invert_2d_list(li: list[list[Any]]) -> list[list[Any]]:
@@ -124,6 +124,12 @@ def arg_max(funcs, args):
     return args[index]
 
 
+def reachability_label(prop: str) -> str | None:
+    """Returns the label of a reachability property of the form P=? [F "label"] (or Pmax=?), and None for other properties."""
+    match = re.fullmatch(r'\s*P(max)?\s*=\s*\?\s*\[\s*F\s*"([^"]+)"\s*\]\s*', prop)
+    return None if match is None else match.group(2)
+
+
 def policy_iteration(
     model: stormvogel.model.Model,
     prop: str,
@@ -133,6 +139,9 @@ def policy_iteration(
     clear: bool = True,
 ) -> stormvogel.Result:
     """Performs policy iteration on the given mdp.
+    Reachability properties of the form P=? [F "label"] are evaluated natively with a sparse linear solve
+    (see stormvogel.native.policies), so no conversion to stormpy is needed.
+    Other properties are model checked with stormpy on the induced DTMC of every scheduler.
     Args:
         model (Model): MDP.
         prop (str): PRISM property string to maximize. Rembember that this is a property on the induced DTMC, not the MDP.
@@ -141,6 +150,52 @@ def policy_iteration(
         delay (int): Seconds to wait between each iteration.
         clear (bool): Whether to clear the visualization of each previous iteration.
     """
+    label = reachability_label(prop)
+    if label is None:
+        return _model_checking_policy_iteration(
+            model, prop, visualize, layout, delay, clear
+        )
+    compact = native.to_compact(model)
+    targets = compact.state_set(label)
+
+    def to_result(values, rows) -> stormvogel.Result:
+        return stormvogel.Result(
+            model,
+            values,
+            native.rows_to_scheduler(model, compact, rows),
+        )
+
+    def show_iteration(values, rows):
+        if visualize:
+            result = to_result(values, rows)
+            vis = stormvogel.visualization.JSVisualization(
+                model, layout=layout, scheduler=result.scheduler, result=result
+            )
+            vis.show()
+            sleep(delay)
+            if clear:
+                vis.clear()
+
+    start = native.scheduler_to_rows(compact, stormvogel.random_scheduler(model))
+    values, rows, _ = native.iterate_policies(
+        compact, targets, rows=start, on_iteration=show_iteration
+    )
+    result = to_result(values, rows)
+    if visualize:
+        print("Value iteration done:")
+        stormvogel.show(model, layout=layout, scheduler=result.scheduler, result=result)
+    return result
+
+
+def _model_checking_policy_iteration(
+    model: stormvogel.model.Model,
+    prop: str,
+    visualize: bool,
+    layout: stormvogel.layout.Layout,
+    delay: int,
+    clear: bool,
+) -> stormvogel.Result:
+    """Policy iteration where every scheduler is evaluated by model checking its induced DTMC with stormpy."""
     old = None
     new = stormvogel.random_scheduler(model)
 
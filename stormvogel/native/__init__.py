@@ -0,0 +1,9 @@
+from stormvogel.native.compact import *  # NOQA
+from stormvogel.native.iteration import *  # NOQA
+from stormvogel.native.precomputation import *  # NOQA
+from stormvogel.native.policies import *  # NOQA
+from stormvogel.native.rewards import *  # NOQA
+from stormvogel.native.transient import *  # NOQA
+from stormvogel.native.ctmc import *  # NOQA
+from stormvogel.native.longrun import *  # NOQA
+from stormvogel.native.fundamental import *  # NOQA
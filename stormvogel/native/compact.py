@@ -0,0 +1,424 @@
+"""Contains the array-backed (CSR) representation of models that is used by the native solvers."""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import stormvogel.model
+
+
+@dataclass
+class CompactModel:
+    """Array-backed representation of the transition structure of a model.
+
+    Rows correspond to state-action pairs and are grouped per state (row groups).
+    States are numbered by their position in the model, i.e., the order in which they appear in model.states.
+    This is the same order that is used when converting to stormpy.
+
+    Args:
+        type: The model type.
+        state_ids: For each state index, the id of the corresponding stormvogel state.
+        row_group_starts: For each state index, the first row of that state, followed by the total number of rows.
+        row_starts: For each row, the first entry of that row, followed by the total number of entries.
+        columns: For each entry, the index of the target state.
+        values: For each entry, the probability (or rate) of the transition.
+        actions: For each row, the action that the row belongs to.
+        labels: For each label, the indices of the states that have it.
+        initial_state: The index of the initial state.
+        rewards: For each reward model, a dense reward vector with one entry per row.
+        exit_rates: For models with rates, the exit rate of each state.
+    """
+
+    type: stormvogel.model.ModelType
+    state_ids: np.ndarray
+    row_group_starts: np.ndarray
+    row_starts: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+    actions: list[stormvogel.model.Action]
+    labels: dict[str, np.ndarray]
+    initial_state: int
+    rewards: dict[str, np.ndarray] = field(default_factory=dict)
+    exit_rates: np.ndarray | None = None
+    _index: dict[int, int] | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def nr_states(self) -> int:
+        return len(self.state_ids)
+
+    @property
+    def nr_rows(self) -> int:
+        return len(self.row_starts) - 1
+
+    @property
+    def nr_entries(self) -> int:
+        return len(self.columns)
+
+    def index_of(self, state: stormvogel.model.State | int) -> int:
+        """Returns the index of a state (or state id) in the arrays of this compact model."""
+        if self._index is None:
+            self._index = {int(sid): i for i, sid in enumerate(self.state_ids)}
+        state_id = state.id if isinstance(state, stormvogel.model.State) else state
+        if state_id not in self._index:
+            raise RuntimeError("This state is not a part of the model")
+        return self._index[state_id]
+
+    def reward_vector(self, name: str | None = None) -> np.ndarray:
+        """Returns the (row-aligned) reward vector of the reward model with the given name.
+        If no name is given, the first reward model is used."""
+        if len(self.rewards) == 0:
+            raise RuntimeError("This model has no reward models.")
+        if name is None:
+            return next(iter(self.rewards.values()))
+        if name not in self.rewards:
+            raise RuntimeError(f"Reward model {name} not present in model.")
+        return self.rewards[name]
+
+    def row_states(self) -> np.ndarray:
+        """For each row, the index of the state it belongs to."""
+        return np.repeat(
+            np.arange(self.nr_states, dtype=np.int64), np.diff(self.row_group_starts)
+        )
+
+    def state_set(
+        self,
+        states: str
+        | stormvogel.model.State
+        | int
+        | list[stormvogel.model.State]
+        | list[int]
+        | set[int],
+    ) -> np.ndarray:
+        """Returns a boolean mask over the state indices.
+        The states can be given as a label, a state, a state id or a collection of states or state ids."""
+        mask = np.zeros(self.nr_states, dtype=bool)
+        if isinstance(states, str):
+            if states in self.labels:
+                mask[self.labels[states]] = True
+        elif isinstance(states, (stormvogel.model.State, int)):
+            mask[self.index_of(states)] = True
+        else:
+            for s in states:
+                mask[self.index_of(s)] = True
+        return mask
+
+    def multiply(self, x: np.ndarray) -> np.ndarray:
+        """For each row r, computes the sum over all entries (r, c) of value * x[c]."""
+        return segment_sum(self.values * x[self.columns], self.row_starts)
+
+    def reduce(self, row_values: np.ndarray, maximize: bool = True) -> np.ndarray:
+        """Takes the maximum (or minimum) of the row values within each row group."""
+        op = np.maximum if maximize else np.minimum
+        return op.reduceat(row_values, self.row_group_starts[:-1])
+
+    def best_rows(
+        self,
+        row_values: np.ndarray,
+        maximize: bool = True,
+        current: np.ndarray | None = None,
+        tolerance: float = 1e-12,
+    ) -> np.ndarray:
+        """For each state, returns the (first) row with the best value in its row group.
+        If current rows are given, a state only switches if another row is better by more than the tolerance."""
+        best = np.repeat(
+            self.reduce(row_values, maximize), np.diff(self.row_group_starts)
+        )
+        if maximize:
+            is_best = row_values >= best - tolerance
+        else:
+            is_best = row_values <= best + tolerance
+        candidates = np.where(is_best, np.arange(self.nr_rows), self.nr_rows)
+        rows = np.minimum.reduceat(candidates, self.row_group_starts[:-1])
+        if current is not None:
+            rows = np.where(is_best[current], current, rows)
+        return rows
+
+    def induced(self, rows: np.ndarray) -> "CompactModel":
+        """Returns the compact Markov chain that is obtained by selecting one row per state."""
+        counts = self.row_starts[rows + 1] - self.row_starts[rows]
+        row_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        entries = np.repeat(
+            self.row_starts[rows] - row_starts[:-1], counts
+        ) + np.arange(row_starts[-1])
+        return CompactModel(
+            type=self._induced_type(),
+            state_ids=self.state_ids,
+            row_group_starts=np.arange(self.nr_states + 1, dtype=np.int64),
+            row_starts=row_starts,
+            columns=self.columns[entries],
+            values=self.values[entries],
+            actions=[stormvogel.model.EmptyAction] * self.nr_states,
+            labels=self.labels,
+            initial_state=self.initial_state,
+            rewards={name: vector[rows] for name, vector in self.rewards.items()},
+            exit_rates=self.exit_rates,
+        )
+
+    def induced_randomized(self, weights: np.ndarray) -> "CompactModel":
+        """Returns the compact Markov chain in which each state takes each of its rows with the given probability.
+        The weights are row-aligned and sum to one within each row group.
+        Entries of different rows with the same target are combined."""
+        n = self.nr_states
+        row_states = self.row_states()
+        entry_rows = np.repeat(np.arange(self.nr_rows), np.diff(self.row_starts))
+        entry_weights = weights[entry_rows]
+        taken = entry_weights > 0
+        keys = row_states[entry_rows[taken]] * n + self.columns[taken]
+        keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.bincount(
+            inverse,
+            weights=self.values[taken] * entry_weights[taken],
+            minlength=len(keys),
+        )
+        return CompactModel(
+            type=self._induced_type(),
+            state_ids=self.state_ids,
+            row_group_starts=np.arange(n + 1, dtype=np.int64),
+            row_starts=np.concatenate(
+                ([0], np.cumsum(np.bincount(keys // n, minlength=n)))
+            ).astype(np.int64),
+            columns=keys % n,
+            values=values,
+            actions=[stormvogel.model.EmptyAction] * n,
+            labels=self.labels,
+            initial_state=self.initial_state,
+            rewards={
+                name: np.bincount(row_states, weights=weights * vector, minlength=n)
+                for name, vector in self.rewards.items()
+            },
+            exit_rates=self.exit_rates,
+        )
+
+    def induced_memory(
+        self, rows: np.ndarray, updates: np.ndarray, initial_memory: int = 0
+    ) -> "CompactModel":
+        """Returns the compact Markov chain that is induced by a finite-memory scheduler.
+        Its states are the pairs of a memory state m and a state index i, which get the index m * nr_states + i.
+        All pairs are included, also the ones that cannot be reached.
+
+        Args:
+            rows: For each memory state and state index, the chosen row.
+            updates: For each memory state and state index, the memory state after moving to that state.
+            initial_memory: The memory state in the initial state.
+        """
+        nr_memory, n = rows.shape
+        flat_rows = rows.reshape(-1)
+        counts = self.row_starts[flat_rows + 1] - self.row_starts[flat_rows]
+        row_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        entries = np.repeat(
+            self.row_starts[flat_rows] - row_starts[:-1], counts
+        ) + np.arange(row_starts[-1])
+        targets = self.columns[entries]
+        entry_memory = np.repeat(np.repeat(np.arange(nr_memory), n), counts)
+        copies = (np.arange(nr_memory)[:, None] * n).astype(np.int64)
+        initial_state = initial_memory * n + self.initial_state
+        labels = {
+            label: (copies + indices[None, :]).reshape(-1)
+            for label, indices in self.labels.items()
+            if label != "init"
+        }
+        if "init" in self.labels:
+            labels["init"] = np.array([initial_state], dtype=np.int64)
+        return CompactModel(
+            type=self._induced_type(),
+            state_ids=np.arange(nr_memory * n, dtype=np.int64),
+            row_group_starts=np.arange(nr_memory * n + 1, dtype=np.int64),
+            row_starts=row_starts,
+            columns=updates[entry_memory, targets] * n + targets,
+            values=self.values[entries],
+            actions=[stormvogel.model.EmptyAction] * (nr_memory * n),
+            labels=labels,
+            initial_state=int(initial_state),
+            rewards={name: vector[flat_rows] for name, vector in self.rewards.items()},
+            exit_rates=None
+            if self.exit_rates is None
+            else np.tile(self.exit_rates, nr_memory),
+        )
+
+    def _induced_type(self) -> stormvogel.model.ModelType:
+        """The type of the Markov chains that are induced by schedulers."""
+        if self.type == stormvogel.model.ModelType.MA:
+            return stormvogel.model.ModelType.CTMC
+        if self.type in (
+            stormvogel.model.ModelType.MDP,
+            stormvogel.model.ModelType.POMDP,
+        ):
+            return stormvogel.model.ModelType.DTMC
+        return self.type
+
+
+def segment_sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Sums consecutive segments of values. Segment i runs from starts[i] to starts[i+1].
+    Unlike np.add.reduceat, empty segments sum to zero."""
+    result = np.zeros(len(starts) - 1, dtype=values.dtype)
+    if len(values) == 0:
+        return result
+    non_empty = starts[1:] > starts[:-1]
+    result[non_empty] = np.add.reduceat(values, starts[:-1][non_empty])
+    return result
+
+
+def transition_arrays(
+    model: stormvogel.model.Model,
+) -> tuple[
+    np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[stormvogel.model.Action]
+]:
+    """Collects the transitions of a (non-parametric, non-interval) model in CSR form.
+    The states are in the order of model.states and the rows of each state in the order of its actions.
+    The model itself is not changed.
+
+    Returns:
+        row_group_starts, row_starts, columns, values, actions (see CompactModel).
+    """
+    index = {state_id: i for i, state_id in enumerate(model.states)}
+    row_group_starts = [0]
+    row_starts = [0]
+    columns = []
+    values = []
+    actions = []
+    for state_id in model.states:
+        choice = model.choices.get(state_id)
+        if choice is None or len(choice.transition) == 0:
+            raise RuntimeError(
+                "This model has states with no outgoing choices.\nUse the add_self_loops() function to add self loops to all states with no outgoing transition."
+            )
+        for action, branch in choice:
+            for value, target in branch:
+                columns.append(index[target.id])
+                values.append(value)
+            row_starts.append(len(columns))
+            actions.append(action)
+        row_group_starts.append(len(actions))
+    return (
+        np.array(row_group_starts, dtype=np.int64),
+        np.array(row_starts, dtype=np.int64),
+        np.array(columns, dtype=np.int64),
+        np.array(values, dtype=np.float64),
+        actions,
+    )
+
+
+def to_compact(model: stormvogel.model.Model) -> CompactModel:
+    """Creates the compact representation of a model. The model itself is not changed."""
+    if model.is_parametric() or model.is_interval_model():
+        raise RuntimeError(
+            "The native solvers do not support parametric or interval models."
+        )
+
+    state_ids = list(model.states.keys())
+    index = {state_id: i for i, state_id in enumerate(state_ids)}
+    row_group_starts, row_starts, columns, values, actions = transition_arrays(model)
+
+    labels: dict[str, list[int]] = {}
+    for i, state in enumerate(model.states.values()):
+        for label in state.labels:
+            labels.setdefault(label, []).append(i)
+
+    # rewards that are not set are zero
+    row_keys = [
+        (state_id, action)
+        for state_id, action in zip(
+            np.repeat(state_ids, np.diff(row_group_starts)).tolist(), actions
+        )
+    ]
+    rewards = {
+        reward_model.name: np.array(
+            [reward_model.rewards.get(key, 0) for key in row_keys], dtype=np.float64
+        )
+        for reward_model in model.rewards
+    }
+
+    # states without an exit rate leave with the sum of the rates of their first choice
+    exit_rates = None
+    if model.supports_rates():
+        assert model.exit_rates is not None
+        exit_rates = np.array(
+            [
+                model.exit_rates[state_id]
+                if state_id in model.exit_rates
+                else values[row_starts[r] : row_starts[r + 1]].sum()
+                for state_id, r in zip(state_ids, row_group_starts.tolist())
+            ],
+            dtype=np.float64,
+        )
+
+    return CompactModel(
+        type=model.get_type(),
+        state_ids=np.array(state_ids, dtype=np.int64),
+        row_group_starts=row_group_starts,
+        row_starts=row_starts,
+        columns=columns,
+        values=values,
+        actions=actions,
+        labels={
+            label: np.array(indices, dtype=np.int64)
+            for label, indices in labels.items()
+        },
+        initial_state=index[model.get_initial_state().id],
+        rewards=rewards,
+        exit_rates=exit_rates,
+    )
+
+
+def from_compact(
+    compact: CompactModel,
+    valuations: list[dict[str, int | float | bool]] | None = None,
+) -> stormvogel.model.Model:
+    """Creates a stormvogel model from a compact model. The states get the ids in compact.state_ids.
+    Like in stormvogel models, the initial state is the one with the init label.
+
+    Args:
+        compact: The compact model.
+        valuations: Optionally, the valuations of each state index.
+    """
+    model = stormvogel.model.new_model(compact.type, create_initial_state=False)
+    state_labels: list[list[str]] = [[] for _ in range(compact.nr_states)]
+    for label, indices in compact.labels.items():
+        for i in indices.tolist():
+            state_labels[i].append(label)
+
+    # the states are added directly, so we do not search for a free id every time
+    states = []
+    for i, state_id in enumerate(compact.state_ids.tolist()):
+        state = stormvogel.model.State(
+            state_labels[i],
+            {} if valuations is None else valuations[i],
+            state_id,
+            model,
+        )
+        model.states[state_id] = state
+        states.append(state)
+
+    row_group_starts = compact.row_group_starts.tolist()
+    row_starts = compact.row_starts.tolist()
+    columns = compact.columns.tolist()
+    values = compact.values.tolist()
+    for i, state in enumerate(states):
+        transition = {}
+        for r in range(row_group_starts[i], row_group_starts[i + 1]):
+            transition[compact.actions[r]] = stormvogel.model.Branch(
+                [
+                    (values[e], states[columns[e]])
+                    for e in range(row_starts[r], row_starts[r + 1])
+                ]
+            )
+        if transition:
+            model.choices[state.id] = stormvogel.model.Choice(transition)
+    if model.actions is not None:
+        model.actions.update(compact.actions)
+    model.add_self_loops()
+
+    row_keys = list(
+        zip(
+            np.repeat(compact.state_ids, np.diff(compact.row_group_starts)).tolist(),
+            compact.actions,
+        )
+    )
+    for name, vector in compact.rewards.items():
+        model.new_reward_model(name).rewards = dict(zip(row_keys, vector.tolist()))
+
+    if model.exit_rates is not None and compact.exit_rates is not None:
+        model.exit_rates = dict(
+            zip(compact.state_ids.tolist(), compact.exit_rates.tolist())
+        )
+    return model
@@ -0,0 +1,233 @@
+"""Transient analysis of CTMCs with uniformization, using Fox-Glynn truncation of the Poisson weights."""
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, segment_sum, to_compact
+
+
+def fox_glynn(rate: float, epsilon: float = 1e-10) -> tuple[int, np.ndarray]:
+    """Computes the Poisson weights exp(-rate) rate^k / k! that cover all but epsilon of the probability mass.
+    As in the method of Fox and Glynn, the weights are computed from the mode outwards in scaled form (so they do not
+    underflow for large rates) and normalized at the end. The tails are cut off with geometric bounds.
+
+    Returns:
+        left, weights: weights[i] is the weight of k = left + i.
+    """
+    if rate < 0:
+        raise RuntimeError("The Poisson rate must be non-negative.")
+    if rate == 0:
+        return 0, np.array([1.0])
+
+    mode = int(rate)
+    tail = epsilon / 2
+    total = 1.0
+
+    right_weights = []
+    weight, k = 1.0, mode
+    while True:
+        ratio = rate / (k + 1)
+        weight *= ratio
+        k += 1
+        right_weights.append(weight)
+        total += weight
+        # the remaining weights decrease at least geometrically with this ratio
+        if ratio < 1 and weight * ratio / (1 - ratio) <= tail * total:
+            break
+
+    left_weights = []
+    weight, k = 1.0, mode
+    while k > 0:
+        ratio = k / rate
+        weight *= ratio
+        k -= 1
+        left_weights.append(weight)
+        total += weight
+        if ratio < 1 and weight * ratio / (1 - ratio) <= tail * total:
+            break
+
+    weights = np.array(left_weights[::-1] + [1.0] + right_weights)
+    return mode - len(left_weights), weights / weights.sum()
+
+
+def uniformize(
+    compact: CompactModel, rate: float | None = None
+) -> tuple[CompactModel, float]:
+    """Returns the uniformized DTMC of a compact CTMC, P = I + Q / rate, together with the uniformization rate.
+    The rate defaults to the largest exit rate. States with exit rate 0 are absorbing."""
+    if compact.type != stormvogel.model.ModelType.CTMC or compact.exit_rates is None:
+        raise RuntimeError("Uniformization only works for CTMCs.")
+    exit_rates = compact.exit_rates
+    if rate is None:
+        rate = float(exit_rates.max()) if exit_rates.max() > 0 else 1.0
+    if rate < exit_rates.max():
+        raise RuntimeError(
+            "The uniformization rate must be at least the largest exit rate."
+        )
+
+    n = compact.nr_states
+    entry_states = compact.row_states()[
+        np.repeat(np.arange(compact.nr_rows), np.diff(compact.row_starts))
+    ]
+    moving = exit_rates[entry_states] > 0
+    self_loops = (compact.columns == entry_states) & moving
+    off_diagonal = (compact.columns != entry_states) & moving
+    self_rates = segment_sum(
+        np.where(self_loops, compact.values, 0.0), compact.row_starts
+    )
+    diagonal = np.where(exit_rates > 0, 1 - (exit_rates - self_rates) / rate, 1.0)
+
+    rows = np.concatenate((entry_states[off_diagonal], np.arange(n)))
+    columns = np.concatenate((compact.columns[off_diagonal], np.arange(n)))
+    values = np.concatenate((compact.values[off_diagonal] / rate, diagonal))
+    order = np.argsort(rows, kind="stable")
+    return (
+        CompactModel(
+            type=stormvogel.model.ModelType.DTMC,
+            state_ids=compact.state_ids,
+            row_group_starts=np.arange(n + 1, dtype=np.int64),
+            row_starts=np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n)))),
+            columns=columns[order],
+            values=values[order],
+            actions=[stormvogel.model.EmptyAction] * n,
+            labels=compact.labels,
+            initial_state=compact.initial_state,
+        ),
+        rate,
+    )
+
+
+def _accumulate(
+    uniformized: CompactModel,
+    rate: float,
+    start: np.ndarray,
+    times: list[float],
+    epsilon: float,
+    forward: bool,
+    fixed: np.ndarray | None = None,
+) -> np.ndarray:
+    """Computes sum_k poisson(rate * t, k) v_k for every time t in a single pass over v_0 = start, v_1, ...
+    where v_{k+1} = v_k P (forward) or P v_k (backward). Entries in fixed are not updated."""
+    truncations = [fox_glynn(rate * t, epsilon) for t in times]
+    last = max(left + len(weights) for left, weights in truncations)
+
+    entry_states = np.repeat(uniformized.row_states(), np.diff(uniformized.row_starts))
+    result = np.zeros((len(times), uniformized.nr_states))
+    v = np.array(start, dtype=np.float64)
+    for k in range(last):
+        for i, (left, weights) in enumerate(truncations):
+            if left <= k < left + len(weights):
+                result[i] += weights[k - left] * v
+        if forward:
+            v = np.bincount(
+                uniformized.columns,
+                weights=uniformized.values * v[entry_states],
+                minlength=uniformized.nr_states,
+            )
+        else:
+            new = uniformized.multiply(v)
+            v = new if fixed is None else np.where(fixed, v, new)
+    if fixed is not None:
+        # the weights sum to 1 only up to rounding
+        result[:, fixed] = v[fixed]
+    return result
+
+
+def transient_distributions(
+    compact: CompactModel,
+    times: list[float],
+    initial: np.ndarray | None = None,
+    epsilon: float = 1e-10,
+) -> np.ndarray:
+    """Computes the distributions over the states of a compact CTMC at the given time points.
+    All time points share the same sequence of vector-matrix products.
+
+    Returns:
+        An array with one row (distribution) per time point.
+    """
+    uniformized, rate = uniformize(compact)
+    if initial is None:
+        initial = np.zeros(compact.nr_states, dtype=np.float64)
+        initial[compact.initial_state] = 1
+    return _accumulate(uniformized, rate, initial, times, epsilon, forward=True)
+
+
+def iterate_time_bounded_reachability(
+    compact: CompactModel,
+    targets: np.ndarray,
+    times: list[float],
+    epsilon: float = 1e-10,
+) -> np.ndarray:
+    """Computes the probability to reach the targets within each of the given time bounds in a compact CTMC.
+    All time bounds share the same sequence of matrix-vector products.
+
+    Returns:
+        An array with one row (the probability for each state) per time bound.
+    """
+    uniformized, rate = uniformize(compact)
+    return _accumulate(
+        uniformized,
+        rate,
+        targets.astype(np.float64),
+        times,
+        epsilon,
+        forward=False,
+        fixed=targets,
+    )
+
+
+def _check_ctmc(model: stormvogel.model.Model):
+    if model.get_type() != stormvogel.model.ModelType.CTMC:
+        raise RuntimeError("This only works for CTMCs.")
+
+
+@cached
+def time_bounded_reachability(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    time: float | list[float],
+    epsilon: float = 1e-10,
+) -> stormvogel.result.Result | list[stormvogel.result.Result]:
+    """Compute the probability to reach the target within the given time, i.e., P=? [F<=time target].
+
+    Args:
+        model: The model, a CTMC.
+        target: The target, either a label, a state or a list of states.
+        time: The time bound, or a list of time bounds that are computed in a single pass.
+        epsilon: The Poisson probability mass that may be truncated.
+
+    Returns:
+        The result, or a list with one result per time bound.
+    """
+    _check_ctmc(model)
+    compact = to_compact(model)
+    times = time if isinstance(time, list) else [time]
+    values = iterate_time_bounded_reachability(
+        compact, compact.state_set(target), times, epsilon
+    )
+    results = [stormvogel.result.Result(model, x) for x in values]
+    return results if isinstance(time, list) else results[0]
+
+
+@cached
+def transient_probabilities(
+    model: stormvogel.model.Model, time: float | list[float], epsilon: float = 1e-10
+) -> stormvogel.result.Result | list[stormvogel.result.Result]:
+    """Compute the probability to be in each state of a CTMC at the given time.
+
+    Args:
+        model: The model, a CTMC.
+        time: The time point, or a list of time points that are computed in a single pass.
+        epsilon: The Poisson probability mass that may be truncated.
+
+    Returns:
+        The result, or a list with one result per time point.
+    """
+    _check_ctmc(model)
+    compact = to_compact(model)
+    times = time if isinstance(time, list) else [time]
+    values = transient_distributions(compact, times, epsilon=epsilon)
+    results = [stormvogel.result.Result(model, x) for x in values]
+    return results if isinstance(time, list) else results[0]
@@ -0,0 +1,203 @@
+"""Fundamental-matrix analytics for DTMCs: expected visits, absorption probabilities and mean times to absorption."""
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, to_compact
+from stormvogel.native.longrun import bottom_components
+from stormvogel.native.precomputation import can_reach
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+
+class FundamentalMatrix:
+    """The fundamental matrix N = (I - Q)^-1 of a compact DTMC, where Q are the transitions between transient states.
+    The matrix I - Q is factorized once (sparse LU if scipy is available), after which every query is a cheap solve.
+    Without scipy, the solves are done iteratively.
+
+    Args:
+        chain: The compact DTMC.
+        absorbing: Boolean mask of the absorbing states. Defaults to the states in bottom strongly connected components.
+        epsilon: Convergence threshold of the iterative solves.
+        max_iterations: Upper bound on the number of iterations of the iterative solves.
+    """
+
+    def __init__(
+        self,
+        chain: CompactModel,
+        absorbing: np.ndarray | None = None,
+        epsilon: float = 1e-12,
+        max_iterations: int = 1_000_000,
+    ):
+        if chain.type != stormvogel.model.ModelType.DTMC:
+            raise RuntimeError("The fundamental matrix only exists for DTMCs.")
+        if absorbing is None:
+            absorbing = np.zeros(chain.nr_states, dtype=bool)
+            for states in bottom_components(chain):
+                absorbing[states] = True
+        if not can_reach(chain, absorbing).all():
+            raise RuntimeError(
+                "Some states cannot reach an absorbing state, so the fundamental matrix does not exist."
+            )
+        self.chain = chain
+        self.absorbing = absorbing
+        self.transient = ~absorbing
+        self.epsilon = epsilon
+        self.max_iterations = max_iterations
+        self.size = int(self.transient.sum())
+
+        # local numbering of the transient states
+        self.local = np.full(chain.nr_states, -1, dtype=np.int64)
+        self.local[self.transient] = np.arange(self.size)
+        self.entry_states = np.repeat(chain.row_states(), np.diff(chain.row_starts))
+        inner = self.transient[self.entry_states] & self.transient[chain.columns]
+        self.rows = self.local[self.entry_states[inner]]
+        self.columns = self.local[chain.columns[inner]]
+        self.values = chain.values[inner]
+
+        self.lu = None
+        if scipy is not None and self.size > 0:
+            q = scipy.sparse.csc_matrix(
+                (self.values, (self.rows, self.columns)), shape=(self.size, self.size)
+            )
+            self.lu = scipy.sparse.linalg.splu(
+                (scipy.sparse.identity(self.size, format="csc") - q).tocsc()
+            )
+
+    def _iterate(self, b: np.ndarray, transposed: bool) -> np.ndarray:
+        x = b.copy()
+        sources, targets = (
+            (self.columns, self.rows) if transposed else (self.rows, self.columns)
+        )
+        for _ in range(self.max_iterations):
+            new = b + np.bincount(
+                sources, weights=self.values * x[targets], minlength=self.size
+            )
+            diff = np.max(np.abs(new - x), initial=0.0)
+            x = new
+            if diff < self.epsilon:
+                return x
+            if np.isnan(diff):
+                raise RuntimeError("The iterative solve produced NaN values.")
+        raise RuntimeError(
+            f"The iterative solve did not converge within {self.max_iterations} iterations."
+        )
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """Computes N b for a vector b over the transient states."""
+        if self.lu is not None:
+            return self.lu.solve(b)
+        return self._iterate(b, transposed=False)
+
+    def solve_transposed(self, b: np.ndarray) -> np.ndarray:
+        """Computes b N for a vector b over the transient states."""
+        if self.lu is not None:
+            return self.lu.solve(b, trans="T")
+        return self._iterate(b, transposed=True)
+
+    def _expand(self, x: np.ndarray, absorbing_value: float | np.ndarray = 0.0):
+        result = np.zeros(self.chain.nr_states, dtype=np.float64)
+        result[self.absorbing] = absorbing_value
+        result[self.transient] = x
+        return result
+
+    def expected_visits(self, initial: np.ndarray | int) -> np.ndarray:
+        """Computes the expected number of visits to each state, starting from an initial distribution
+        or a state index. Absorbing states have no visits."""
+        if isinstance(initial, (int, np.integer)):
+            index = int(initial)
+            initial = np.zeros(self.chain.nr_states, dtype=np.float64)
+            initial[index] = 1
+        return self._expand(self.solve_transposed(initial[self.transient]))
+
+    def expected_visits_to(self, state: int) -> np.ndarray:
+        """Computes for each starting state the expected number of visits to the given (transient) state index."""
+        if not self.transient[state]:
+            raise RuntimeError("Expected visits are only defined for transient states.")
+        b = np.zeros(self.size, dtype=np.float64)
+        b[self.local[state]] = 1
+        return self._expand(self.solve(b))
+
+    def absorption_probabilities(self, targets: np.ndarray) -> np.ndarray:
+        """Computes for each state the probability to be absorbed in the given absorbing states."""
+        targets = targets & self.absorbing
+        into = self.transient[self.entry_states] & targets[self.chain.columns]
+        b = np.bincount(
+            self.local[self.entry_states[into]],
+            weights=self.chain.values[into],
+            minlength=self.size,
+        )
+        return self._expand(self.solve(b), targets[self.absorbing].astype(np.float64))
+
+    def mean_time_to_absorption(self) -> np.ndarray:
+        """Computes for each state the expected number of steps until an absorbing state is reached."""
+        return self._expand(self.solve(np.ones(self.size, dtype=np.float64)))
+
+
+def _fundamental(
+    model: stormvogel.model.Model,
+) -> tuple[CompactModel, FundamentalMatrix]:
+    compact = to_compact(model)
+    return compact, FundamentalMatrix(compact)
+
+
+@cached
+def expected_visits(
+    model: stormvogel.model.Model, state: stormvogel.model.State | None = None
+) -> stormvogel.result.Result:
+    """Compute the expected number of visits to each state of a DTMC before absorption in a bottom component.
+
+    Args:
+        model: The model, a DTMC.
+        state: The starting state. Defaults to the initial state.
+    """
+    compact, fundamental = _fundamental(model)
+    start = compact.initial_state if state is None else compact.index_of(state)
+    return stormvogel.result.Result(model, fundamental.expected_visits(start))
+
+
+@cached
+def absorption_probabilities(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+) -> stormvogel.result.Result:
+    """Compute for each state of a DTMC the probability to be absorbed in the target (a part of the bottom components).
+
+    Args:
+        model: The model, a DTMC.
+        target: The target, either a label, a state or a list of states.
+    """
+    compact, fundamental = _fundamental(model)
+    return stormvogel.result.Result(
+        model,
+        fundamental.absorption_probabilities(compact.state_set(target)),
+    )
+
+
+@cached
+def mean_time_to_absorption(model: stormvogel.model.Model) -> stormvogel.result.Result:
+    """Compute for each state of a DTMC the expected number of steps until a bottom component is reached."""
+    _, fundamental = _fundamental(model)
+    return stormvogel.result.Result(model, fundamental.mean_time_to_absorption())
+
+
+@cached
+def mean_first_passage(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+) -> stormvogel.result.Result:
+    """Compute for each state of a DTMC the expected number of steps until the target is reached for the first time.
+
+    Args:
+        model: The model, a DTMC.
+        target: The target, either a label, a state or a list of states.
+    """
+    compact = to_compact(model)
+    fundamental = FundamentalMatrix(compact, compact.state_set(target))
+    return stormvogel.result.Result(model, fundamental.mean_time_to_absorption())
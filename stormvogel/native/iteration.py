@@ -0,0 +1,250 @@
+"""Value iteration for reachability probabilities on the compact representation of a model."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, segment_sum, to_compact
+
+METHODS = ("jacobi", "gauss_seidel", "block_jacobi")
+
+
+def _jacobi(
+    compact: CompactModel,
+    x: np.ndarray,
+    fixed: np.ndarray,
+    offsets: np.ndarray,
+    maximize: bool,
+    epsilon: float,
+    max_iterations: int,
+) -> tuple[np.ndarray, int]:
+    """Every iteration computes a completely new vector from the previous one."""
+    iterations = 0
+    while iterations < max_iterations:
+        new = compact.reduce(offsets + compact.multiply(x), maximize)
+        new[fixed] = x[fixed]
+        iterations += 1
+        diff = np.max(np.abs(new - x), initial=0.0)
+        x = new
+        if diff < epsilon:
+            break
+    return x, iterations
+
+
+def _blocks(compact: CompactModel, nr_blocks: int) -> list[tuple[int, int]]:
+    """Partition the states into at most nr_blocks consecutive blocks with roughly the same number of entries."""
+    if nr_blocks >= compact.nr_states:
+        return [(s, s + 1) for s in range(compact.nr_states)]
+    entries_before_state = compact.row_starts[compact.row_group_starts]
+    bounds = np.searchsorted(
+        entries_before_state, np.linspace(0, compact.nr_entries, nr_blocks + 1)
+    )
+    bounds[0], bounds[-1] = 0, compact.nr_states
+    bounds = np.unique(bounds)
+    return [(int(b0), int(b1)) for b0, b1 in zip(bounds[:-1], bounds[1:])]
+
+
+# the default number of entries in a block of gauss_seidel, small enough to pass new values on quickly,
+# large enough that the numpy calls per block are not the bottleneck
+GAUSS_SEIDEL_BLOCK_ENTRIES = 4096
+# but there are always at least this many blocks (one per state in smaller models), otherwise it would be jacobi
+GAUSS_SEIDEL_MIN_BLOCKS = 256
+
+
+def _gauss_seidel(
+    compact: CompactModel,
+    x: np.ndarray,
+    fixed: np.ndarray,
+    offsets: np.ndarray,
+    maximize: bool,
+    epsilon: float,
+    max_iterations: int,
+    nr_blocks: int | None,
+) -> tuple[np.ndarray, int]:
+    """The states are partitioned into consecutive blocks that are updated in place and in state order,
+    so later blocks already use the new values of earlier blocks. The states within a block are updated at once,
+    which keeps the updates vectorized. With one state per block, this is classic Gauss-Seidel."""
+    if nr_blocks is None:
+        nr_blocks = max(
+            compact.nr_entries // GAUSS_SEIDEL_BLOCK_ENTRIES,
+            min(compact.nr_states, GAUSS_SEIDEL_MIN_BLOCKS),
+        )
+    blocks = _blocks(compact, nr_blocks)
+    op = np.maximum if maximize else np.minimum
+    rgs = compact.row_group_starts
+    rs = compact.row_starts
+
+    # the slices of the arrays that belong to each block
+    slices = []
+    for b0, b1 in blocks:
+        r0, r1 = rgs[b0], rgs[b1]
+        e0, e1 = rs[r0], rs[r1]
+        slices.append(
+            (
+                b0,
+                b1,
+                compact.values[e0:e1],
+                compact.columns[e0:e1],
+                offsets[r0:r1],
+                rs[r0 : r1 + 1] - e0,
+                rgs[b0:b1] - r0,
+                fixed[b0:b1],
+            )
+        )
+
+    x = x.copy()
+    iterations = 0
+    while iterations < max_iterations:
+        diff = 0.0
+        for b0, b1, values, columns, row_offsets, starts, groups, fixed_block in slices:
+            row_values = row_offsets + segment_sum(values * x[columns], starts)
+            new = op.reduceat(row_values, groups)
+            new[fixed_block] = x[b0:b1][fixed_block]
+            diff = max(diff, np.max(np.abs(new - x[b0:b1]), initial=0.0))
+            x[b0:b1] = new
+        iterations += 1
+        if diff < epsilon:
+            break
+    return x, iterations
+
+
+def _block_jacobi(
+    compact: CompactModel,
+    x: np.ndarray,
+    fixed: np.ndarray,
+    offsets: np.ndarray,
+    maximize: bool,
+    epsilon: float,
+    max_iterations: int,
+    workers: int | None,
+    nr_blocks: int | None,
+) -> tuple[np.ndarray, int]:
+    """The states are partitioned into blocks that are updated concurrently by a thread pool.
+    Every block reads the previous vector and writes its own slice of the new vector.
+    The numpy kernels release the GIL, so the blocks really run in parallel."""
+    workers = workers or os.cpu_count() or 1
+    blocks = _blocks(compact, nr_blocks or workers)
+    op = np.maximum if maximize else np.minimum
+    rgs = compact.row_group_starts
+    rs = compact.row_starts
+
+    def update(block: tuple[int, int], x: np.ndarray, new: np.ndarray):
+        b0, b1 = block
+        r0, r1 = rgs[b0], rgs[b1]
+        e0, e1 = rs[r0], rs[r1]
+        products = compact.values[e0:e1] * x[compact.columns[e0:e1]]
+        row_values = offsets[r0:r1] + segment_sum(products, rs[r0 : r1 + 1] - e0)
+        new[b0:b1] = op.reduceat(row_values, rgs[b0:b1] - r0)
+
+    iterations = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while iterations < max_iterations:
+            new = np.empty_like(x)
+            list(executor.map(lambda block: update(block, x, new), blocks))
+            new[fixed] = x[fixed]
+            iterations += 1
+            diff = np.max(np.abs(new - x), initial=0.0)
+            x = new
+            if diff < epsilon:
+                break
+    return x, iterations
+
+
+def iterate(
+    compact: CompactModel,
+    x: np.ndarray,
+    fixed: np.ndarray,
+    maximize: bool = True,
+    method: str = "jacobi",
+    offsets: np.ndarray | None = None,
+    epsilon: float = 1e-6,
+    max_iterations: int = 1_000_000,
+    workers: int | None = None,
+    nr_blocks: int | None = None,
+) -> tuple[np.ndarray, int]:
+    """Iterate x = max_a (offsets + P x) (or min_a) until the largest change is smaller than epsilon.
+    The values of fixed states are never changed.
+
+    Args:
+        compact: The compact model.
+        x: The starting vector (indexed by state index). It is not modified.
+        fixed: Boolean mask of states whose value stays fixed.
+        maximize: Whether we take the maximum or the minimum over the actions.
+        method: One of "jacobi", "gauss_seidel" or "block_jacobi".
+        offsets: Optional vector with one entry per row that is added in every iteration, e.g., rewards.
+        epsilon: Convergence threshold on the largest absolute change in one iteration.
+        max_iterations: Upper bound on the number of iterations.
+        workers: Number of threads used by block_jacobi. Defaults to the number of cpus.
+        nr_blocks: Number of blocks used by block_jacobi (defaults to the number of workers) and by gauss_seidel
+            (defaults to blocks of about GAUSS_SEIDEL_BLOCK_ENTRIES transitions, but at least
+            GAUSS_SEIDEL_MIN_BLOCKS blocks, so models with fewer states get one block per state).
+
+    Returns:
+        The final vector and the number of iterations that were performed.
+    """
+    if epsilon <= 0:
+        raise RuntimeError("The algorithm will not terminate if epsilon is zero.")
+    x = np.array(x, dtype=np.float64)
+    if offsets is None:
+        offsets = np.zeros(compact.nr_rows, dtype=np.float64)
+    if method == "jacobi":
+        return _jacobi(compact, x, fixed, offsets, maximize, epsilon, max_iterations)
+    elif method == "gauss_seidel":
+        return _gauss_seidel(
+            compact, x, fixed, offsets, maximize, epsilon, max_iterations, nr_blocks
+        )
+    elif method == "block_jacobi":
+        return _block_jacobi(
+            compact,
+            x,
+            fixed,
+            offsets,
+            maximize,
+            epsilon,
+            max_iterations,
+            workers,
+            nr_blocks,
+        )
+    raise RuntimeError(f"Unknown method {method}, choose one of {METHODS}")
+
+
+@cached
+def value_iteration(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    maximize: bool = True,
+    method: str = "jacobi",
+    epsilon: float = 1e-6,
+    workers: int | None = None,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) probability to reach the target from every state with value iteration.
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        target: The target, either a label, a state or a list of states.
+        maximize: Whether to compute maximal or minimal probabilities (only relevant for models with actions).
+        method: One of "jacobi", "gauss_seidel" or "block_jacobi".
+        epsilon: Convergence threshold on the largest absolute change in one iteration.
+        workers: Number of threads used by block_jacobi. Defaults to the number of cpus.
+    """
+    if model.get_type() not in (
+        stormvogel.model.ModelType.DTMC,
+        stormvogel.model.ModelType.MDP,
+    ):
+        raise RuntimeError("Value iteration only works for DTMCs and MDPs.")
+    compact = to_compact(model)
+    fixed = compact.state_set(target)
+    x, _ = iterate(
+        compact,
+        fixed.astype(np.float64),
+        fixed,
+        maximize=maximize,
+        method=method,
+        epsilon=epsilon,
+        workers=workers,
+    )
+    return stormvogel.result.Result(model, x)
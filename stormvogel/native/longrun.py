@@ -0,0 +1,340 @@
+"""Steady-state (long-run) analysis of DTMCs and CTMCs via their bottom strongly connected components (BSCCs)."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, to_compact
+from stormvogel.native.ctmc import uniformize
+from stormvogel.native.policies import solve_linear
+
+try:
+    import scipy.sparse
+    import scipy.sparse.csgraph
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+
+def _entry_states(compact: CompactModel) -> np.ndarray:
+    return np.repeat(compact.row_states(), np.diff(compact.row_starts))
+
+
+def strongly_connected_components(compact: CompactModel) -> tuple[int, np.ndarray]:
+    """Decomposes the graph of a compact model (positive entries only) into strongly connected components.
+
+    Returns:
+        The number of components and for each state index the component it belongs to.
+    """
+    positive = compact.values > 0
+    sources = _entry_states(compact)[positive]
+    targets = compact.columns[positive]
+    n = compact.nr_states
+    if scipy is not None:
+        graph = scipy.sparse.csr_matrix(
+            (np.ones(len(sources)), (sources, targets)), shape=(n, n)
+        )
+        return scipy.sparse.csgraph.connected_components(
+            graph, directed=True, connection="strong"
+        )
+
+    # iterative version of Tarjan's algorithm
+    order = np.argsort(sources, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n))))
+    starts, successors = starts.tolist(), targets[order].tolist()
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack = []
+    counter = 0
+    nr_components = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, starts[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            v, e = work[-1]
+            if e < starts[v + 1]:
+                work[-1] = (v, e + 1)
+                w = successors[e]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, starts[w]))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                low[u] = min(low[u], low[v])
+            if low[v] == index[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = nr_components
+                    if w == v:
+                        break
+                nr_components += 1
+    return nr_components, np.array(component, dtype=np.int64)
+
+
+def bottom_components(compact: CompactModel) -> list[np.ndarray]:
+    """Returns the bottom strongly connected components (the components that cannot be left) as arrays of state indices."""
+    nr_components, component = strongly_connected_components(compact)
+    positive = compact.values > 0
+    source_components = component[_entry_states(compact)[positive]]
+    target_components = component[compact.columns[positive]]
+    leaving = np.zeros(nr_components, dtype=bool)
+    leaving[source_components[source_components != target_components]] = True
+    order = np.argsort(component, kind="stable")
+    members = np.split(order, np.cumsum(np.bincount(component))[:-1])
+    return [members[c] for c in np.flatnonzero(~leaving)]
+
+
+def stationary_distribution(
+    chain: CompactModel,
+    states: np.ndarray,
+    epsilon: float = 1e-12,
+    max_iterations: int = 1_000_000,
+) -> np.ndarray:
+    """Computes the stationary distribution of a compact DTMC restricted to a bottom component.
+    Uses a sparse linear solve if scipy is available and power iteration otherwise.
+
+    Returns:
+        The stationary probability of each of the given states.
+    """
+    if len(states) == 1:
+        return np.ones(1)
+    local = np.full(chain.nr_states, -1, dtype=np.int64)
+    local[states] = np.arange(len(states))
+    entry_states = _entry_states(chain)
+    inside = local[entry_states] >= 0
+    rows, columns, values = (
+        local[entry_states[inside]],
+        local[chain.columns[inside]],
+        chain.values[inside],
+    )
+    m = len(states)
+
+    if scipy is not None:
+        # solve pi (P - I) = 0 where the last equation is replaced by sum(pi) = 1
+        a = (
+            scipy.sparse.csr_matrix((values, (columns, rows)), shape=(m, m))
+            - scipy.sparse.identity(m, format="csr")
+        ).tolil()
+        a[m - 1, :] = np.ones(m)
+        b = np.zeros(m)
+        b[m - 1] = 1
+        pi = scipy.sparse.linalg.spsolve(a.tocsc(), b)
+    else:
+        # the lazy chain (P + I) / 2 has the same stationary distribution and is aperiodic
+        pi = np.full(m, 1 / m)
+        for _ in range(max_iterations):
+            new = (pi + np.bincount(columns, values * pi[rows], minlength=m)) / 2
+            diff = np.max(np.abs(new - pi))
+            pi = new
+            if diff < epsilon:
+                break
+    pi = np.maximum(pi, 0)
+    return pi / pi.sum()
+
+
+def _chain(compact: CompactModel) -> CompactModel:
+    """The DTMC whose long-run behaviour is analysed: the model itself or the uniformized CTMC."""
+    if compact.type == stormvogel.model.ModelType.CTMC:
+        return uniformize(compact)[0]
+    if compact.type != stormvogel.model.ModelType.DTMC:
+        raise RuntimeError("Long-run analysis only works for DTMCs and CTMCs.")
+    return compact
+
+
+def _stationary_distributions(
+    chain: CompactModel, workers: int | None
+) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """Computes the bottom components and their stationary distributions, solving the components in parallel."""
+    components = bottom_components(chain)
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        distributions = list(
+            executor.map(
+                lambda states: stationary_distribution(chain, states), components
+            )
+        )
+    return components, distributions
+
+
+def _absorption_values(
+    chain: CompactModel, components: list[np.ndarray], component_values: list[float]
+) -> np.ndarray:
+    """Computes for every state the sum over the bottom components b of P(reach b) * component_values[b]."""
+    x = np.zeros(chain.nr_states, dtype=np.float64)
+    transient = np.ones(chain.nr_states, dtype=bool)
+    for states, value in zip(components, component_values):
+        x[states] = value
+        transient[states] = False
+    return solve_linear(chain, transient, x)
+
+
+def _absorption_distribution(
+    chain: CompactModel,
+    components: list[np.ndarray],
+    initial: np.ndarray,
+    epsilon: float = 1e-12,
+    max_iterations: int = 1_000_000,
+) -> np.ndarray:
+    """Computes the probability to eventually end up in each bottom component from the initial distribution.
+    The expected number of visits y to the transient states solves y (I - P_TT) = initial_T,
+    which takes a single (transposed) linear solve for all components together."""
+    membership = np.full(chain.nr_states, -1, dtype=np.int64)
+    for i, states in enumerate(components):
+        membership[states] = i
+    transient = membership < 0
+    entry_states = _entry_states(chain)
+
+    y = np.zeros(chain.nr_states, dtype=np.float64)
+    if transient.any():
+        local = np.cumsum(transient) - 1
+        inner = transient[entry_states] & transient[chain.columns]
+        rows = local[entry_states[inner]]
+        columns = local[chain.columns[inner]]
+        values = chain.values[inner]
+        m = int(transient.sum())
+        b = initial[transient]
+        if scipy is not None:
+            a = scipy.sparse.identity(m, format="csc") - scipy.sparse.csc_matrix(
+                (values, (columns, rows)), shape=(m, m)
+            )
+            y[transient] = scipy.sparse.linalg.spsolve(a, b)
+        else:
+            visits = b.copy()
+            for _ in range(max_iterations):
+                new = b + np.bincount(columns, values * visits[rows], minlength=m)
+                diff = np.max(np.abs(new - visits))
+                visits = new
+                if diff < epsilon:
+                    break
+            y[transient] = visits
+
+    # mass that starts in a component plus the flow from the transient states into it
+    into = ~transient[chain.columns] & transient[entry_states]
+    flow = np.bincount(
+        membership[chain.columns[into]],
+        weights=chain.values[into] * y[entry_states[into]],
+        minlength=len(components),
+    )
+    start = np.bincount(
+        membership[~transient],
+        weights=initial[~transient],
+        minlength=len(components),
+    )
+    return start + flow
+
+
+def iterate_steady_state(
+    compact: CompactModel,
+    initial: np.ndarray | None = None,
+    workers: int | None = None,
+) -> np.ndarray:
+    """Computes the long-run distribution over the states of a compact DTMC or CTMC.
+
+    Args:
+        compact: The compact model.
+        initial: The initial distribution. Defaults to the initial state with probability 1.
+        workers: Number of threads used to solve the bottom components.
+    """
+    chain = _chain(compact)
+    if initial is None:
+        initial = np.zeros(compact.nr_states, dtype=np.float64)
+        initial[compact.initial_state] = 1
+    components, distributions = _stationary_distributions(chain, workers)
+    absorption = _absorption_distribution(chain, components, initial)
+
+    result = np.zeros(compact.nr_states, dtype=np.float64)
+    for states, distribution, mass in zip(components, distributions, absorption):
+        result[states] = mass * distribution
+    return result
+
+
+def iterate_long_run_average(
+    compact: CompactModel, state_values: np.ndarray, workers: int | None = None
+) -> np.ndarray:
+    """Computes for each state the long-run average of the given state values, e.g., rewards or the indicator of a label.
+
+    Args:
+        compact: The compact model.
+        state_values: One value per state.
+        workers: Number of threads used to solve the bottom components.
+    """
+    chain = _chain(compact)
+    components, distributions = _stationary_distributions(chain, workers)
+    component_values = [
+        float(distribution @ state_values[states])
+        for states, distribution in zip(components, distributions)
+    ]
+    return _absorption_values(chain, components, component_values)
+
+
+@cached
+def steady_state(
+    model: stormvogel.model.Model, workers: int | None = None
+) -> stormvogel.result.Result:
+    """Compute the long-run probability to be in each state, starting from the initial state.
+
+    Args:
+        model: The model, a DTMC or a CTMC.
+        workers: Number of threads used to solve the bottom components.
+    """
+    compact = to_compact(model)
+    return stormvogel.result.Result(
+        model, iterate_steady_state(compact, workers=workers)
+    )
+
+
+@cached
+def long_run_probability(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    workers: int | None = None,
+) -> stormvogel.result.Result:
+    """Compute for each state the long-run fraction of time that is spent in the target, i.e., LRA=? [target].
+
+    Args:
+        model: The model, a DTMC or a CTMC.
+        target: The target, either a label, a state or a list of states.
+        workers: Number of threads used to solve the bottom components.
+    """
+    compact = to_compact(model)
+    x = iterate_long_run_average(
+        compact, compact.state_set(target).astype(np.float64), workers
+    )
+    return stormvogel.result.Result(model, x)
+
+
+@cached
+def long_run_reward(
+    model: stormvogel.model.Model,
+    reward_model: str | None = None,
+    workers: int | None = None,
+) -> stormvogel.result.Result:
+    """Compute for each state the long-run average reward (per step, or per time unit for CTMCs), i.e., R=? [LRA].
+
+    Args:
+        model: The model, a DTMC or a CTMC.
+        reward_model: The name of the reward model. Defaults to the first reward model.
+        workers: Number of threads used to solve the bottom components.
+    """
+    compact = to_compact(model)
+    x = iterate_long_run_average(compact, compact.reward_vector(reward_model), workers)
+    return stormvogel.result.Result(model, x)
@@ -0,0 +1,175 @@
+"""Policy iteration for reachability probabilities, where schedulers are evaluated with sparse linear solves."""
+
+from typing import Callable
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, segment_sum, to_compact
+from stormvogel.native.precomputation import can_reach, prob0e
+from stormvogel.native.iteration import iterate
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+
+def scheduler_to_rows(
+    compact: CompactModel, scheduler: stormvogel.result.Scheduler
+) -> np.ndarray:
+    """Converts a scheduler to an array that contains the chosen row for each state index."""
+    rows = np.empty(compact.nr_states, dtype=np.int64)
+    for i, state_id in enumerate(compact.state_ids.tolist()):
+        action = scheduler.taken_actions[state_id]
+        start, end = compact.row_group_starts[i], compact.row_group_starts[i + 1]
+        for r in range(start, end):
+            if compact.actions[r] == action:
+                rows[i] = r
+                break
+        else:
+            raise RuntimeError(
+                f"The scheduler chooses action {action} in state {state_id}, but this action is not available"
+            )
+    return rows
+
+
+def rows_to_scheduler(
+    model: stormvogel.model.Model, compact: CompactModel, rows: np.ndarray
+) -> stormvogel.result.Scheduler:
+    """Converts an array of chosen rows (one per state index) to a scheduler."""
+    actions = [compact.actions[r] for r in rows.tolist()]
+    if compact.state_ids.tolist() == list(model.states):
+        return stormvogel.result.Scheduler(model, actions)
+    return stormvogel.result.Scheduler(
+        model, dict(zip(compact.state_ids.tolist(), actions))
+    )
+
+
+def solve_linear(
+    chain: CompactModel,
+    maybe: np.ndarray,
+    x: np.ndarray,
+    offsets: np.ndarray | None = None,
+    epsilon: float = 1e-10,
+) -> np.ndarray:
+    """Solves x = offsets + P x for the maybe states of a compact Markov chain (one row per state).
+    The values in x of the other states are kept fixed. Uses a sparse linear solve if scipy is available
+    and value iteration otherwise."""
+    x = np.array(x, dtype=np.float64)
+    if not maybe.any():
+        return x
+    if offsets is None:
+        offsets = np.zeros(chain.nr_rows, dtype=np.float64)
+
+    if scipy is not None:
+        matrix = scipy.sparse.csr_matrix(
+            (chain.values, chain.columns, chain.row_starts),
+            shape=(chain.nr_states, chain.nr_states),
+        )
+        sub = matrix[maybe]
+        b = offsets[maybe] + sub[:, ~maybe] @ x[~maybe]
+        a = (
+            scipy.sparse.identity(int(maybe.sum()), format="csc")
+            - sub[:, maybe].tocsc()
+        )
+        x[maybe] = scipy.sparse.linalg.spsolve(a, b)
+    else:
+        x, _ = iterate(chain, x, ~maybe, offsets=offsets, epsilon=epsilon)
+    return x
+
+
+def solve_reachability(
+    chain: CompactModel, targets: np.ndarray, epsilon: float = 1e-10
+) -> np.ndarray:
+    """Computes the probability to reach the targets in a compact Markov chain (one row per state).
+    States that cannot reach the targets get probability 0, the other states are obtained with solve_linear."""
+    maybe = can_reach(chain, targets) & ~targets
+    return solve_linear(chain, maybe, targets.astype(np.float64), epsilon=epsilon)
+
+
+def iterate_policies(
+    compact: CompactModel,
+    targets: np.ndarray,
+    maximize: bool = True,
+    rows: np.ndarray | None = None,
+    max_iterations: int = 10_000,
+    on_iteration: Callable[[np.ndarray, np.ndarray], None] | None = None,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Runs policy iteration on a compact model.
+
+    Args:
+        compact: The compact model.
+        targets: Boolean mask of the target states.
+        maximize: Whether to maximize or minimize the reachability probability.
+        rows: The chosen row for each state index of the initial scheduler. Defaults to the first row of each state.
+        max_iterations: Upper bound on the number of iterations.
+        on_iteration: Called with the values and the rows of the scheduler after every evaluation.
+
+    Returns:
+        The values, the chosen rows of the final scheduler and the number of iterations.
+    """
+    if rows is None:
+        rows = compact.row_group_starts[:-1].copy()
+
+    zero = None
+    if not maximize:
+        # a scheduler that stays in an end component without targets could tie with one that leaves it,
+        # so the states where the minimal probability is 0 keep rows that stay among those states
+        zero = prob0e(compact, targets)
+        leaves = (compact.values > 0) & ~zero[compact.columns]
+        stays = segment_sum(leaves.astype(np.int64), compact.row_starts) == 0
+        stay_rows = np.minimum.reduceat(
+            np.where(stays, np.arange(compact.nr_rows), compact.nr_rows),
+            compact.row_group_starts[:-1],
+        )
+        rows = np.where(zero, stay_rows, rows)
+
+    iterations = 0
+    while True:
+        x = solve_reachability(compact.induced(rows), targets)
+        iterations += 1
+        if on_iteration is not None:
+            on_iteration(x, rows)
+        new_rows = compact.best_rows(compact.multiply(x), maximize, current=rows)
+        if zero is not None:
+            new_rows[zero] = rows[zero]
+        if np.array_equal(new_rows, rows) or iterations >= max_iterations:
+            return x, rows, iterations
+        rows = new_rows
+
+
+@cached
+def policy_iteration(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    maximize: bool = True,
+    scheduler: stormvogel.result.Scheduler | None = None,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) probability to reach the target from every state with policy iteration.
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        target: The target, either a label, a state or a list of states.
+        maximize: Whether to compute maximal or minimal probabilities.
+        scheduler: An optional scheduler to start from (warm start).
+
+    Returns:
+        The result, which also contains the optimal scheduler.
+    """
+    if model.get_type() not in (
+        stormvogel.model.ModelType.DTMC,
+        stormvogel.model.ModelType.MDP,
+    ):
+        raise RuntimeError("Policy iteration only works for DTMCs and MDPs.")
+    compact = to_compact(model)
+    rows = scheduler_to_rows(compact, scheduler) if scheduler is not None else None
+    x, rows, _ = iterate_policies(compact, compact.state_set(target), maximize, rows)
+    return stormvogel.result.Result(
+        model,
+        x,
+        rows_to_scheduler(model, compact, rows) if model.supports_actions() else None,
+    )
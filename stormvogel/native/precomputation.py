@@ -0,0 +1,129 @@
+"""Graph-based precomputations on compact models, such as the states that reach a target with probability 0 or 1."""
+
+from collections import deque
+
+import numpy as np
+
+from stormvogel.native.compact import CompactModel, segment_sum
+
+
+def predecessors(compact: CompactModel) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the transposed graph in CSR form: for each state, the rows that have a positive entry into it.
+
+    Returns:
+        starts, rows: the predecessor rows of state s are rows[starts[s]:starts[s+1]].
+    """
+    positive = compact.values > 0
+    entry_rows = np.repeat(np.arange(compact.nr_rows), np.diff(compact.row_starts))
+    targets = compact.columns[positive]
+    order = np.argsort(targets, kind="stable")
+    starts = np.concatenate(
+        ([0], np.cumsum(np.bincount(targets, minlength=compact.nr_states)))
+    )
+    return starts, entry_rows[positive][order]
+
+
+def attractor(
+    compact: CompactModel,
+    targets: np.ndarray,
+    allowed: np.ndarray | None = None,
+    usable_rows: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Backward breadth-first search from the targets.
+    A state is reached if it has a (usable) row with a positive entry into a reached state.
+    If allowed is given, only allowed states (and the targets) can be reached.
+
+    Returns:
+        The reached states, and for each reached non-target state the row through which it was reached
+        (-1 for the other states). Following these rows leads to the targets with positive probability.
+    """
+    starts, rows = predecessors(compact)
+    starts, rows = starts.tolist(), rows.tolist()
+    row_states = compact.row_states().tolist()
+    allowed_list = allowed.tolist() if allowed is not None else None
+    usable_list = usable_rows.tolist() if usable_rows is not None else None
+
+    reached = targets.tolist()
+    via = [-1] * compact.nr_states
+    queue = deque(np.flatnonzero(targets).tolist())
+    while queue:
+        s = queue.popleft()
+        for r in rows[starts[s] : starts[s + 1]]:
+            p = row_states[r]
+            if (
+                not reached[p]
+                and (allowed_list is None or allowed_list[p])
+                and (usable_list is None or usable_list[r])
+            ):
+                reached[p] = True
+                via[p] = r
+                queue.append(p)
+    return np.array(reached, dtype=bool), np.array(via, dtype=np.int64)
+
+
+def can_reach(
+    compact: CompactModel, targets: np.ndarray, allowed: np.ndarray | None = None
+) -> np.ndarray:
+    """Returns the states that can reach a target state with positive probability, for some choice of actions.
+    If allowed is given, only paths through allowed states (and ending in a target) are considered.
+    The complement are the states that reach the target with probability 0 under every scheduler."""
+    return attractor(compact, targets, allowed)[0]
+
+
+def must_reach(compact: CompactModel, targets: np.ndarray) -> np.ndarray:
+    """Returns the states that reach a target state with positive probability under every scheduler.
+    The complement are the states where some scheduler reaches the target with probability 0."""
+    starts, rows = predecessors(compact)
+    starts, rows = starts.tolist(), rows.tolist()
+    row_states = compact.row_states().tolist()
+
+    # a state is reached once each of its rows has a positive entry into a reached state
+    open_rows = np.diff(compact.row_group_starts).tolist()
+    row_done = [False] * compact.nr_rows
+    reached = targets.tolist()
+    queue = deque(np.flatnonzero(targets).tolist())
+    while queue:
+        s = queue.popleft()
+        for r in rows[starts[s] : starts[s + 1]]:
+            p = row_states[r]
+            if row_done[r] or reached[p]:
+                continue
+            row_done[r] = True
+            open_rows[p] -= 1
+            if open_rows[p] == 0:
+                reached[p] = True
+                queue.append(p)
+    return np.array(reached, dtype=bool)
+
+
+def prob0a(compact: CompactModel, targets: np.ndarray) -> np.ndarray:
+    """States where every scheduler reaches the targets with probability 0 (the maximal probability is 0)."""
+    return ~can_reach(compact, targets)
+
+
+def prob0e(compact: CompactModel, targets: np.ndarray) -> np.ndarray:
+    """States where some scheduler reaches the targets with probability 0 (the minimal probability is 0)."""
+    return ~must_reach(compact, targets)
+
+
+def prob1a(compact: CompactModel, targets: np.ndarray) -> np.ndarray:
+    """States where every scheduler reaches the targets with probability 1 (the minimal probability is 1)."""
+    return ~can_reach(compact, prob0e(compact, targets), allowed=~targets)
+
+
+def prob1e(compact: CompactModel, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """States where some scheduler reaches the targets with probability 1 (the maximal probability is 1).
+
+    Returns:
+        The states, and for each non-target state among them a row of a scheduler that reaches
+        the targets with probability 1 (-1 for the other states).
+    """
+    candidates = np.ones(compact.nr_states, dtype=bool)
+    while True:
+        # rows that cannot leave the candidates
+        leaves = (compact.values > 0) & ~candidates[compact.columns]
+        usable = segment_sum(leaves.astype(np.int64), compact.row_starts) == 0
+        reached, via = attractor(compact, targets, candidates, usable)
+        if np.array_equal(reached, candidates):
+            return reached, via
+        candidates = reached
@@ -0,0 +1,171 @@
+"""Expected reachability rewards, step-bounded cumulative rewards and instantaneous rewards for compact models."""
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, segment_sum, to_compact
+from stormvogel.native.policies import rows_to_scheduler, solve_linear
+from stormvogel.native.precomputation import prob1a, prob1e
+
+
+def state_rewards(compact: CompactModel, rewards: np.ndarray) -> np.ndarray:
+    """Converts a row-aligned reward vector to a vector with one entry per state.
+    This requires that all rows of a state have the same reward."""
+    first = rewards[compact.row_group_starts[:-1]]
+    if not np.array_equal(np.repeat(first, np.diff(compact.row_group_starts)), rewards):
+        raise RuntimeError(
+            "Instantaneous rewards require state rewards, but some state has different rewards for different actions."
+        )
+    return first
+
+
+def iterate_reward_policies(
+    compact: CompactModel,
+    targets: np.ndarray,
+    rewards: np.ndarray,
+    maximize: bool = True,
+    max_iterations: int = 10_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Computes the (maximal or minimal) expected reward that is accumulated until reaching the targets.
+    States where the targets are not reached with probability 1 (under every scheduler when maximizing,
+    under some scheduler when minimizing) get an infinite reward. The other values are obtained with policy iteration.
+
+    Returns:
+        The values and the chosen row for each state index of the optimal scheduler.
+    """
+    rows = compact.row_group_starts[:-1].copy()
+    if maximize:
+        finite = prob1a(compact, targets)
+    else:
+        # start from a scheduler that reaches the targets with probability 1
+        finite, via = prob1e(compact, targets)
+        rows = np.where(via >= 0, via, rows)
+    maybe = finite & ~targets
+
+    # rows that can leave the finite states are never chosen
+    leaves = (compact.values > 0) & ~finite[compact.columns]
+    valid = segment_sum(leaves.astype(np.int64), compact.row_starts) == 0
+    penalty = np.where(valid, 0.0, -np.inf if maximize else np.inf)
+
+    x = np.zeros(compact.nr_states, dtype=np.float64)
+    for _ in range(max_iterations):
+        chain = compact.induced(rows)
+        x = solve_linear(chain, maybe, x, rewards[rows])
+        row_values = rewards + compact.multiply(x) + penalty
+        tolerance = 1e-9 * max(1.0, float(np.max(np.abs(x))))
+        new_rows = compact.best_rows(row_values, maximize, rows, tolerance)
+        new_rows = np.where(maybe, new_rows, rows)
+        if np.array_equal(new_rows, rows):
+            break
+        rows = new_rows
+    x[~finite] = np.inf
+    return x, rows
+
+
+def iterate_cumulative_rewards(
+    compact: CompactModel, rewards: np.ndarray, steps: int, maximize: bool = True
+) -> np.ndarray:
+    """Computes the (maximal or minimal) expected reward that is accumulated within the given number of steps."""
+    x = np.zeros(compact.nr_states, dtype=np.float64)
+    for _ in range(steps):
+        x = compact.reduce(rewards + compact.multiply(x), maximize)
+    return x
+
+
+def iterate_instantaneous_rewards(
+    compact: CompactModel, rewards: np.ndarray, steps: int, maximize: bool = True
+) -> np.ndarray:
+    """Computes the (maximal or minimal) expected state reward after exactly the given number of steps."""
+    x = state_rewards(compact, rewards).astype(np.float64)
+    for _ in range(steps):
+        x = compact.reduce(compact.multiply(x), maximize)
+    return x
+
+
+def _check_type(model: stormvogel.model.Model):
+    if model.get_type() not in (
+        stormvogel.model.ModelType.DTMC,
+        stormvogel.model.ModelType.MDP,
+    ):
+        raise RuntimeError("Reward computations only work for DTMCs and MDPs.")
+
+
+@cached
+def expected_rewards(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    maximize: bool = True,
+    reward_model: str | None = None,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) expected reward that is accumulated until reaching the target, i.e., R=? [F target].
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        target: The target, either a label, a state or a list of states.
+        maximize: Whether to compute maximal or minimal rewards (only relevant for models with actions).
+        reward_model: The name of the reward model. Defaults to the first reward model.
+
+    Returns:
+        The result, which also contains the optimal scheduler for models with actions.
+    """
+    _check_type(model)
+    compact = to_compact(model)
+    x, rows = iterate_reward_policies(
+        compact,
+        compact.state_set(target),
+        compact.reward_vector(reward_model),
+        maximize,
+    )
+    return stormvogel.result.Result(
+        model,
+        x,
+        rows_to_scheduler(model, compact, rows) if model.supports_actions() else None,
+    )
+
+
+@cached
+def cumulative_rewards(
+    model: stormvogel.model.Model,
+    steps: int,
+    maximize: bool = True,
+    reward_model: str | None = None,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) expected reward that is accumulated within the given number of steps, i.e., R=? [C<=steps].
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        steps: The number of steps.
+        maximize: Whether to compute maximal or minimal rewards (only relevant for models with actions).
+        reward_model: The name of the reward model. Defaults to the first reward model.
+    """
+    _check_type(model)
+    compact = to_compact(model)
+    x = iterate_cumulative_rewards(
+        compact, compact.reward_vector(reward_model), steps, maximize
+    )
+    return stormvogel.result.Result(model, x)
+
+
+@cached
+def instantaneous_rewards(
+    model: stormvogel.model.Model,
+    steps: int,
+    maximize: bool = True,
+    reward_model: str | None = None,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) expected state reward after exactly the given number of steps, i.e., R=? [I=steps].
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        steps: The number of steps.
+        maximize: Whether to compute maximal or minimal rewards (only relevant for models with actions).
+        reward_model: The name of the reward model. Defaults to the first reward model.
+    """
+    _check_type(model)
+    compact = to_compact(model)
+    x = iterate_instantaneous_rewards(
+        compact, compact.reward_vector(reward_model), steps, maximize
+    )
+    return stormvogel.result.Result(model, x)
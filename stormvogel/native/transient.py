@@ -0,0 +1,119 @@
+"""Transient (step-bounded) analysis of compact models with vectorized vector-matrix products."""
+
+from typing import Iterator
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.result
+from stormvogel.result_cache import cached
+from stormvogel.native.compact import CompactModel, to_compact
+
+
+def _check_chain(compact: CompactModel):
+    if compact.nr_rows != compact.nr_states:
+        raise RuntimeError(
+            "Transient distributions require a Markov chain (one choice per state). Use a scheduler to induce one."
+        )
+
+
+def evolve(
+    compact: CompactModel,
+    steps: int | None = None,
+    initial: np.ndarray | None = None,
+) -> Iterator[np.ndarray]:
+    """Yields the distributions over the states of a compact Markov chain at step 0, 1, ..., steps.
+    If steps is None, the generator does not stop. Only the current distribution is kept in memory.
+
+    Args:
+        compact: The compact Markov chain.
+        steps: The number of steps.
+        initial: The initial distribution. Defaults to the initial state with probability 1.
+    """
+    _check_chain(compact)
+    if initial is None:
+        distribution = np.zeros(compact.nr_states, dtype=np.float64)
+        distribution[compact.initial_state] = 1
+    else:
+        distribution = np.array(initial, dtype=np.float64)
+
+    # precompute the source of every entry once
+    entry_states = np.repeat(compact.row_states(), np.diff(compact.row_starts))
+    current = 0
+    while True:
+        yield distribution
+        if steps is not None and current >= steps:
+            return
+        distribution = np.bincount(
+            compact.columns,
+            weights=compact.values * distribution[entry_states],
+            minlength=compact.nr_states,
+        )
+        current += 1
+
+
+def transient_distribution(
+    compact: CompactModel, steps: int, initial: np.ndarray | None = None
+) -> np.ndarray:
+    """Returns the distribution over the states of a compact Markov chain after the given number of steps."""
+    distribution = None
+    for distribution in evolve(compact, steps, initial):
+        pass
+    assert distribution is not None
+    return distribution
+
+
+def iterate_bounded_reachability(
+    compact: CompactModel,
+    targets: np.ndarray,
+    steps: int,
+    maximize: bool = True,
+    allowed: np.ndarray | None = None,
+) -> np.ndarray:
+    """Computes the (maximal or minimal) probability to reach the targets within the given number of steps.
+    If allowed is given, only paths through allowed states are considered (bounded until)."""
+    x = targets.astype(np.float64)
+    # states that are not allowed keep probability 0
+    fixed = targets if allowed is None else targets | ~allowed
+    for _ in range(steps):
+        x = np.where(fixed, x, compact.reduce(compact.multiply(x), maximize))
+    return x
+
+
+@cached
+def bounded_reachability(
+    model: stormvogel.model.Model,
+    target: str | stormvogel.model.State | list[stormvogel.model.State],
+    steps: int,
+    maximize: bool = True,
+) -> stormvogel.result.Result:
+    """Compute the (maximal or minimal) probability to reach the target within the given number of steps, i.e., P=? [F<=steps target].
+
+    Args:
+        model: The model, a DTMC or an MDP.
+        target: The target, either a label, a state or a list of states.
+        steps: The step bound.
+        maximize: Whether to compute maximal or minimal probabilities (only relevant for models with actions).
+    """
+    if model.get_type() not in (
+        stormvogel.model.ModelType.DTMC,
+        stormvogel.model.ModelType.MDP,
+    ):
+        raise RuntimeError("Step-bounded reachability only works for DTMCs and MDPs.")
+    compact = to_compact(model)
+    x = iterate_bounded_reachability(
+        compact, compact.state_set(target), steps, maximize
+    )
+    return stormvogel.result.Result(model, x)
+
+
+@cached
+def step_distribution(
+    model: stormvogel.model.Model, steps: int
+) -> stormvogel.result.Result:
+    """Compute the probability to be in each state of a DTMC after exactly the given number of steps."""
+    if model.get_type() != stormvogel.model.ModelType.DTMC:
+        raise RuntimeError("Transient distributions only work for DTMCs.")
+    compact = to_compact(model)
+    x = transient_distribution(compact, steps)
+    return stormvogel.result.Result(model, x)
@@ -0,0 +1,123 @@
+"""Model checking of many models (e.g., bird variants or parameter instantiations) in a pool of processes."""
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    TimeoutError,
+    wait,
+)
+import multiprocessing
+import os
+import time
+from typing import Iterable, Iterator
+
+import stormvogel.model
+import stormvogel.result
+import stormvogel.stormpy_utils.model_checking as model_checking
+
+
+def _unpack(model: stormvogel.model.Model, future: Future) -> stormvogel.result.Result:
+    # every task checks a chunk of one property
+    [(values, taken_actions)] = future.result()
+    scheduler = (
+        None
+        if taken_actions is None
+        else stormvogel.result.Scheduler(model, taken_actions)
+    )
+    return stormvogel.result.Result(model, values, scheduler)
+
+
+def check_many(
+    models: Iterable[stormvogel.model.Model],
+    prop: str,
+    workers: int | None = None,
+    ordered: bool = True,
+    timeout: float | None = None,
+    scheduler: bool = True,
+    window: int | None = None,
+) -> Iterator[stormvogel.result.Result]:
+    """Model checks the same property on many models in a pool of worker processes.
+    The models are sent to the workers in compact form, and the conversion to stormpy and the model checking
+    happen in the workers. The results are yielded as they become available and refer to the original models.
+
+    The models are taken from the iterable (and packed) only when there is room in the window of pending checks,
+    so a generator of models is never held in memory at once.
+    Stopping the iteration early (e.g., breaking out of a for loop) cancels the checks that have not started yet.
+
+    Args:
+        models: The models.
+        prop: The property string.
+        workers: The number of processes. Defaults to the number of CPUs.
+        ordered: If True, the results are yielded in the order of the models.
+            Otherwise, they are yielded in the order in which they complete.
+        timeout: If given, a concurrent.futures.TimeoutError is raised when not all results are available
+            within this many seconds after the call. The remaining checks are then cancelled.
+        scheduler: Whether to extract schedulers for models with actions.
+        window: The maximal number of models that are submitted but not yet yielded. Defaults to twice the number of workers.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+    if window < 1:
+        raise RuntimeError("The window must contain at least one model.")
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(0, deadline - time.monotonic())
+
+    # the packed models and the checks are picklable, so the workers need not be forked,
+    # which is unsafe on macOS and in processes that run other threads (such as Jupyter kernels)
+    methods = multiprocessing.get_all_start_methods()
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        ),
+    )
+    models = iter(models)
+    # the submitted checks that have not been yielded yet, in the order of the models
+    pending: deque[tuple[Future, stormvogel.model.Model]] = deque()
+
+    def fill():
+        while len(pending) < window:
+            model = next(models, None)
+            if model is None:
+                return
+            future = executor.submit(
+                model_checking._check_chunk,
+                model_checking._pack(model),
+                [prop],
+                scheduler,
+            )
+            pending.append((future, model))
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                future, model = pending.popleft()
+                try:
+                    future.exception(timeout=remaining())
+                except TimeoutError:
+                    raise TimeoutError(
+                        "Not all models were checked within the timeout."
+                    ) from None
+            else:
+                done, _ = wait(
+                    [future for future, _ in pending],
+                    timeout=remaining(),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    raise TimeoutError(
+                        "Not all models were checked within the timeout."
+                    )
+                i = next(i for i, (future, _) in enumerate(pending) if future in done)
+                future, model = pending[i]
+                del pending[i]
+            fill()
+            yield _unpack(model, future)
+    finally:
+        # checks that are already running cannot be interrupted, but their results are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,29 @@
-import stormvogel.model
+import bisect
 import random
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+import stormvogel.model
+import stormvogel.parametric
+
+if TYPE_CHECKING:
+    # pandas (and pyarrow) are imported by the export functions, so importing this module stays cheap
+    import pandas as pd
+
+
+def state_id_of(
+    model: stormvogel.model.Model, state: stormvogel.model.State | int
+) -> int:
+    """Returns the id of a state (or state id) after checking in constant time that it is a part of the model."""
+    if isinstance(state, stormvogel.model.State):
+        member = model.states.get(state.id)
+        # the identity check makes the common case cheap, the full comparison is only needed for copies
+        if member is not None and (member is state or member == state):
+            return state.id
+    elif state in model.states:
+        return state
+    raise RuntimeError("This state is not a part of the model")
 
 
 class Scheduler:
@@ -8,63 +32,167 @@ class Scheduler:
 
     Args:
         model: mdp model associated with the scheduler
-        taken_actions: for each state the action we choose in that state
+        taken_actions: for each state the action we choose in that state, either as a dictionary hashed by the state id
+            or as a list in the order of the states of the model (model.states)
     """
 
     model: stormvogel.model.Model
-    # taken actions are hashed by the state id
-    taken_actions: dict[int, stormvogel.model.Action]
 
     # TODO functionality to convert a lambda scheduler to this object
 
     def __init__(
         self,
         model: stormvogel.model.Model,
-        taken_actions: dict[int, stormvogel.model.Action],
+        taken_actions: dict[int, stormvogel.model.Action]
+        | list[stormvogel.model.Action],
     ):
         self.model = model
-        self.taken_actions = taken_actions
+        if isinstance(taken_actions, dict):
+            self.taken_actions = taken_actions
+        else:
+            if len(taken_actions) != len(model.states):
+                raise RuntimeError(
+                    "The list of taken actions must contain one action for each state of the model."
+                )
+            self._taken_actions = None
+            self._actions = list(taken_actions)
+            self._state_ids = list(model.states)
+
+    @property
+    def taken_actions(self) -> dict[int, stormvogel.model.Action]:
+        """The taken actions hashed by the state id."""
+        if self._taken_actions is None:
+            self._taken_actions = dict(zip(self._state_ids, self._actions))
+        return self._taken_actions
+
+    @taken_actions.setter
+    def taken_actions(self, taken_actions: dict[int, stormvogel.model.Action]):
+        self._taken_actions = taken_actions
+        self._actions = None
+        self._state_ids = None
+
+    @property
+    def actions(self) -> list[stormvogel.model.Action]:
+        """The taken actions in the order of the states of the model."""
+        if self._actions is None:
+            self._state_ids = list(self.model.states)
+            self._actions = [self.taken_actions[s] for s in self._state_ids]
+        return self._actions
 
     def get_choice_of_state(
-        self, state: stormvogel.model.State | int
+        self, state: stormvogel.model.State | int, validate: bool = True
     ) -> stormvogel.model.Action:
-        """returns the choice in the scheduler for the given state if present in the model"""
-        if isinstance(state, int):
-            state = self.model.get_state_by_id(state)
-        if state in self.model.states.values():
-            return self.taken_actions[state.id]
+        """returns the choice in the scheduler for the given state if present in the model.
+        Callers that know that the state is a part of the model can skip the check with validate=False."""
+        if validate:
+            state_id = state_id_of(self.model, state)
         else:
-            raise RuntimeError("This state is not a part of the model")
+            state_id = state.id if isinstance(state, stormvogel.model.State) else state
+        return self.taken_actions[state_id]
 
-    def generate_induced_dtmc(self) -> stormvogel.model.Model | None:
-        """This function resolves the nondeterminacy of the mdp and returns the scheduler induced dtmc"""
-        if self.model.get_type() == stormvogel.model.ModelType.MDP:
-            induced_dtmc = stormvogel.model.new_dtmc(create_initial_state=False)
+    # a memoryless scheduler has a single memory state
+    initial_memory: int = 0
 
-            # we initialize the reward models
-            for reward_model in self.model.rewards:
-                induced_dtmc.new_reward_model(reward_model.name)
+    def choose(
+        self,
+        state: stormvogel.model.State | int,
+        memory: int = 0,
+        rng: random.Random | None = None,
+    ) -> stormvogel.model.Action:
+        """Returns the action in the given state. The memory and the random generator are ignored."""
+        return self.get_choice_of_state(state, validate=False)
 
-            # we add all the states and choices according to the choices
-            for _, state in self.model:
-                induced_dtmc.new_state(labels=state.labels, valuations=state.valuations)
-                action = self.get_choice_of_state(state)
-                choices = state.get_outgoing_choice(action)
-                assert choices is not None
-                induced_dtmc.add_choice(s=state, choices=choices)
+    def next_memory(self, memory: int, state: stormvogel.model.State | int) -> int:
+        """Returns the memory after moving to the given state, which is always the same."""
+        return memory
 
-                # we also add the rewards
-                for reward_model in self.model.rewards:
-                    induced_reward_model = induced_dtmc.get_rewards(reward_model.name)
-                    reward = reward_model.get_state_action_reward(state, action)
-                    assert reward is not None
-                    induced_reward_model.set_state_reward(state, reward)
+    def get_support_of_state(
+        self, state: stormvogel.model.State | int, validate: bool = True
+    ) -> list[stormvogel.model.Action]:
+        """Returns the actions that may be chosen in the given state, i.e., the chosen action."""
+        return [self.get_choice_of_state(state, validate)]
+
+    def support(self) -> dict[int, list[stormvogel.model.Action]]:
+        """Returns for each state id the actions that may be chosen."""
+        return {state_id: [action] for state_id, action in self.taken_actions.items()}
+
+    def generate_induced_dtmc(
+        self, compact: bool = False
+    ) -> "stormvogel.model.Model | stormvogel.native.compact.CompactModel | None":
+        """This function resolves the nondeterminacy of the mdp and returns the scheduler induced dtmc.
+        The dtmc is obtained by selecting the chosen row of each state in the compact representation,
+        and it has the same state ids, labels, valuations and rewards as the mdp.
+
+        Args:
+            compact: If True, the compact representation of the dtmc is returned instead of a model.
+        """
+        if self.model.get_type() != stormvogel.model.ModelType.MDP:
+            return None
+        if self.model.is_parametric() or self.model.is_interval_model():
+            if compact:
+                raise RuntimeError(
+                    "Parametric and interval models have no compact representation."
+                )
+            return self._generate_induced_dtmc_statewise()
 
-            return induced_dtmc
+        from stormvogel.native.compact import from_compact, to_compact
+        from stormvogel.native.policies import scheduler_to_rows
+
+        mdp = to_compact(self.model)
+        chain = mdp.induced(scheduler_to_rows(mdp, self))
+        if compact:
+            return chain
+        return from_compact(
+            chain, [dict(state.valuations) for state in self.model.states.values()]
+        )
+
+    def _generate_induced_dtmc_statewise(self) -> stormvogel.model.Model:
+        induced_dtmc = stormvogel.model.new_dtmc(create_initial_state=False)
+
+        # we initialize the reward models
+        induced_reward_models = [
+            induced_dtmc.new_reward_model(reward_model.name)
+            for reward_model in self.model.rewards
+        ]
+
+        # we add all the states first, so that the choices can refer to them
+        for state in self.model.states.values():
+            induced_dtmc.new_state(
+                labels=list(state.labels),
+                valuations=dict(state.valuations),
+                id=state.id,
+            )
+        for state in self.model.states.values():
+            action = self.get_choice_of_state(state, validate=False)
+            branch = self.model.choices[state.id].transition[action]
+            induced_dtmc.choices[state.id] = stormvogel.model.Choice(
+                {
+                    stormvogel.model.EmptyAction: stormvogel.model.Branch(
+                        [
+                            (value, induced_dtmc.states[target.id])
+                            for value, target in branch
+                        ]
+                    )
+                }
+            )
+
+            # we also add the rewards
+            for reward_model, induced_reward_model in zip(
+                self.model.rewards, induced_reward_models
+            ):
+                reward = reward_model.rewards.get((state.id, action))
+                assert reward is not None
+                induced_reward_model.rewards[state.id, stormvogel.model.EmptyAction] = (
+                    reward
+                )
+
+        return induced_dtmc
 
     def __str__(self) -> str:
-        if self.model.name is not None:
-            add = "Scheduler for model: " + self.model.name + "\n"
+        # models do not have a name (yet)
+        name = getattr(self.model, "name", None)
+        if name is not None:
+            add = "Scheduler for model: " + name + "\n"
         else:
             add = ""
         return add + "taken actions: " + str(self.taken_actions)
@@ -81,52 +209,512 @@ def random_scheduler(model: stormvogel.model.Model) -> Scheduler:
     return Scheduler(model, taken_actions=choices)
 
 
+def _row_layout(
+    model: stormvogel.model.Model,
+) -> tuple[list[int], np.ndarray, list[stormvogel.model.Action]]:
+    """Returns the state ids, the first row of each state (followed by the number of rows) and the action of each row,
+    where rows are the state-action pairs in the order of model.states and their choices (as in the compact representation).
+    """
+    state_ids = list(model.states)
+    row_group_starts = [0]
+    actions = []
+    for state_id in state_ids:
+        choice = model.choices.get(state_id)
+        if choice is None or len(choice.transition) == 0:
+            raise RuntimeError(
+                "This model has states with no outgoing choices.\nUse the add_self_loops() function to add self loops to all states with no outgoing transition."
+            )
+        actions.extend(choice.transition)
+        row_group_starts.append(len(actions))
+    return state_ids, np.array(row_group_starts, dtype=np.int64), actions
+
+
+class RandomizedScheduler:
+    """Memoryless scheduler that chooses the action in each state according to a probability distribution.
+    The distributions are stored in a single array with one probability per row (state-action pair), grouped per state.
+
+    Args:
+        model: mdp model associated with the scheduler
+        probabilities: either a row-aligned array with the probability of each row
+            (in the order of model.states and their actions, as in the compact representation),
+            or for each state id a dictionary with the probability of each action. Missing actions have probability 0.
+    """
+
+    model: stormvogel.model.Model
+    initial_memory: int = 0
+
+    def __init__(
+        self,
+        model: stormvogel.model.Model,
+        probabilities: np.ndarray | dict[int, dict[stormvogel.model.Action, float]],
+    ):
+        self.model = model
+        self.state_ids, self.row_group_starts, self.row_actions = _row_layout(model)
+        self._index = {state_id: i for i, state_id in enumerate(self.state_ids)}
+        if isinstance(probabilities, dict):
+            array = np.zeros(len(self.row_actions), dtype=np.float64)
+            starts = self.row_group_starts.tolist()
+            for state_id, distribution in probabilities.items():
+                i = self._index[state_id]
+                for r in range(starts[i], starts[i + 1]):
+                    array[r] = distribution.get(self.row_actions[r], 0)
+            probabilities = array
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        if len(self.probabilities) != len(self.row_actions):
+            raise RuntimeError(
+                "The array of probabilities must contain one probability for each row of the model."
+            )
+        if (self.probabilities < 0).any() or not np.allclose(
+            np.add.reduceat(self.probabilities, self.row_group_starts[:-1]), 1
+        ):
+            raise RuntimeError(
+                "The probabilities of the actions of each state must form a distribution."
+            )
+        # cumulative probabilities within each state, for sampling by bisection
+        cumulative = np.cumsum(self.probabilities)
+        offsets = np.repeat(
+            cumulative[self.row_group_starts[:-1]]
+            - self.probabilities[self.row_group_starts[:-1]],
+            np.diff(self.row_group_starts),
+        )
+        self._cumulative = (cumulative - offsets).tolist()
+        self._starts = self.row_group_starts.tolist()
+
+    def _index_of(self, state: stormvogel.model.State | int) -> int:
+        state_id = state.id if isinstance(state, stormvogel.model.State) else state
+        if state_id not in self._index:
+            raise RuntimeError("This state is not a part of the model")
+        return self._index[state_id]
+
+    def choose(
+        self,
+        state: stormvogel.model.State | int,
+        memory: int = 0,
+        rng: random.Random | None = None,
+    ) -> stormvogel.model.Action:
+        """Samples an action in the given state. The memory is ignored.
+
+        Args:
+            state: The state or state id.
+            memory: Ignored, this scheduler has no memory.
+            rng: The random generator. Defaults to the global one of the random module.
+        """
+        i = self._index_of(state)
+        start, end = self._starts[i], self._starts[i + 1]
+        u = (rng or random).random() * self._cumulative[end - 1]
+        return self.row_actions[
+            bisect.bisect_right(self._cumulative, u, start, end - 1)
+        ]
+
+    def next_memory(self, memory: int, state: stormvogel.model.State | int) -> int:
+        """Returns the memory after moving to the given state, which is always the same."""
+        return memory
+
+    def distribution(
+        self, state: stormvogel.model.State | int
+    ) -> dict[stormvogel.model.Action, float]:
+        """Returns the probability of each action in the given state."""
+        i = self._index_of(state)
+        start, end = self._starts[i], self._starts[i + 1]
+        return dict(
+            zip(self.row_actions[start:end], self.probabilities[start:end].tolist())
+        )
+
+    def get_support_of_state(
+        self, state: stormvogel.model.State | int, validate: bool = True
+    ) -> list[stormvogel.model.Action]:
+        """Returns the actions that are chosen with positive probability in the given state."""
+        if validate:
+            state_id_of(self.model, state)
+        return [
+            action
+            for action, probability in self.distribution(state).items()
+            if probability > 0
+        ]
+
+    def support(self) -> dict[int, list[stormvogel.model.Action]]:
+        """Returns for each state id the actions that are chosen with positive probability."""
+        return {
+            state_id: self.get_support_of_state(state_id, validate=False)
+            for state_id in self.state_ids
+        }
+
+    def most_likely(self) -> Scheduler:
+        """Returns the deterministic scheduler that takes the most likely action in each state."""
+        candidates = np.where(
+            self.probabilities
+            == np.repeat(
+                np.maximum.reduceat(self.probabilities, self.row_group_starts[:-1]),
+                np.diff(self.row_group_starts),
+            ),
+            np.arange(len(self.row_actions)),
+            len(self.row_actions),
+        )
+        rows = np.minimum.reduceat(candidates, self.row_group_starts[:-1])
+        return Scheduler(self.model, [self.row_actions[r] for r in rows.tolist()])
+
+    def generate_induced_dtmc(
+        self, compact: bool = False
+    ) -> "stormvogel.model.Model | stormvogel.native.compact.CompactModel | None":
+        """Returns the dtmc that is induced by this scheduler, where transitions to the same state are combined.
+        It has the same state ids, labels and valuations as the mdp, and the expected rewards of the chosen actions.
+
+        Args:
+            compact: If True, the compact representation of the dtmc is returned instead of a model.
+        """
+        if self.model.get_type() != stormvogel.model.ModelType.MDP:
+            return None
+        from stormvogel.native.compact import from_compact, to_compact
+
+        chain = to_compact(self.model).induced_randomized(self.probabilities)
+        if compact:
+            return chain
+        return from_compact(
+            chain, [dict(state.valuations) for state in self.model.states.values()]
+        )
+
+    def __str__(self) -> str:
+        # models do not have a name (yet)
+        name = getattr(self.model, "name", None)
+        if name is not None:
+            add = "Randomized scheduler for model: " + name + "\n"
+        else:
+            add = ""
+        return (
+            add
+            + "distributions: "
+            + str(
+                {state_id: self.distribution(state_id) for state_id in self.state_ids}
+            )
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RandomizedScheduler):
+            return self.model is other.model and np.array_equal(
+                self.probabilities, other.probabilities
+            )
+        return False
+
+
+class FiniteMemoryScheduler:
+    """Deterministic scheduler with finitely many memory states, stored as two tables over memory states and states.
+    In each state, the action is chosen based on the current memory state.
+    After moving to a state s, the memory state m becomes updates[m, s].
+
+    Args:
+        model: mdp model associated with the scheduler
+        actions: an integer array with for each memory state (first axis) and state (second axis, in the order of
+            model.states) the position of the chosen action among the actions of the state
+        updates: an integer array with for each memory state and state the memory state after moving to that state
+        initial_memory: the memory state in the initial state
+    """
+
+    model: stormvogel.model.Model
+
+    def __init__(
+        self,
+        model: stormvogel.model.Model,
+        actions: np.ndarray,
+        updates: np.ndarray,
+        initial_memory: int = 0,
+    ):
+        self.model = model
+        self.state_ids, self.row_group_starts, self.row_actions = _row_layout(model)
+        self._index = {state_id: i for i, state_id in enumerate(self.state_ids)}
+        self.actions = np.asarray(actions, dtype=np.int64)
+        self.updates = np.asarray(updates, dtype=np.int64)
+        n = len(self.state_ids)
+        if self.actions.ndim != 2 or self.actions.shape[1] != n:
+            raise RuntimeError(
+                "The action table must contain one column for each state of the model."
+            )
+        if self.updates.shape != self.actions.shape:
+            raise RuntimeError(
+                "The update table must have the same shape as the action table."
+            )
+        self.nr_memory = self.actions.shape[0]
+        if not 0 <= initial_memory < self.nr_memory:
+            raise RuntimeError("The initial memory state does not exist.")
+        if (self.updates < 0).any() or (self.updates >= self.nr_memory).any():
+            raise RuntimeError(
+                "The update table refers to memory states that do not exist."
+            )
+        sizes = np.diff(self.row_group_starts)
+        if (self.actions < 0).any() or (self.actions >= sizes[None, :]).any():
+            raise RuntimeError("The action table refers to actions that do not exist.")
+        self.initial_memory = initial_memory
+        # the chosen row of each memory state and state
+        self.rows = self.row_group_starts[None, :-1] + self.actions
+        self._rows = self.rows.tolist()
+        self._updates = self.updates.tolist()
+
+    def _index_of(self, state: stormvogel.model.State | int) -> int:
+        state_id = state.id if isinstance(state, stormvogel.model.State) else state
+        if state_id not in self._index:
+            raise RuntimeError("This state is not a part of the model")
+        return self._index[state_id]
+
+    def choose(
+        self,
+        state: stormvogel.model.State | int,
+        memory: int = 0,
+        rng: random.Random | None = None,
+    ) -> stormvogel.model.Action:
+        """Returns the action in the given state and memory state. The random generator is ignored."""
+        return self.row_actions[self._rows[memory][self._index_of(state)]]
+
+    def next_memory(self, memory: int, state: stormvogel.model.State | int) -> int:
+        """Returns the memory state after moving to the given state."""
+        return self._updates[memory][self._index_of(state)]
+
+    def get_support_of_state(
+        self, state: stormvogel.model.State | int, validate: bool = True
+    ) -> list[stormvogel.model.Action]:
+        """Returns the actions that are chosen in the given state in any of the memory states."""
+        if validate:
+            state_id_of(self.model, state)
+        i = self._index_of(state)
+        return list(
+            dict.fromkeys(
+                self.row_actions[r] for r in sorted({rows[i] for rows in self._rows})
+            )
+        )
+
+    def support(self) -> dict[int, list[stormvogel.model.Action]]:
+        """Returns for each state id the actions that are chosen in any of the memory states."""
+        return {
+            state_id: self.get_support_of_state(state_id, validate=False)
+            for state_id in self.state_ids
+        }
+
+    def generate_induced_dtmc(
+        self, compact: bool = False
+    ) -> "stormvogel.model.Model | stormvogel.native.compact.CompactModel | None":
+        """Returns the dtmc that is induced by this scheduler, the product of the mdp with the memory.
+        The state with memory state m and (mdp) state at position i in model.states gets id m * len(model.states) + i.
+        All memory-state pairs are included, also the ones that cannot be reached. The states keep the labels and
+        the valuations of the mdp states, and get an extra valuation "memory".
+
+        Args:
+            compact: If True, the compact representation of the dtmc is returned instead of a model.
+        """
+        if self.model.get_type() != stormvogel.model.ModelType.MDP:
+            return None
+        from stormvogel.native.compact import from_compact, to_compact
+
+        chain = to_compact(self.model).induced_memory(
+            self.rows, self.updates, self.initial_memory
+        )
+        if compact:
+            return chain
+        return from_compact(
+            chain,
+            [
+                dict(state.valuations, memory=m)
+                for m in range(self.nr_memory)
+                for state in self.model.states.values()
+            ],
+        )
+
+    def __str__(self) -> str:
+        # models do not have a name (yet)
+        name = getattr(self.model, "name", None)
+        if name is not None:
+            add = "Finite-memory scheduler for model: " + name + "\n"
+        else:
+            add = ""
+        return (
+            add
+            + f"memory states: {self.nr_memory}, initial memory: {self.initial_memory}"
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FiniteMemoryScheduler):
+            return (
+                self.model is other.model
+                and self.initial_memory == other.initial_memory
+                and np.array_equal(self.actions, other.actions)
+                and np.array_equal(self.updates, other.updates)
+            )
+        return False
+
+
+def _require_pyarrow(message: str):
+    try:
+        import pyarrow  # NOQA
+    except ImportError:
+        raise RuntimeError(message) from None
+
+
+class _Values(dict):
+    """The values of a result. Changing them (in place) invalidates the array and the statistics of the result.
+    Pickled and copied values are plain dictionaries."""
+
+    def __init__(self, values, changed):
+        super().__init__(values)
+        self._changed = changed
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._changed()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
 class Result:
     """Result object represents the model checking results for a given model
 
     Args:
         model: stormvogel representation of the model associated with the results
-        values: for each state the model checking result
+        values: for each state the model checking result, either as a dictionary hashed by the state id
+            or as an array in the order of the states of the model (model.states)
         scheduler: in case the model is an mdp we can optionally store a scheduler
     """
 
     model: stormvogel.model.Model
-    # values are hashed by the state id:
-    values: dict[int, stormvogel.model.Value]
     scheduler: Scheduler | None
+    # the phases of the computation, if it was profiled (see stormpy_utils.profiling)
+    profile: dict | None
 
     def __init__(
         self,
         model: stormvogel.model.Model,
-        values: dict[int, stormvogel.model.Value],
+        values: dict[int, stormvogel.model.Value] | np.ndarray,
         scheduler: Scheduler | None = None,
     ):
         self.model = model
-        self.values = values
+        if isinstance(values, np.ndarray):
+            if len(values) != len(model.states):
+                raise RuntimeError(
+                    "The array of values must contain one value for each state of the model."
+                )
+            self._values = None
+            # a read-only copy, so the values cannot change behind the back of the statistics
+            self._array = np.array(values, dtype=np.float64)
+            self._array.flags.writeable = False
+            self._state_ids = list(model.states)
+            self._statistics = {}
+        else:
+            self.values = values
 
         if isinstance(scheduler, Scheduler):
             self.scheduler = scheduler
         else:
             self.scheduler = None
+        self.profile = None
+
+    @property
+    def values(self) -> dict[int, stormvogel.model.Value]:
+        """The values hashed by the state id. They can be changed in place."""
+        if self._values is None:
+            assert self._array is not None and self._state_ids is not None
+            self._values = _Values(
+                zip(self._state_ids, self._array.tolist()), self._values_changed
+            )
+        return self._values
+
+    @values.setter
+    def values(self, values: dict[int, stormvogel.model.Value]):
+        self._values = _Values(values, self._values_changed)
+        self._values_changed()
+
+    def _values_changed(self):
+        # the array and the statistics are computed again from the values when they are needed
+        self._array = None
+        self._state_ids = None
+        self._statistics = {}
+
+    @property
+    def array(self) -> np.ndarray:
+        """The values as a (read-only) float array in the order of the states of the model. Missing values are NaN."""
+        if self._array is None:
+            values = self.values
+            for v in values.values():
+                if isinstance(v, stormvogel.model.Interval) or isinstance(
+                    v, stormvogel.parametric.Parametric
+                ):
+                    raise RuntimeError(
+                        "Interval and parametric results cannot be stored in an array."
+                    )
+            self._state_ids = list(self.model.states)
+            self._array = np.array(
+                [values.get(state_id, np.nan) for state_id in self._state_ids],
+                dtype=np.float64,
+            )
+            self._array.flags.writeable = False
+        return self._array
+
+    @property
+    def state_ids(self) -> list[int]:
+        """The state ids in the order of the array."""
+        self.array
+        assert self._state_ids is not None
+        return self._state_ids
+
+    def _statistic(self, name: str, compute) -> stormvogel.model.Value:
+        # the statistics are computed once, until the values change
+        if name not in self._statistics:
+            try:
+                array = self.array
+            except RuntimeError:
+                raise RuntimeError(
+                    f"{name} result function does not work for interval/parametric models"
+                )
+            if len(array) == 0 or np.isnan(array).all():
+                raise RuntimeError("This result has no values.")
+            self._statistics[name] = compute(array)
+        return self._statistics[name]
 
     def get_result_of_state(
-        self, state: stormvogel.model.State | int
+        self, state: stormvogel.model.State | int, validate: bool = True
     ) -> stormvogel.model.Value | None:
-        """returns the model checking result for a given state"""
-        if isinstance(state, int) and state in self.model.states.keys():
-            return self.values[state]
-        if (
-            isinstance(state, stormvogel.model.State)
-            and state in self.model.states.values()
-        ):
-            return self.values[state.id]
+        """returns the model checking result for a given state.
+        Callers that know that the state is a part of the model can skip the check with validate=False."""
+        if validate:
+            state_id = state_id_of(self.model, state)
         else:
-            raise RuntimeError("This state is not a part of the model")
+            state_id = state.id if isinstance(state, stormvogel.model.State) else state
+        return self.values[state_id]
 
     def __str__(self) -> str:
         add = ""
-        if self.model.name is not None:
-            add = "model: " + str(self.model.name) + "\n"
+        # models do not have a name (yet)
+        name = getattr(self.model, "name", None)
+        if name is not None:
+            add = "model: " + str(name) + "\n"
         return (
             add
             + "values: \n "
@@ -136,26 +724,215 @@ class Result:
             + str(self.scheduler)
         )
 
+    def _value_at(self, index: int) -> stormvogel.model.Value:
+        """The stored value of the state at the given position of the array, so its type (e.g., int or bool) is kept."""
+        if self._values is None:
+            return self.array[index].item()
+        return self._values[self.state_ids[index]]
+
     def maximum_result(self) -> stormvogel.model.Value:
         """Return the maximum result."""
-        values = list(self.values.values())
-        max_val = values[0]
-        for v in values:
-            if isinstance(v, stormvogel.model.Interval) or isinstance(
-                v, stormvogel.parametric.Parametric
-            ):
-                raise RuntimeError(
-                    "maximum result function does not work for interval/parametric models"
-                )
-            assert isinstance(v, stormvogel.model.Number)
-            if v > max_val:
-                max_val = v
-        return max_val
+        return self._value_at(self._statistic("argmax", lambda a: int(np.nanargmax(a))))
+
+    def minimum_result(self) -> stormvogel.model.Value:
+        """Return the minimum result."""
+        return self._value_at(self._statistic("argmin", lambda a: int(np.nanargmin(a))))
+
+    def mean_result(self) -> float:
+        """Return the mean of the results of all states."""
+        return self._statistic("mean", lambda a: float(np.nanmean(a)))
+
+    def argmax_result(self) -> int:
+        """Return the id of the (first) state with the maximum result."""
+        return self.state_ids[self._statistic("argmax", lambda a: int(np.nanargmax(a)))]
+
+    def argmin_result(self) -> int:
+        """Return the id of the (first) state with the minimum result."""
+        return self.state_ids[self._statistic("argmin", lambda a: int(np.nanargmin(a)))]
+
+    def _states_where(self, mask: np.ndarray) -> set[int]:
+        return {self.state_ids[i] for i in np.flatnonzero(mask).tolist()}
+
+    def states_above(self, value: float, inclusive: bool = False) -> set[int]:
+        """The ids of the states with a result greater than (or, if inclusive, equal to) the value."""
+        return self._states_where(
+            self.array >= value if inclusive else self.array > value
+        )
+
+    def states_below(self, value: float, inclusive: bool = False) -> set[int]:
+        """The ids of the states with a result smaller than (or, if inclusive, equal to) the value."""
+        return self._states_where(
+            self.array <= value if inclusive else self.array < value
+        )
 
     def __eq__(self, other) -> bool:
         if isinstance(other, Result):
             return self.values == other.values and self.scheduler == other.scheduler
         return False
 
+    def __getitem__(
+        self, state: stormvogel.model.State | int
+    ) -> stormvogel.model.Value:
+        return self.values[
+            state.id if isinstance(state, stormvogel.model.State) else state
+        ]
+
     def __iter__(self):
         return iter(self.values.items())
+
+    def _chosen_rows(
+        self, compact: "stormvogel.native.compact.CompactModel"
+    ) -> np.ndarray:
+        """Returns for each state index the row of the chosen action (the empty action if there is no scheduler),
+        or -1 if the state does not have that action."""
+        import pandas as pd
+
+        if self.scheduler is None:
+            chosen = [stormvogel.model.EmptyAction] * compact.nr_states
+        else:
+            try:
+                chosen = self.scheduler.actions
+            except KeyError:
+                chosen = [
+                    self.scheduler.taken_actions.get(state_id)
+                    for state_id in compact.state_ids.tolist()
+                ]
+        # the actions are compared through their codes in a common set of categories
+        row_actions = pd.Categorical(compact.actions)
+        chosen_codes = pd.Categorical(chosen, categories=row_actions.categories).codes
+        row_states = compact.row_states()
+        matches = np.flatnonzero(
+            (row_actions.codes == chosen_codes[row_states]) & (row_actions.codes >= 0)
+        )
+        rows = np.full(compact.nr_states, -1, dtype=np.int64)
+        rows[row_states[matches]] = matches
+        return rows
+
+    def to_dataframe(
+        self, labels: bool = True, valuations: bool = False, rewards: bool = False
+    ) -> "pd.DataFrame":
+        """Returns the results as a dataframe with one row per state, in the order of the states of the model.
+        It has the columns "state" (the state id) and "value", and "action" if there is a scheduler.
+
+        Args:
+            labels: Whether to add the column "labels" with the labels of each state.
+            valuations: Whether to add a column "valuation_<variable>" for each variable of the valuations.
+            rewards: Whether to add a column "reward_<name>" for each reward model, with the reward of the
+                state and the chosen action (or the state reward if the model has no actions).
+        """
+        import pandas as pd
+        from stormvogel.native.compact import to_compact
+
+        try:
+            values = self.array
+        except RuntimeError:
+            values = [str(self.values.get(state_id)) for state_id in self.model.states]
+        columns = {
+            "state": np.fromiter(
+                self.model.states, dtype=np.int64, count=len(self.model.states)
+            ),
+            "value": values,
+        }
+        if self.scheduler is not None:
+            try:
+                actions = self.scheduler.actions
+            except KeyError:
+                actions = [
+                    self.scheduler.taken_actions.get(state_id)
+                    for state_id in self.model.states
+                ]
+            # one name per distinct action instead of one per state
+            categorical = pd.Categorical(actions)
+            columns["action"] = categorical.rename_categories(
+                [",".join(sorted(action.labels)) for action in categorical.categories]
+            )
+
+        compact = None
+        if labels or rewards:
+            try:
+                compact = to_compact(self.model)
+            except RuntimeError:
+                # parametric and interval models, or states without choices
+                pass
+        if labels:
+            state_labels: list[list[str]]
+            if compact is None:
+                state_labels = [
+                    list(state.labels) for state in self.model.states.values()
+                ]
+            else:
+                state_labels = [[] for _ in range(compact.nr_states)]
+                for label, indices in compact.labels.items():
+                    for i in indices.tolist():
+                        state_labels[i].append(label)
+            columns["labels"] = state_labels
+        if rewards and compact is not None:
+            rows = self._chosen_rows(compact)
+            for name, vector in compact.rewards.items():
+                columns["reward_" + name] = np.where(
+                    rows >= 0, vector[np.maximum(rows, 0)], np.nan
+                )
+        elif rewards:
+            # the rewards of parametric and interval models are not numbers, so they are looked up per state
+            chosen = (
+                [stormvogel.model.EmptyAction] * len(self.model.states)
+                if self.scheduler is None
+                else [
+                    self.scheduler.taken_actions.get(state_id)
+                    for state_id in self.model.states
+                ]
+            )
+            for reward_model in self.model.rewards:
+                columns["reward_" + reward_model.name] = [
+                    reward_model.rewards.get((state_id, action))
+                    for state_id, action in zip(self.model.states, chosen)
+                ]
+        df = pd.DataFrame(columns)
+        if valuations:
+            df = df.join(
+                pd.DataFrame.from_records(
+                    [state.valuations for state in self.model.states.values()]
+                ).add_prefix("valuation_")
+            )
+        return df
+
+    def to_parquet(self, path: str, **kwargs) -> None:
+        """Writes the dataframe of the results (see to_dataframe) to a parquet file. Requires pyarrow.
+
+        Args:
+            path: The path of the file.
+            kwargs: Passed to to_dataframe.
+        """
+        _require_pyarrow("Writing parquet files requires pyarrow. Use to_npz instead.")
+        self.to_dataframe(**kwargs).to_parquet(path)
+
+    def to_feather(self, path: str, **kwargs) -> None:
+        """Writes the dataframe of the results (see to_dataframe) to a feather file. Requires pyarrow.
+
+        Args:
+            path: The path of the file.
+            kwargs: Passed to to_dataframe.
+        """
+        _require_pyarrow("Writing feather files requires pyarrow. Use to_npz instead.")
+        self.to_dataframe(**kwargs).to_feather(path)
+
+    def to_npz(self, path: str, **kwargs) -> None:
+        """Writes the dataframe of the results (see to_dataframe) to a compressed numpy archive with one array per column.
+        Columns that are not numeric (e.g., actions and labels) are stored as strings. Does not require pyarrow.
+
+        Args:
+            path: The path of the file.
+            kwargs: Passed to to_dataframe.
+        """
+        import pandas as pd
+
+        df = self.to_dataframe(**kwargs)
+        arrays = {}
+        for name, column in df.items():
+            if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(
+                column
+            ):
+                arrays[str(name)] = column.to_numpy()
+            else:
+                arrays[str(name)] = column.astype(str).to_numpy(dtype=str)
+        np.savez_compressed(path, **arrays)
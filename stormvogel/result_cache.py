@@ -0,0 +1,334 @@
+"""Opt-in persistent cache of model checking results on disk.
+
+Results are stored under a key made from the model fingerprint, the (normalized) property or solver name,
+and the solver settings, so identical queries are not recomputed across restarts.
+
+Example:
+    stormvogel.result_cache.enable("~/.cache/stormvogel")
+    result = model_checking(model, prop)  # computed and stored
+    result = model_checking(model, prop)  # read from disk
+    print(stormvogel.result_cache.info())
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import threading
+from typing import Any, Callable
+
+import numpy as np
+
+import stormvogel
+import stormvogel.model
+import stormvogel.result
+import stormvogel.stormpy_utils.mapping as mapping
+
+
+# the version of the layout of the entries, to be increased when it changes
+FORMAT_VERSION = 2
+
+# arguments of solvers that do not change the result
+_IGNORED_ARGUMENTS = ("workers", "executor")
+
+
+def normalize_property(prop: str) -> str:
+    """Returns the property string with all whitespace collapsed into single spaces."""
+    return " ".join(prop.split())
+
+
+def _normalize(value: Any) -> Any:
+    """Turns a setting into something with a stable representation."""
+    if isinstance(value, stormvogel.model.State):
+        return ("state", value.id)
+    if isinstance(value, stormvogel.model.Action):
+        return ("action", sorted(value.labels))
+    if isinstance(value, stormvogel.result.Scheduler):
+        return (
+            "scheduler",
+            sorted(
+                (state_id, sorted(action.labels))
+                for state_id, action in value.taken_actions.items()
+            ),
+        )
+    if isinstance(value, np.ndarray):
+        return (
+            "array",
+            value.dtype.str,
+            value.shape,
+            hashlib.sha1(np.ascontiguousarray(value)).hexdigest(),
+        )
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return sorted((str(k), _normalize(v)) for k, v in value.items())
+    return value
+
+
+class ResultCache:
+    """Stores model checking results (value arrays and schedulers) as compressed numpy archives in a directory.
+    Files are written atomically (to a temporary file that is then renamed), so several processes can share a cache.
+    When the total size exceeds the maximum, the least recently used entries are removed.
+
+    Args:
+        directory: The directory of the cache. It is created if it does not exist.
+        max_size: The maximal total size of the cache in bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int = 1 << 30):
+        if max_size < 0:
+            raise RuntimeError("The cache size must be non-negative.")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def key(
+        self,
+        model: stormvogel.model.Model,
+        query: str,
+        settings: dict[str, Any],
+        fingerprint: str | None = None,
+    ) -> str:
+        """Returns the key of a query on a model with the given settings.
+        The key includes the versions of stormvogel and of the cache format, so results are computed again
+        after an upgrade (e.g., one that fixes a solver).
+        Computing the fingerprint of the model is the expensive part, so callers that look up several queries
+        on the same model should compute it once (see stormpy_utils.mapping.model_fingerprint) and pass it."""
+        if fingerprint is None:
+            fingerprint = mapping.model_fingerprint(model)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{FORMAT_VERSION}:{stormvogel.__version__}".encode())
+        h.update(fingerprint.encode())
+        h.update(normalize_property(query).encode())
+        h.update(repr(_normalize(settings)).encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(
+        self,
+        model: stormvogel.model.Model,
+        query: str,
+        settings: dict[str, Any],
+        fingerprint: str | None = None,
+    ) -> stormvogel.result.Result | list[stormvogel.result.Result] | None:
+        """Returns the cached result of a query, or None if it is not in the cache."""
+        path = self._path(self.key(model, query, settings, fingerprint))
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+            # reading counts as a use for the eviction order
+            os.utime(path)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError, KeyError):
+            # a damaged entry is removed and recomputed
+            self._remove(path)
+            self._count("misses")
+            return None
+        self._count("hits")
+        results = [self._decode(model, arrays, i) for i in range(int(arrays["count"]))]
+        return results if bool(arrays["is_list"]) else results[0]
+
+    def put(
+        self,
+        model: stormvogel.model.Model,
+        query: str,
+        settings: dict[str, Any],
+        result: stormvogel.result.Result | list[stormvogel.result.Result],
+        fingerprint: str | None = None,
+    ) -> bool:
+        """Stores the result of a query. Results with interval or parametric values are not stored.
+
+        Returns:
+            Whether the result was stored.
+        """
+        results = result if isinstance(result, list) else [result]
+        arrays: dict[str, np.ndarray] = {
+            "count": np.array(len(results)),
+            "is_list": np.array(isinstance(result, list)),
+        }
+        for i, r in enumerate(results):
+            try:
+                arrays[f"values_{i}"] = self._encode_values(model, r)
+            except RuntimeError:
+                return False
+            if r.scheduler is not None:
+                arrays[f"choices_{i}"] = self._encode_scheduler(model, r.scheduler)
+
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(
+                temporary, self._path(self.key(model, query, settings, fingerprint))
+            )
+        except BaseException:
+            self._remove(temporary)
+            raise
+        self._count("writes")
+        self._evict()
+        return True
+
+    def _encode_values(
+        self, model: stormvogel.model.Model, result: stormvogel.result.Result
+    ) -> np.ndarray:
+        """Stores the values in the order of model.states. Results with only bool or only int values
+        (e.g., of qualitative properties) are stored with that dtype, so they are restored with the same type."""
+        array = result.array
+        values = result.values
+        if len(values) == len(model.states):
+            kinds = {type(value) for value in values.values()}
+            if kinds == {bool}:
+                return np.array([values[s] for s in model.states], dtype=np.bool_)
+            if kinds == {int}:
+                return np.array([values[s] for s in model.states], dtype=np.int64)
+        return array
+
+    def _encode_scheduler(
+        self, model: stormvogel.model.Model, scheduler: stormvogel.result.Scheduler
+    ) -> np.ndarray:
+        """Stores for each state (in the order of model.states) the position of the chosen action among its actions."""
+        return np.array(
+            [
+                list(model.choices[state_id].transition).index(action)
+                for state_id, action in zip(model.states, scheduler.actions)
+            ],
+            dtype=np.int64,
+        )
+
+    def _decode(
+        self, model: stormvogel.model.Model, arrays: dict[str, np.ndarray], i: int
+    ) -> stormvogel.result.Result:
+        scheduler = None
+        if f"choices_{i}" in arrays:
+            scheduler = stormvogel.result.Scheduler(
+                model,
+                [
+                    list(model.choices[state_id].transition)[position]
+                    for state_id, position in zip(
+                        model.states, arrays[f"choices_{i}"].tolist()
+                    )
+                ],
+            )
+        values = arrays[f"values_{i}"]
+        if values.dtype != np.float64:
+            # bool and int values are given as a dictionary, since arrays of results are float arrays
+            return stormvogel.result.Result(
+                model, dict(zip(model.states, values.tolist())), scheduler
+            )
+        return stormvogel.result.Result(model, values, scheduler)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """Returns the last use, size and path of every entry, least recently used first."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".npz"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+            self._count("evictions")
+
+    def clear(self):
+        """Removes all entries."""
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def info(self) -> dict[str, int | float]:
+        """Returns the number of hits, misses, writes and evictions in this process,
+        the hit rate, and the current number of entries and size on disk."""
+        entries = self._entries()
+        with self._lock:
+            stats: dict[str, int | float] = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups > 0 else 0.0
+        stats["entries"] = len(entries)
+        stats["size"] = sum(entry_size for _, entry_size, _ in entries)
+        stats["max_size"] = self.max_size
+        return stats
+
+
+# the cache that is used by model checking and the native solvers, if enabled
+_active: ResultCache | None = None
+
+
+def enable(directory: str, max_size: int = 1 << 30) -> ResultCache:
+    """Enables the persistent result cache in the given directory (see ResultCache)."""
+    global _active
+    _active = ResultCache(directory, max_size)
+    return _active
+
+
+def disable():
+    """Disables the persistent result cache. The entries on disk are kept."""
+    global _active
+    _active = None
+
+
+def active() -> ResultCache | None:
+    """Returns the enabled cache, or None if the cache is disabled."""
+    return _active
+
+
+def info() -> dict[str, int | float] | None:
+    """Returns the statistics of the enabled cache (see ResultCache.info), or None if the cache is disabled."""
+    return None if _active is None else _active.info()
+
+
+def cached(function: Callable) -> Callable:
+    """Decorator for solvers that take a model as first argument and return a result (or a list of results).
+    If the cache is enabled, results are looked up by the model, the name of the solver and all other arguments."""
+    signature = inspect.signature(function)
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        cache = _active
+        if cache is None:
+            return function(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        model = arguments.pop(next(iter(signature.parameters)))
+        for argument in _IGNORED_ARGUMENTS:
+            arguments.pop(argument, None)
+        if model.is_parametric() or model.is_interval_model():
+            return function(*args, **kwargs)
+        fingerprint = mapping.model_fingerprint(model)
+        result = cache.get(model, name, arguments, fingerprint)
+        if result is None:
+            result = function(*args, **kwargs)
+            cache.put(model, name, arguments, result, fingerprint)
+        return result
+
+    return wrapper
@@ -124,15 +124,33 @@ class Path:
         return len(self.path)
 
 
+# schedulers that choose actions based on a memory state (memoryless schedulers have a single one)
+MemoryScheduler = (
+    stormvogel.result.Scheduler
+    | stormvogel.result.RandomizedScheduler
+    | stormvogel.result.FiniteMemoryScheduler
+)
+
+
 def get_action(
     state: stormvogel.model.State,
-    scheduler: stormvogel.result.Scheduler
+    scheduler: MemoryScheduler
     | Callable[[stormvogel.model.State], stormvogel.model.Action],
+    memory: int = 0,
 ) -> stormvogel.model.Action:
-    """Helper function to obtain the chosen action in a state by a scheduler."""
+    """Helper function to obtain the chosen action in a state by a scheduler.
+    Randomized schedulers sample the action with the global generator of the random module."""
     assert scheduler is not None
     if isinstance(scheduler, stormvogel.result.Scheduler):
         action = scheduler.get_choice_of_state(state)
+    elif isinstance(
+        scheduler,
+        (
+            stormvogel.result.RandomizedScheduler,
+            stormvogel.result.FiniteMemoryScheduler,
+        ),
+    ):
+        action = scheduler.choose(state, memory)
     elif callable(scheduler):
         action = scheduler(state)
     else:
@@ -184,7 +202,7 @@ def step(
 def simulate_path(
     model: stormvogel.model.Model,
     steps: int = 1,
-    scheduler: stormvogel.result.Scheduler
+    scheduler: MemoryScheduler
     | Callable[[stormvogel.model.State], stormvogel.model.Action]
     | None = None,
     seed: int | None = None,
@@ -196,6 +214,7 @@ def simulate_path(
         steps: The number of steps the simulator walks through the model.
         scheduler: A stormvogel scheduler to determine what actions should be taken. Random if not provided.
                     (instead of a stormvogel scheduler, a function from states to actions can also be provided.)
+                    Randomized and finite-memory schedulers are supported; the memory is reset at the start of each run.
         seed: The seed for the function that determines for each state what the next state will be. Random seed if not provided.
 
     Returns a path object.
@@ -219,10 +238,11 @@ def simulate_path(
             else:
                 break
     else:
+        memory = getattr(scheduler, "initial_memory", 0)
         for i in range(steps):
             # we first choose an action (randomly or according to scheduler)
             action = (
-                get_action(model.get_state_by_id(state_id), scheduler)
+                get_action(model.get_state_by_id(state_id), scheduler, memory)
                 if scheduler
                 else random.choice(model.get_state_by_id(state_id).available_actions())
             )
@@ -235,6 +255,8 @@ def simulate_path(
                     seed=seed + i if seed is not None else None,
                 )
                 path[i + 1] = (action, model.states[state_id])
+                if isinstance(scheduler, MemoryScheduler):
+                    memory = scheduler.next_memory(memory, state_id)
             else:
                 break
 
@@ -247,7 +269,7 @@ def simulate(
     model: stormvogel.model.Model,
     steps: int = 1,
     runs: int = 1,
-    scheduler: stormvogel.result.Scheduler
+    scheduler: MemoryScheduler
     | Callable[[stormvogel.model.State], stormvogel.model.Action]
     | None = None,
     seed: int | None = None,
@@ -260,6 +282,7 @@ def simulate(
         runs: The number of times the model gets simulated.
         scheduler: A stormvogel scheduler to determine what actions should be taken. Random if not provided.
                     (instead of a stormvogel scheduler, a function from states to actions can also be provided.)
+                    Randomized and finite-memory schedulers are supported; the memory is reset at the start of each run.
         seed: The seed for the function that determines for each state what the next state will be. Random seed if not provided.
 
     Returns the partial model discovered by all the runs of the simulator together
@@ -377,10 +400,11 @@ def simulate(
         for i in range(runs):
             # we start at state 0 and we begin taking steps
             last_state_id = 0
+            memory = getattr(scheduler, "initial_memory", 0)
             for j in range(steps):
                 # we first choose an action
                 action = (
-                    get_action(model.get_state_by_id(last_state_id), scheduler)
+                    get_action(model.get_state_by_id(last_state_id), scheduler, memory)
                     if scheduler
                     else random.choice(
                         model.get_state_by_id(last_state_id).available_actions()
@@ -453,5 +477,7 @@ def simulate(
                         s.add_choice(trans)
 
                 last_state_id = state_id
+                if isinstance(scheduler, MemoryScheduler):
+                    memory = scheduler.next_memory(memory, state_id)
 
     return partial_model
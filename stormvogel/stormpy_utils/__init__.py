@@ -1,3 +1,4 @@
 from stormvogel.stormpy_utils.convert_results import *  # NOQA
 from stormvogel.stormpy_utils.mapping import *  # NOQA
+from stormvogel.stormpy_utils import profiling  # NOQA
 # Note that we do not import magic here! This is done in the __init__.py of stormvogel itself.
@@ -9,10 +9,28 @@ except ImportError:
 
 
 def convert_scheduler_to_stormvogel(
-    model: stormvogel.model.Model, stormpy_scheduler: "stormpy.storage.Scheduler"
+    model: stormvogel.model.Model,
+    stormpy_scheduler: "stormpy.storage.Scheduler",
+    choice_table: list[tuple[int, stormvogel.model.Action]] | None = None,
 ):
-    """Converts a stormpy scheduler to a stormvogel scheduler"""
+    """Converts a stormpy scheduler to a stormvogel scheduler.
+    If a choice table (see mapping.choice_table) is given, it is used to map the stormpy choices to the actions of the model.
+    Otherwise, the state ids of the model are assumed to be the stormpy state indices."""
     taken_actions = {}
+    if choice_table is not None:
+        # the choices of a state are consecutive in the table
+        index = -1
+        previous = None
+        for row, (state_id, action) in enumerate(choice_table):
+            if state_id != previous:
+                index += 1
+                previous = state_id
+                choice = stormpy_scheduler.get_choice(index)
+                chosen = row + choice.get_deterministic_choice()
+            if row == chosen:
+                taken_actions[state_id] = action
+        return stormvogel.result.Scheduler(model, taken_actions)
+
     for state in model.states.values():
         av_act = state.available_actions()
         choice = stormpy_scheduler.get_choice(state.id)
@@ -30,12 +48,18 @@ def convert_model_checking_result(
         "stormpy.ExplicitParametricQuantitativeCheckResult",
     ],
     with_scheduler: bool = True,
+    choice_table: list[tuple[int, stormvogel.model.Action]] | None = None,
 ) -> stormvogel.result.Result | None:
     """
-    Takes a model checking result from stormpy and its associated model and converts it to a stormvogel representation
+    Takes a model checking result from stormpy and its associated model and converts it to a stormvogel representation.
+    If a choice table (see mapping.choice_table) is given, the result refers to the states and actions of the given model
+    even if its state ids are not the stormpy state indices.
     """
     assert stormpy is not None
 
+    # the stormpy state indices follow the order of the states in the model
+    state_ids = list(model.states) if choice_table is not None else None
+
     # we distinguish between quantitative and qualitative results
     # (determines what kind of values our result contains)
     if (
@@ -49,6 +73,8 @@ def convert_model_checking_result(
         values = {i: stormpy_result.at(i) for i in range(0, len(model.states))}
     else:
         raise RuntimeError("Unsupported result type")
+    if state_ids is not None:
+        values = {state_ids[index]: value for index, value in values.items()}
 
     # we check if our results and expected converted results come with a scheduler
     if stormpy_result.has_scheduler and with_scheduler:
@@ -56,7 +82,9 @@ def convert_model_checking_result(
         stormvogel_result = stormvogel.result.Result(
             model,
             values,
-            scheduler=convert_scheduler_to_stormvogel(model, stormpy_result.scheduler),
+            scheduler=convert_scheduler_to_stormvogel(
+                model, stormpy_result.scheduler, choice_table
+            ),
         )
     else:
         # we build the results object without a scheduler
@@ -1,10 +1,16 @@
 import stormvogel.model
+import stormvogel.native.compact
 import re
 import stormvogel.parametric as parametric
+import stormvogel.stormpy_utils.profiling as profiling
 
+import hashlib
 import json
+from collections import OrderedDict
 from typing import Optional, Union, cast
 
+import numpy as np
+
 try:
     import stormpy
 except ImportError:
@@ -82,8 +88,267 @@ def value_to_stormpy(
         return value
 
 
+# cache of converted models, from model fingerprint to stormpy model (least recently used first)
+_conversion_cache: OrderedDict[str, object] = OrderedDict()
+_conversion_cache_size = 16
+_conversion_cache_stats = {"hits": 0, "misses": 0}
+
+
+def model_fingerprint(model: stormvogel.model.Model) -> str:
+    """Returns a hash of everything in a model that ends up in its stormpy representation.
+    Two models with the same fingerprint are converted to the same stormpy model.
+    The transitions, rewards and rates are hashed as (CSR) arrays, see stormvogel.native.compact.transition_arrays."""
+    if model.is_parametric() or model.is_interval_model():
+        # parametric or interval values do not fit in float arrays
+        return _object_fingerprint(model)
+    try:
+        row_group_starts, row_starts, columns, values, actions = (
+            stormvogel.native.compact.transition_arrays(model)
+        )
+    except (RuntimeError, TypeError, ValueError):
+        # states without choices, or values that are not numbers
+        return _object_fingerprint(model)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model.get_type().name.encode())
+    state_ids = np.fromiter(model.states, dtype=np.int64, count=len(model.states))
+    h.update(state_ids.tobytes())
+    h.update(
+        repr(
+            [
+                (
+                    sorted(state.labels),
+                    sorted(state.valuations.items()),
+                    None
+                    if state.observation is None
+                    else state.observation.observation,
+                )
+                for state in model.states.values()
+            ]
+        ).encode()
+    )
+    for array in (row_group_starts, row_starts, columns, values):
+        h.update(array.tobytes())
+
+    # the actions are numbered in the order in which they first appear
+    action_numbers: dict[stormvogel.model.Action, int] = {}
+    h.update(
+        np.array(
+            [
+                action_numbers.setdefault(action, len(action_numbers))
+                for action in actions
+            ],
+            dtype=np.int64,
+        ).tobytes()
+    )
+    h.update(repr([sorted(action.labels) for action in action_numbers]).encode())
+
+    # rewards that are not set are nan, so they differ from rewards that are set to zero
+    row_keys = list(
+        zip(np.repeat(state_ids, np.diff(row_group_starts)).tolist(), actions)
+    )
+    try:
+        for reward_model in model.rewards:
+            h.update(reward_model.name.encode())
+            h.update(
+                np.array(
+                    [reward_model.rewards.get(key, np.nan) for key in row_keys],
+                    dtype=np.float64,
+                ).tobytes()
+            )
+        if model.exit_rates is not None:
+            h.update(
+                np.array(
+                    [
+                        model.exit_rates.get(state_id, np.nan)
+                        for state_id in model.states
+                    ],
+                    dtype=np.float64,
+                ).tobytes()
+            )
+    except TypeError:
+        return _object_fingerprint(model)
+    if model.markovian_states is not None:
+        h.update(
+            np.array(
+                sorted(s.id for s in model.markovian_states), dtype=np.int64
+            ).tobytes()
+        )
+    return h.hexdigest()
+
+
+def _object_fingerprint(model: stormvogel.model.Model) -> str:
+    """The fingerprint of models whose values are not numbers (parametric or interval models)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model.get_type().name.encode())
+    for state_id, state in model.states.items():
+        h.update(
+            repr(
+                (
+                    state_id,
+                    sorted(state.labels),
+                    sorted(state.valuations.items()),
+                    None
+                    if state.observation is None
+                    else state.observation.observation,
+                )
+            ).encode()
+        )
+    for state_id, choice in sorted(model.choices.items()):
+        for action, branch in choice:
+            h.update(
+                repr(
+                    (
+                        state_id,
+                        sorted(action.labels),
+                        sorted((s.id, str(value)) for value, s in branch),
+                    )
+                ).encode()
+            )
+    for reward_model in model.rewards:
+        h.update(
+            repr(
+                (
+                    reward_model.name,
+                    sorted(
+                        (state_id, sorted(action.labels), str(value))
+                        for (state_id, action), value in reward_model.rewards.items()
+                    ),
+                )
+            ).encode()
+        )
+    if model.exit_rates is not None:
+        h.update(
+            repr(sorted((k, str(v)) for k, v in model.exit_rates.items())).encode()
+        )
+    if model.markovian_states is not None:
+        h.update(repr(sorted(s.id for s in model.markovian_states)).encode())
+    return h.hexdigest()
+
+
+def set_conversion_cache_size(size: int):
+    """Sets the maximal number of converted models that are kept. A size of 0 disables the cache."""
+    global _conversion_cache_size
+    if size < 0:
+        raise RuntimeError("The cache size must be non-negative.")
+    _conversion_cache_size = size
+    while len(_conversion_cache) > size:
+        _conversion_cache.popitem(last=False)
+
+
+def clear_conversion_cache(model: stormvogel.model.Model | None = None):
+    """Removes the conversion of the given model from the cache, or all conversions if no model is given."""
+    if model is None:
+        _conversion_cache.clear()
+    else:
+        _conversion_cache.pop(model_fingerprint(model), None)
+
+
+def conversion_cache_info() -> dict[str, int]:
+    """Returns the number of hits and misses of the conversion cache, and its current and maximal size."""
+    return {
+        "hits": _conversion_cache_stats["hits"],
+        "misses": _conversion_cache_stats["misses"],
+        "size": len(_conversion_cache),
+        "max_size": _conversion_cache_size,
+    }
+
+
+def sparse_matrix_from_csr(
+    row_group_starts: np.ndarray,
+    row_starts: np.ndarray,
+    columns: np.ndarray,
+    values: np.ndarray,
+    nondeterministic: bool,
+) -> "stormpy.storage.SparseMatrix":
+    """Builds a stormpy sparse matrix from CSR arrays (see stormvogel.native.compact.CompactModel).
+    The row groups are only used if the matrix is nondeterministic."""
+    assert stormpy is not None
+
+    # stormpy needs the entries of every row to be sorted by column
+    rows = np.repeat(np.arange(len(row_starts) - 1), np.diff(row_starts))
+    order = np.lexsort((columns, rows))
+    builder = stormpy.SparseMatrixBuilder(
+        rows=0,
+        columns=0,
+        entries=0,
+        force_dimensions=False,
+        has_custom_row_grouping=nondeterministic,
+        row_groups=0,
+    )
+    groups = row_group_starts[:-1].tolist() if nondeterministic else []
+    if hasattr(builder, "add_next_values"):
+        builder.add_next_values(
+            rows[order].tolist(),
+            columns[order].tolist(),
+            values[order].tolist(),
+            groups,
+        )
+    else:
+        # older versions of stormpy can only add one value at a time
+        group_starts = set(groups)
+        for row, column, value in zip(
+            rows[order].tolist(), columns[order].tolist(), values[order].tolist()
+        ):
+            if row in group_starts:
+                group_starts.remove(row)
+                builder.new_row_group(row)
+            builder.add_next_value(row=row, column=column, value=value)
+    return builder.build()
+
+
+def choice_table(
+    model: stormvogel.model.Model,
+) -> list[tuple[int, stormvogel.model.Action]]:
+    """Returns for each choice (row) index of the stormpy representation of a model the state id and action it belongs to.
+    The stormpy states are the states of the model in order, and the choices of each state are in the order of its actions."""
+    return [
+        (state_id, action)
+        for state_id in model.states
+        for action in model.choices[state_id].transition
+    ]
+
+
 def stormvogel_to_stormpy(
     model: stormvogel.model.Model,
+    use_cache: bool = True,
+    fingerprint: str | None = None,
+) -> Optional[
+    Union[
+        "stormpy.storage.SparseDtmc",
+        "stormpy.storage.SparseMdp",
+        "stormpy.storage.SparseCtmc",
+        "stormpy.storage.SparsePomdp",
+    ]
+]:
+    """Converts a stormvogel model to a stormpy model.
+    Conversions are cached by model fingerprint, so converting an unchanged model again returns the same stormpy model.
+    Parametric models are never cached, because their variables are recreated on every conversion.
+    A fingerprint of the model that the caller already computed can be passed to avoid computing it again."""
+    if not use_cache or _conversion_cache_size == 0 or model.is_parametric():
+        return _stormvogel_to_stormpy(model)
+
+    if fingerprint is None:
+        fingerprint = model_fingerprint(model)
+    if fingerprint in _conversion_cache:
+        _conversion_cache_stats["hits"] += 1
+        profiling.count("conversion_cache_hits", 1)
+        _conversion_cache.move_to_end(fingerprint)
+        model.stormpy_id = {
+            stormvogel_id: index for index, stormvogel_id in enumerate(model.states)
+        }
+        return _conversion_cache[fingerprint]  # type: ignore
+
+    _conversion_cache_stats["misses"] += 1
+    stormpy_model = _stormvogel_to_stormpy(model)
+    _conversion_cache[fingerprint] = stormpy_model
+    if len(_conversion_cache) > _conversion_cache_size:
+        _conversion_cache.popitem(last=False)
+    return stormpy_model
+
+
+def _stormvogel_to_stormpy(
+    model: stormvogel.model.Model,
 ) -> Optional[
     Union[
         "stormpy.storage.SparseDtmc",
@@ -109,7 +374,22 @@ def stormvogel_to_stormpy(
         is_parametric = model.is_parametric()
         is_interval = model.is_interval_model()
 
-        # we distinguish between parametric, interval and regular models
+        # the choices are added to the choice labeling in the order of choice_table
+        if choice_labeling is not None:
+            for row_index, (_, action) in enumerate(choice_table(model)):
+                for label in action.labels:
+                    choice_labeling.add_label_to_choice(str(label), row_index)
+
+        # regular models are built from numpy arrays (CSR) in one go
+        if not is_parametric and not is_interval:
+            row_group_starts, row_starts, columns, values, _ = (
+                stormvogel.native.compact.transition_arrays(model)
+            )
+            return sparse_matrix_from_csr(
+                row_group_starts, row_starts, columns, values, nondeterministic
+            )
+
+        # we distinguish between parametric and interval models
         if is_parametric:
             builder = stormpy.ParametricSparseMatrixBuilder(
                 rows=0,
@@ -119,17 +399,8 @@ def stormvogel_to_stormpy(
                 has_custom_row_grouping=nondeterministic,
                 row_groups=0,
             )
-        elif is_interval:
-            builder = stormpy.IntervalSparseMatrixBuilder(
-                rows=0,
-                columns=0,
-                entries=0,
-                force_dimensions=False,
-                has_custom_row_grouping=nondeterministic,
-                row_groups=0,
-            )
         else:
-            builder = stormpy.SparseMatrixBuilder(
+            builder = stormpy.IntervalSparseMatrixBuilder(
                 rows=0,
                 columns=0,
                 entries=0,
@@ -138,28 +409,21 @@ def stormvogel_to_stormpy(
                 row_groups=0,
             )
 
-        # we build the matrix
+        # we build the matrix entry by entry, the rows are in the same order as in choice_table
         row_index = 0
-        for transition in sorted(model.choices.items()):
+        for state_id in model.stormpy_id:
             if nondeterministic:
                 builder.new_row_group(row_index)
-            for action in transition[1]:
-                action[1].sort_states()
-                for tuple in action[1]:
-                    val = value_to_stormpy(tuple[0], variables, model)
+            for action, branch in model.choices[state_id]:
+                # the entries are sorted by column without changing the model
+                for value, target in sorted(
+                    branch, key=lambda entry: model.stormpy_id[entry[1].id]
+                ):
                     builder.add_next_value(
                         row=row_index,
-                        column=model.stormpy_id[tuple[1].id],
-                        value=val,
+                        column=model.stormpy_id[target.id],
+                        value=value_to_stormpy(value, variables, model),
                     )
-
-                # if there is an action then add the label to the choice
-                if (
-                    not action[0] == stormvogel.model.EmptyAction
-                    and choice_labeling is not None
-                ):
-                    for label in action[0].labels:
-                        choice_labeling.add_label_to_choice(str(label), row_index)
                 row_index += 1
 
         matrix = builder.build()
@@ -709,6 +973,155 @@ def value_to_stormvogel(value, sparsemodel) -> stormvogel.model.Value:
         return float(value)
 
 
+def _bitvector_indices(bitvector) -> np.ndarray:
+    return np.fromiter(bitvector, dtype=np.int64)
+
+
+def stormpy_to_compact(
+    sparsemodel: Union[
+        "stormpy.storage.SparseDtmc",
+        "stormpy.storage.SparseMdp",
+        "stormpy.storage.SparseCtmc",
+        "stormpy.storage.SparsePomdp",
+        "stormpy.storage.SparseMA",
+    ],
+) -> "stormvogel.native.compact.CompactModel":
+    """Reads a (non-parametric, non-interval) stormpy model into the compact representation.
+    The matrix is read in a single pass over its entries and everything else in bulk, so this also works for large models.
+    State i of the stormpy model gets id i.
+    """
+    assert stormpy is not None
+    if sparsemodel.has_parameters or sparsemodel.supports_uncertainty:
+        raise RuntimeError(
+            "The compact representation does not support parametric or interval models."
+        )
+    model_type = stormvogel.model.ModelType[sparsemodel.model_type.name]
+    nr_states = sparsemodel.nr_states
+    matrix = sparsemodel.transition_matrix
+    nr_rows = matrix.nr_rows
+    nr_entries = matrix.nr_entries
+
+    if sparsemodel.is_nondeterministic_model:
+        row_group_starts = np.array(
+            list(sparsemodel.nondeterministic_choice_indices), dtype=np.int64
+        )
+    else:
+        row_group_starts = np.arange(nr_states + 1, dtype=np.int64)
+    row_lengths = np.fromiter(
+        (len(matrix.get_row(r)) for r in range(nr_rows)), dtype=np.int64, count=nr_rows
+    )
+    row_starts = np.concatenate(([0], np.cumsum(row_lengths))).astype(np.int64)
+
+    # the end of row_iter is inclusive
+    entries = list(matrix.row_iter(0, nr_rows - 1)) if nr_rows > 0 else []
+    if len(entries) != nr_entries:
+        entries = [entry for r in range(nr_rows) for entry in matrix.get_row(r)]
+    columns = np.fromiter(
+        (entry.column for entry in entries), dtype=np.int64, count=nr_entries
+    )
+    values = np.fromiter(
+        (entry.value() for entry in entries), dtype=np.float64, count=nr_entries
+    )
+
+    if model_type in (stormvogel.model.ModelType.DTMC, stormvogel.model.ModelType.CTMC):
+        actions = [stormvogel.model.EmptyAction] * nr_rows
+    elif sparsemodel.has_choice_labeling():
+        row_labels: list[list[str]] = [[] for _ in range(nr_rows)]
+        for label in sparsemodel.choice_labeling.get_labels():
+            for r in sparsemodel.choice_labeling.get_choices(label):
+                row_labels[r].append(label)
+        # choices with the same labels in the same state are told apart by their row, as without choice labeling
+        actions = []
+        row_group_list = row_group_starts.tolist()
+        for start, end in zip(row_group_list, row_group_list[1:]):
+            group = [frozenset(labels) for labels in row_labels[start:end]]
+            if len(set(group)) < len(group):
+                group = [
+                    labels if group.count(labels) == 1 else frozenset({str(r)})
+                    for r, labels in enumerate(group, start)
+                ]
+            actions.extend(stormvogel.model.Action(labels) for labels in group)
+    else:
+        actions = [stormvogel.model.Action(frozenset({str(r)})) for r in range(nr_rows)]
+
+    labels = {
+        label: _bitvector_indices(sparsemodel.labeling.get_states(label))
+        for label in sparsemodel.labeling.get_labels()
+    }
+
+    row_counts = np.diff(row_group_starts)
+    rewards = {}
+    for name, reward_model in sparsemodel.reward_models.items():
+        if reward_model.has_state_action_rewards:
+            rewards[name] = np.array(
+                list(reward_model.state_action_rewards), dtype=np.float64
+            )
+        else:
+            rewards[name] = np.repeat(
+                np.array(list(reward_model.state_rewards), dtype=np.float64),
+                row_counts,
+            )
+
+    exit_rates = None
+    if model_type in (stormvogel.model.ModelType.CTMC, stormvogel.model.ModelType.MA):
+        exit_rates = np.array(list(sparsemodel.exit_rates), dtype=np.float64)
+
+    # stormpy finds the initial states through the init label, which may be missing
+    initial_states = labels.get("init", [])
+    return stormvogel.native.compact.CompactModel(
+        type=model_type,
+        state_ids=np.arange(nr_states, dtype=np.int64),
+        row_group_starts=row_group_starts,
+        row_starts=row_starts,
+        columns=columns,
+        values=values,
+        actions=actions,
+        labels=labels,
+        initial_state=int(initial_states[0]) if len(initial_states) > 0 else 0,
+        rewards=rewards,
+        exit_rates=exit_rates,
+    )
+
+
+def stormpy_valuations(sparsemodel) -> list[dict[str, int | float | bool]] | None:
+    """Returns the valuations of the states of a stormpy model, or None if it has none.
+    The valuations are read per variable (column-wise) instead of per state."""
+    if not sparsemodel.has_state_valuations():
+        return None
+    valuations = sparsemodel.state_valuations
+    variables = sorted(valuations.get_all_variables(), key=lambda v: v.name)
+    columns = []
+    for variable in variables:
+        column = valuations.get_values_states(variable)
+        if variable.has_boolean_type():
+            columns.append([bool(x) for x in column])
+        elif variable.has_integer_type():
+            columns.append([int(x) for x in column])
+        else:
+            columns.append([float(x) for x in column])
+    names = [variable.name for variable in variables]
+    if not columns:
+        return [{} for _ in range(sparsemodel.nr_states)]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _bulk_stormpy_to_stormvogel(sparsemodel) -> stormvogel.model.Model:
+    """Creates a stormvogel model from a (non-parametric, non-interval) stormpy model via the compact representation."""
+    compact = stormpy_to_compact(sparsemodel)
+    model = stormvogel.native.compact.from_compact(
+        compact, stormpy_valuations(sparsemodel)
+    )
+    if compact.type == stormvogel.model.ModelType.POMDP:
+        for state, observation in zip(model.states.values(), sparsemodel.observations):
+            state.set_observation(observation)
+    elif compact.type == stormvogel.model.ModelType.MA:
+        model.markovian_states = [
+            model.states[i]
+            for i in _bitvector_indices(sparsemodel.markovian_states).tolist()
+        ]
+    return model
+
+
 def stormpy_to_stormvogel(
     sparsemodel: Union[
         "stormpy.storage.SparseDtmc",
@@ -718,7 +1131,11 @@ def stormpy_to_stormvogel(
         "stormpy.storage.SparseMA",
     ],
 ) -> stormvogel.model.Model | None:
+    """Converts a stormpy model to a stormvogel model.
+    Models without parameters or intervals are read in bulk (see stormpy_to_compact)."""
     assert stormpy is not None
+    if not (sparsemodel.has_parameters or sparsemodel.supports_uncertainty):
+        return _bulk_stormpy_to_stormvogel(sparsemodel)
 
     def add_states(
         model: stormvogel.model.Model,
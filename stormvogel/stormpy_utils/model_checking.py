@@ -1,7 +1,14 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+import contextvars
+import os
+
 import stormvogel.stormpy_utils.mapping as mapping
 import stormvogel.stormpy_utils.convert_results as convert_results
+import stormvogel.stormpy_utils.profiling as profiling
 import stormvogel.model
 import stormvogel.property_builder
+from stormvogel.native.compact import CompactModel, from_compact, to_compact
+import stormvogel.result_cache as result_cache
 
 try:
     import stormpy
@@ -10,53 +17,248 @@ except ImportError:
 
 
 def model_checking(
-    model: stormvogel.model.Model, prop: str | None = None, scheduler: bool = True
+    model: stormvogel.model.Model,
+    prop: str | None = None,
+    scheduler: bool = True,
+    profile: bool = False,
 ) -> stormvogel.result.Result | None:
     """
     Instead of calling this function, the stormpy model checker can be used by first mapping a model to a stormpy model,
     then calling the stormpy model checker with it followed by converting the model checker result to a stormvogel result.
     This function just performs this procedure automatically.
+    If profile is True, the time spent in each phase is stored in the profile attribute of the result (see profiling.Profiler).
+    If the persistent result cache is enabled (see stormvogel.result_cache), results are looked up there first.
     """
 
     assert stormpy is not None
 
-    if not model.is_stochastic():
-        raise RuntimeError(
-            "We can only do model checking on stochastic models. Make sure that all outgoing transition probabilities sum to one in each state."
-        )
-
     # the user must provide a property string, otherwise we provide the widget for building one
     if prop:
-        # we first map the model to a stormpy model
-        stormpy_model = mapping.stormvogel_to_stormpy(model)
+        return _check_properties(model, [prop], scheduler, None, profile)[0]
+    else:
+        print(
+            "You have not proved a property string. You can create a simple one using this widget."
+        )
+        stormvogel.property_builder.build_property_string(model)
+        return None
 
-        # we perform the model checking operation
-        prop = stormpy.parse_properties(prop)
-        assert prop is not None
-        if model.supports_actions() and scheduler:
-            stormpy_result = stormpy.model_checking(
-                stormpy_model, prop[0], extract_scheduler=True
+
+def model_checking_batch(
+    model: stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool = True,
+    executor: Executor | None = None,
+    profile: bool = False,
+) -> list[stormvogel.result.Result]:
+    """
+    Model checks several properties on the same model. The model is checked and converted to stormpy only once,
+    and all properties are parsed together. The results are returned in the order of the properties.
+    If an executor is given, the properties are checked concurrently on it.
+    With a thread pool, the model is converted once, but stormpy holds the GIL while checking, so there is little speedup.
+    With a process pool (or any other executor), the properties are split into one chunk per cpu, and the model is sent
+    to the workers in compact form and converted once per chunk. Phases that run in other processes are not profiled.
+    If profile is True, the time spent in each phase (of the whole batch) is stored in the profile attribute of the results.
+    """
+
+    assert stormpy is not None
+
+    return _check_properties(model, props, scheduler, executor, profile)
+
+
+def _check_properties(
+    model: stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool,
+    executor: Executor | None,
+    profile: bool = False,
+) -> list[stormvogel.result.Result]:
+    cache = result_cache.active()
+    if (
+        cache is not None
+        and not model.is_parametric()
+        and not model.is_interval_model()
+    ):
+        # only the properties that are not in the (persistent) cache are checked
+        settings = {
+            "engine": "stormpy",
+            "stormpy": stormpy.__version__,
+            "scheduler": scheduler,
+        }
+        fingerprint = mapping.model_fingerprint(model)
+        results = [cache.get(model, prop, settings, fingerprint) for prop in props]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = _check_properties_uncached(
+                model,
+                [props[i] for i in missing],
+                scheduler,
+                executor,
+                profile,
+                fingerprint,
             )
-        else:
-            stormpy_result = stormpy.model_checking(stormpy_model, prop[0])
+            for i, result in zip(missing, computed):
+                cache.put(model, props[i], settings, result, fingerprint)
+                results[i] = result
+        return results  # type: ignore
+    return _check_properties_uncached(model, props, scheduler, executor, profile)
 
-        # to get the correct action labels, we need to convert the model back to stormvogel instead of
-        # using the initial one for now. (otherwise schedulers won't work)
-        stormvogel_model = mapping.stormpy_to_stormvogel(stormpy_model)
 
-        # we convert the results
-        assert stormvogel_model is not None
-        stormvogel_result = convert_results.convert_model_checking_result(
-            stormvogel_model, stormpy_result
+def _check_properties_uncached(
+    model: stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool,
+    executor: Executor | None,
+    profile: bool = False,
+    fingerprint: str | None = None,
+) -> list[stormvogel.result.Result]:
+    if not profile:
+        return _check_properties_in_phases(
+            model, props, scheduler, executor, fingerprint
+        )
+    with profiling.Profiler() as profiler:
+        results = _check_properties_in_phases(
+            model, props, scheduler, executor, fingerprint
+        )
+    for result in results:
+        result.profile = profiler.to_dict()
+    return results
+
+
+def _validate(model: stormvogel.model.Model):
+    with profiling.phase("validation"):
+        if not model.is_stochastic():
+            raise RuntimeError(
+                "We can only do model checking on stochastic models. Make sure that all outgoing transition probabilities sum to one in each state."
+            )
+
+
+def _pack(
+    model: stormvogel.model.Model,
+) -> tuple[CompactModel, list[dict[str, int | float | bool]]] | stormvogel.model.Model:
+    """Returns the form in which a model is sent to a worker process.
+    Markov chains and MDPs are sent in compact form together with their valuations, which is much cheaper to pickle
+    than the object graph of the model. Other models are sent as they are."""
+    if (
+        model.get_type()
+        in (
+            stormvogel.model.ModelType.DTMC,
+            stormvogel.model.ModelType.MDP,
+            stormvogel.model.ModelType.CTMC,
+        )
+        and not model.is_parametric()
+        and not model.is_interval_model()
+    ):
+        return to_compact(model), [state.valuations for state in model.states.values()]
+    return model
+
+
+def _check_chunk(
+    packed: tuple[CompactModel, list[dict[str, int | float | bool]]]
+    | stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool,
+) -> list[
+    tuple[dict[int, stormvogel.model.Value], dict[int, stormvogel.model.Action] | None]
+]:
+    """Runs in a worker process: rebuilds the model, checks the properties and returns for each property
+    the values and the chosen actions. The rebuilt model has the same state ids as the original one."""
+    model = (
+        packed if isinstance(packed, stormvogel.model.Model) else from_compact(*packed)
+    )
+    return [
+        (
+            result.values,
+            None if result.scheduler is None else result.scheduler.taken_actions,
         )
+        for result in _check_properties_in_phases(model, props, scheduler, None)
+    ]
+
+
+def _check_in_processes(
+    model: stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool,
+    executor: Executor,
+) -> list[stormvogel.result.Result]:
+    """Checks the properties in chunks on an executor whose tasks must be picklable (e.g., a process pool)."""
+    packed = _pack(model)
+    nr_chunks = max(1, min(len(props), os.cpu_count() or 1))
+    chunks = [props[i::nr_chunks] for i in range(nr_chunks)]
+    with profiling.phase("workers"):
+        futures = [
+            executor.submit(_check_chunk, packed, chunk, scheduler) for chunk in chunks
+        ]
+        outcomes = [future.result() for future in futures]
+
+    # the chunks take every nr_chunks-th property, so we put the results back in the order of the properties
+    results: list[stormvogel.result.Result] = [None] * len(props)  # type: ignore
+    for i, outcome in enumerate(outcomes):
+        for j, (values, taken_actions) in enumerate(outcome):
+            results[i + j * nr_chunks] = stormvogel.result.Result(
+                model,
+                values,
+                None
+                if taken_actions is None
+                else stormvogel.result.Scheduler(model, taken_actions),
+            )
+    return results
+
+
+def _check_properties_in_phases(
+    model: stormvogel.model.Model,
+    props: list[str],
+    scheduler: bool,
+    executor: Executor | None,
+    fingerprint: str | None = None,
+) -> list[stormvogel.result.Result]:
+    _validate(model)
+    if executor is not None and not isinstance(executor, ThreadPoolExecutor):
+        return _check_in_processes(model, props, scheduler, executor)
+
+    # we first map the model to a stormpy model
+    with profiling.phase("conversion"):
+        stormpy_model = mapping.stormvogel_to_stormpy(model, fingerprint=fingerprint)
+    profiling.count("states", stormpy_model.nr_states)
+    profiling.count("rows", stormpy_model.nr_choices)
+    profiling.count("transitions", stormpy_model.nr_transitions)
 
+    # we parse all properties at once
+    with profiling.phase("parsing"):
+        properties = stormpy.parse_properties(";".join(props))
+    assert properties is not None and len(properties) == len(props)
+    profiling.count("properties", len(properties))
+
+    # the choice table maps the stormpy choices back to the states and actions of our model
+    with profiling.phase("choice_table"):
+        table = mapping.choice_table(model)
+
+    def check(prop) -> stormvogel.result.Result:
+        # we perform the model checking operation
+        with profiling.phase("solve"):
+            if model.supports_actions() and scheduler:
+                stormpy_result = stormpy.model_checking(
+                    stormpy_model, prop, extract_scheduler=True
+                )
+            else:
+                stormpy_result = stormpy.model_checking(stormpy_model, prop)
+
+        # we convert the results
+        with profiling.phase("result_conversion"):
+            stormvogel_result = convert_results.convert_model_checking_result(
+                model, stormpy_result, choice_table=table
+            )
+        assert stormvogel_result is not None
         return stormvogel_result
-    else:
-        print(
-            "You have not proved a property string. You can create a simple one using this widget."
+
+    if executor is None:
+        return [check(prop) for prop in properties]
+    # every task runs in a copy of our context, so the phases in the threads are recorded by our profilers
+    contexts = [contextvars.copy_context() for _ in properties]
+    return list(
+        executor.map(
+            lambda context, prop: context.run(check, prop), contexts, properties
         )
-        stormvogel.property_builder.build_property_string(model)
-        return None
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+"""Records the time, Python allocations and sizes of the phases of model checking and conversion.
+
+Example:
+    with Profiler() as profiler:
+        result = model_checking(model, prop)
+    print(profiler.to_dict())
+"""
+
+from contextlib import contextmanager
+import contextvars
+import threading
+import time
+import tracemalloc
+from typing import Iterator
+
+
+class Profiler:
+    """Collects, while it is active, the wall time of each phase and counters such as the number of states.
+    Phases with the same name (e.g., solving several properties) are accumulated.
+    Profilers can be nested, in which case all active profilers record the same phases.
+    A profiler is active in the thread (or asyncio task) that entered it, so profilers in different threads
+    do not record each other's phases. Work that is handed to other threads records into it only if it runs
+    in a copy of the context (see contextvars.copy_context).
+
+    Args:
+        track_allocations: Whether to also record the memory that is allocated by Python (using tracemalloc) in each phase.
+            Memory that is allocated by storm itself is not included. Tracking allocations slows everything down.
+            Tracemalloc measures the whole process, so the allocations of phases that overlap with phases
+            in other threads cannot be told apart. They are not recorded.
+    """
+
+    def __init__(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        self.phases: dict[str, dict[str, float | int]] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._token: contextvars.Token | None = None
+
+    def __enter__(self) -> "Profiler":
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, *args):
+        assert self._token is not None
+        _active.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def add_phase(
+        self,
+        name: str,
+        seconds: float,
+        allocated: int | None = None,
+        peak: int | None = None,
+    ) -> None:
+        """Adds a measurement of a phase. The allocations are None if they were not measured."""
+        with self._lock:
+            stats = self.phases.setdefault(name, {"calls": 0, "time": 0.0})
+            stats["calls"] += 1
+            stats["time"] += seconds
+            if self.track_allocations and allocated is not None and peak is not None:
+                stats["allocated"] = stats.get("allocated", 0) + allocated
+                stats["peak"] = max(stats.get("peak", 0), peak)
+
+    def count(self, name: str, value: int) -> None:
+        """Adds a value to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        """Returns the recorded phases and counters as a (JSON serializable) dictionary."""
+        with self._lock:
+            return {
+                "phases": {name: dict(stats) for name, stats in self.phases.items()},
+                "counters": dict(self.counters),
+                "total_time": sum(stats["time"] for stats in self.phases.values()),
+            }
+
+
+# the profilers that are currently active in this context, innermost last
+_active: contextvars.ContextVar[tuple[Profiler, ...]] = contextvars.ContextVar(
+    "active_profilers", default=()
+)
+
+# the phases (of all threads) that are measuring allocations, and a counter that is increased whenever such a phase
+# starts while another one is running. A phase only reports its allocations if it started alone
+# and the counter did not change until it ended.
+_lock = threading.Lock()
+_tracing_phases = 0
+_overlaps = 0
+
+
+def active() -> bool:
+    """Whether any profiler is active in this context."""
+    return len(_active.get()) > 0
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Measures the enclosed code as the given phase in all active profilers. Does nothing if no profiler is active."""
+    global _tracing_phases, _overlaps
+    profilers = _active.get()
+    if not profilers:
+        yield
+        return
+    tracing = tracemalloc.is_tracing() and any(
+        profiler.track_allocations for profiler in profilers
+    )
+    if tracing:
+        with _lock:
+            alone = _tracing_phases == 0
+            if not alone:
+                _overlaps += 1
+            _tracing_phases += 1
+            overlaps = _overlaps
+            if alone:
+                tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        allocated = peak = None
+        if tracing:
+            with _lock:
+                current, traced_peak = tracemalloc.get_traced_memory()
+                if alone and overlaps == _overlaps:
+                    allocated, peak = current - before, traced_peak - before
+                _tracing_phases -= 1
+        for profiler in profilers:
+            profiler.add_phase(name, seconds, allocated, peak)
+
+
+def count(name: str, value: int) -> None:
+    """Adds a value to a counter of all active profilers in this context."""
+    for profiler in _active.get():
+        profiler.count(name, value)
@@ -103,7 +103,10 @@ class VisualizationBase:
         model: stormvogel.model.Model,
         layout: stormvogel.layout.Layout = stormvogel.layout.DEFAULT(),
         result: stormvogel.result.Result | None = None,
-        scheduler: stormvogel.result.Scheduler | None = None,
+        scheduler: stormvogel.result.Scheduler
+        | stormvogel.result.RandomizedScheduler
+        | stormvogel.result.FiniteMemoryScheduler
+        | None = None,
     ) -> None:
         self.model = model
         self.layout = layout
@@ -145,7 +148,7 @@ class VisualizationBase:
         If results are not enabled, then it returns the empty string."""
         if self.result is None or not self.layout.layout["results"]["show_results"]:
             return ""
-        result_of_state = self.result.get_result_of_state(s)
+        result_of_state = self.result.get_result_of_state(s, validate=False)
         if result_of_state is None:
             return ""
         return (
@@ -188,8 +191,8 @@ class VisualizationBase:
         if self.scheduler is None:
             return default
 
-        choice = self.scheduler.get_choice_of_state(self.model.get_state_by_id(s_id))
-        return "scheduled_actions" if a == choice else default
+        support = self.scheduler.get_support_of_state(s_id, validate=False)
+        return "scheduled_actions" if a in support else default
 
     def _format_rewards(
         self, s: stormvogel.model.State, a: stormvogel.model.Action
@@ -254,7 +257,7 @@ class VisualizationBase:
 
         result_colors = self.layout.layout["results"]["result_colors"]
         if result_colors and self.result is not None:
-            result = self.result.get_result_of_state(state)
+            result = self.result.get_result_of_state(state, validate=False)
             max_result = self.result.maximum_result()
             if isinstance(result, (int, float, Fraction)) and isinstance(
                 max_result, (int, float, Fraction)
@@ -335,7 +338,10 @@ class JSVisualization(VisualizationBase):
         model: stormvogel.model.Model,
         name: str | None = None,
         result: stormvogel.result.Result | None = None,
-        scheduler: stormvogel.result.Scheduler | None = None,
+        scheduler: stormvogel.result.Scheduler
+        | stormvogel.result.RandomizedScheduler
+        | stormvogel.result.FiniteMemoryScheduler
+        | None = None,
         layout: stormvogel.layout.Layout = stormvogel.layout.DEFAULT(),
         output: widgets.Output | None = None,
         debug_output: widgets.Output = widgets.Output(),
@@ -352,7 +358,8 @@ class JSVisualization(VisualizationBase):
             result (Result, optional): A result associatied with the model.
                 The results are displayed as numbers on a state. Enable the layout editor for options.
                 If this result has a scheduler, then the scheduled actions will have a different color etc. based on the layout
-            scheduler (Scheduler, optional): The scheduled actions will have a different color etc. based on the layout
+            scheduler (Scheduler, optional): The scheduled actions will have a different color etc. based on the layout.
+                For randomized and finite-memory schedulers, these are all actions that may be taken.
                 If both result and scheduler are set, then scheduler takes precedence.
             layout (Layout): Layout used for the visualization.
             output (widgets.Output): The output widget in which the network is rendered.
@@ -880,7 +887,10 @@ class MplVisualization(VisualizationBase):
         model: stormvogel.model.Model,
         layout: stormvogel.layout.Layout = stormvogel.layout.DEFAULT(),
         result: stormvogel.result.Result | None = None,
-        scheduler: stormvogel.result.Scheduler | None = None,
+        scheduler: stormvogel.result.Scheduler
+        | stormvogel.result.RandomizedScheduler
+        | stormvogel.result.FiniteMemoryScheduler
+        | None = None,
         title: str | None = None,
         interactive: bool = False,
         hover_node: Callable[[PathCollection, PathCollection, MouseEvent, Axes], None]
@@ -950,11 +960,17 @@ class MplVisualization(VisualizationBase):
         self._highlights.clear()
         self._edge_highlights.clear()
 
-    def highlight_scheduler(self, scheduler: stormvogel.result.Scheduler):
+    def highlight_scheduler(
+        self,
+        scheduler: stormvogel.result.Scheduler
+        | stormvogel.result.RandomizedScheduler
+        | stormvogel.result.FiniteMemoryScheduler,
+    ):
         """Highlights states, actions, and edges according to the given scheduler.
 
         Applies a specific highlight color defined by the layout to all states and
         actions specified by the scheduler’s taken actions, as well as the edges connecting them.
+        For randomized and finite-memory schedulers, all actions that may be taken are highlighted.
         The color is derived from the layout’s configured group colors for scheduled actions.
 
         Args:
@@ -965,15 +981,16 @@ class MplVisualization(VisualizationBase):
         color = self.layout.layout["groups"].get(
             "scheduled_actions", {"color": {"border": default_color}}
         )["color"]["border"]
-        for state_id, taken_action in scheduler.taken_actions.items():
+        for state_id, taken_actions in scheduler.support().items():
             self.highlight_state(state_id, color)
-            if taken_action == stormvogel.model.EmptyAction:
-                continue
-            action_node = self.G.state_action_id_map[(state_id, taken_action)]
-            self.highlight_action(state_id, taken_action, color)
-            self.highlight_edge(state_id, action_node, color)
-            for start, end in self.G.out_edges(action_node):
-                self.highlight_edge(start, end, color)
+            for taken_action in taken_actions:
+                if taken_action == stormvogel.model.EmptyAction:
+                    continue
+                action_node = self.G.state_action_id_map[(state_id, taken_action)]
+                self.highlight_action(state_id, taken_action, color)
+                self.highlight_edge(state_id, action_node, color)
+                for start, end in self.G.out_edges(action_node):
+                    self.highlight_edge(start, end, color)
 
     def add_to_ax(
         self,
@@ -1,7 +1,12 @@
 from stormvogel import bird, model
 import math
+import multiprocessing
+import numpy as np
+import pickle
 import pytest
 import re
+import sys
+import threading
 
 
 def test_bird_mdp():
@@ -571,3 +576,244 @@ def test_self_loops():
     regular_model.add_self_loops()
 
     assert bird_model == regular_model
+
+
+def test_bird_state_hashing():
+    a = bird.State(x=1, y=["left", "right"])
+    b = bird.State(y=["left", "right"], x=1)
+    assert a == b and hash(a) == hash(b)
+    assert a != bird.State(x=1, y=["left"])
+    assert a != bird.State(x=1)
+    assert a.x == 1 and a.y == ["left", "right"]
+    assert {a: 0}[b] == 0
+
+    # states are immutable
+    with pytest.raises(AttributeError):
+        a.x = 2
+
+    # the hash is recomputed after pickling
+    copy = pickle.loads(pickle.dumps(a))
+    assert copy == a and hash(copy) == hash(a)
+
+
+def test_bird_single_pass():
+    # every function is called once per state (or once per state and action)
+    calls = {"delta": 0, "labels": 0, "rewards": 0, "valuations": 0}
+
+    def available_actions(s):
+        return [["stay"], ["go"]]
+
+    def delta(s, a):
+        calls["delta"] += 1
+        if a == ["go"]:
+            return [(1, (s + 1) % 3)]
+        return [(1, s)]
+
+    def labels(s):
+        calls["labels"] += 1
+        return [str(s)]
+
+    def rewards(s, a):
+        calls["rewards"] += 1
+        return {"r": s}
+
+    def valuations(s):
+        calls["valuations"] += 1
+        return {"s": s}
+
+    def build(trusted):
+        return bird.build_bird(
+            delta,
+            init=0,
+            available_actions=available_actions,
+            labels=labels,
+            rewards=rewards,
+            valuations=valuations,
+            modeltype=model.ModelType.MDP,
+            trusted=trusted,
+        )
+
+    checked = build(False)
+    assert calls == {"delta": 6, "labels": 3, "rewards": 6, "valuations": 3}
+    assert build(True) == checked
+    assert (
+        checked.get_rewards("r").get_state_action_reward(
+            checked.get_state_by_id(2),
+            checked.get_action_with_labels(frozenset({"go"})),
+        )
+        == 2
+    )
+
+
+def test_bird_trusted_unavailable_action():
+    def available_actions(s):
+        return [["stay"], ["go"]]
+
+    def delta(s, a):
+        # go is not available in the last state
+        if a == ["go"]:
+            return [] if s == 2 else [(1, s + 1)]
+        return [(1, s)]
+
+    def build(trusted):
+        return bird.build_bird(
+            delta,
+            init=0,
+            available_actions=available_actions,
+            rewards=lambda s, a: {"r": 1},
+            modeltype=model.ModelType.MDP,
+            trusted=trusted,
+        )
+
+    with pytest.raises(RuntimeError):
+        build(False)
+    # without checks the action is left out, together with its reward
+    trusted = build(True)
+    rewards = trusted.get_rewards("r")
+    assert len(rewards.rewards) == 5
+    assert all(
+        action in trusted.get_state_by_id(state_id).available_actions()
+        for state_id, action in rewards.rewards
+    )
+
+
+def test_bird_workers():
+    if (
+        "fork" not in multiprocessing.get_all_start_methods()
+        or sys.platform == "darwin"
+    ):
+        pytest.skip("the workers of local functions are forked")
+
+    def available_actions(s):
+        return [["left"], ["right"]]
+
+    def delta(s, a):
+        step = -1 if a == ["left"] else 1
+        return [(0.5, bird.State(x=(s.x + step) % 20)), (0.5, bird.State(x=s.x))]
+
+    def build(workers):
+        return bird.build_bird(
+            delta,
+            init=bird.State(x=0),
+            available_actions=available_actions,
+            labels=lambda s: ["even"] if s.x % 2 == 0 else [],
+            rewards=lambda s, a: {"r": s.x},
+            valuations=lambda s: {"x": s.x},
+            modeltype=model.ModelType.MDP,
+            workers=workers,
+        )
+
+    sequential = build(1)
+    parallel = build(2)
+    # the states are discovered in the same order
+    assert parallel == sequential
+    assert [s.valuations for s in parallel.states.values()] == [
+        s.valuations for s in sequential.states.values()
+    ]
+
+    # errors in the workers are raised as with one worker
+    with pytest.raises(ValueError):
+        bird.build_bird(
+            delta,
+            init=bird.State(x=0),
+            available_actions=available_actions,
+            labels=lambda s: 1 if s.x == 5 else [],
+            modeltype=model.ModelType.MDP,
+            workers=2,
+        )
+
+
+def test_bird_batched():
+    # a grid world in which the robot moves in four directions and slips with probability 0.1
+    width = 5
+    moves = np.array([[0, 1], [0, -1], [-1, 0], [1, 0]])
+    names = ["up", "down", "left", "right"]
+
+    def delta_batch(states, action_ids):
+        moved = np.clip(states + moves[action_ids], 0, width - 1)
+        rows = np.arange(len(states))
+        return (
+            np.concatenate([rows, rows]),
+            np.concatenate([np.full(len(rows), 0.9), np.full(len(rows), 0.1)]),
+            np.concatenate([moved, states]),
+        )
+
+    batched = bird.build_bird_batched(
+        delta_batch,
+        init=[0, 0],
+        actions=[[name] for name in names],
+        labels=lambda states: {"corner": (states == width - 1).all(axis=1)},
+        rewards=lambda states, action_ids: {"x": states[:, 0].astype(float)},
+        variables=["x", "y"],
+        modeltype=model.ModelType.MDP,
+    )
+
+    def delta(s, a):
+        dx, dy = moves[names.index(a[0])].tolist()
+        x = min(max(s.x + dx, 0), width - 1)
+        y = min(max(s.y + dy, 0), width - 1)
+        return [(0.9, bird.State(x=x, y=y)), (0.1, s)]
+
+    regular = bird.build_bird(
+        delta,
+        init=bird.State(x=0, y=0),
+        available_actions=lambda s: [[name] for name in names],
+        labels=lambda s: ["corner"] if s.x == s.y == width - 1 else [],
+        rewards=lambda s, a: {"x": float(s.x)},
+        valuations=lambda s: {"x": s.x, "y": s.y},
+        modeltype=model.ModelType.MDP,
+    )
+
+    # the states get the same ids
+    assert batched == regular
+    assert [s.valuations for s in batched.states.values()] == [
+        s.valuations for s in regular.states.values()
+    ]
+
+    # states without transitions get a self loop
+    dtmc = bird.build_bird_batched(
+        lambda states, action_ids: (
+            np.flatnonzero(states[:, 0] < 3),
+            np.ones(int((states[:, 0] < 3).sum())),
+            states[states[:, 0] < 3] + 1,
+        ),
+        init=0,
+        modeltype=model.ModelType.DTMC,
+    )
+    assert len(dtmc.states) == 4
+    assert dtmc.get_choice(dtmc.get_state_by_id(3)).transition[
+        model.EmptyAction
+    ].branch == [(1, dtmc.get_state_by_id(3))]
+
+
+def _walk_actions(s):
+    return [["left"], ["right"]]
+
+
+def _walk_delta(s, a):
+    step = -1 if a == ["left"] else 1
+    return [(0.5, (s + step) % 20), (0.5, s)]
+
+
+def test_bird_workers_threads():
+    def build(delta, workers):
+        return bird.build_bird(
+            delta,
+            init=0,
+            available_actions=_walk_actions,
+            modeltype=model.ModelType.MDP,
+            workers=workers,
+        )
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        # local functions would have to be forked, which is refused while other threads are running
+        with pytest.raises(RuntimeError):
+            build(lambda s, a: _walk_delta(s, a), 2)
+        # module level functions are sent to workers that are not forked
+        assert build(_walk_delta, 2) == build(_walk_delta, 1)
+    finally:
+        stop.set()
+        thread.join()
@@ -9,10 +9,14 @@ import stormvogel.examples.stormpy_examples.stormpy_pomdp
 import stormvogel.examples.nuclear_fusion_ctmc
 import stormvogel.examples.monty_hall_pomdp
 import stormvogel.examples.stormpy_examples.stormpy_ma
+import json
 from typing import Union
 
+import numpy as np
+
 try:
     import stormpy
+    import stormpy.examples.files
 except ImportError:
     stormpy = None
 
@@ -409,3 +413,133 @@ def test_id_mapping():
         # we reassign ids of original model and compare again
         stormvogel_dtmc.reassign_ids()
         assert new_stormvogel_dtmc == stormvogel_dtmc
+
+
+def test_interval_fingerprint():
+    imc = stormvogel.model.new_dtmc()
+    target = imc.new_state(labels="A")
+    imc.get_initial_state().set_choice(
+        [(stormvogel.model.Interval(1 / 3, 2 / 3), target)]
+    )
+    imc.add_self_loops()
+    fingerprint = mapping.model_fingerprint(imc)
+    assert mapping.model_fingerprint(imc) == fingerprint
+    imc.get_initial_state().set_choice(
+        [(stormvogel.model.Interval(1 / 4, 2 / 3), target)]
+    )
+    assert mapping.model_fingerprint(imc) != fingerprint
+
+
+def test_conversion_cache():
+    if stormpy is not None:
+        mapping.clear_conversion_cache()
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        before = mapping.conversion_cache_info()
+
+        first = mapping.stormvogel_to_stormpy(mdp)
+        # an unchanged (or structurally equal) model is not converted again
+        assert mapping.stormvogel_to_stormpy(mdp) is first
+        other = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        assert mapping.stormvogel_to_stormpy(other) is first
+        info = mapping.conversion_cache_info()
+        assert info["misses"] == before["misses"] + 1
+        assert info["hits"] == before["hits"] + 2
+        assert info["size"] == 1
+
+        # changing the model changes the fingerprint
+        fingerprint = mapping.model_fingerprint(mdp)
+        mdp.get_initial_state().add_label("changed")
+        assert mapping.model_fingerprint(mdp) != fingerprint
+        assert mapping.stormvogel_to_stormpy(mdp) is not first
+        fingerprint = mapping.model_fingerprint(mdp)
+        mdp.new_reward_model("r").set_state_action_reward(
+            mdp.get_initial_state(), stormvogel.model.EmptyAction, 0
+        )
+        assert mapping.model_fingerprint(mdp) != fingerprint
+        fingerprint = mapping.model_fingerprint(mdp)
+        branch = next(iter(mdp.choices[mdp.get_initial_state().id].transition.values()))
+        branch.branch[0] = (0.5, branch.branch[0][1])
+        assert mapping.model_fingerprint(mdp) != fingerprint
+
+        # explicit invalidation and bounded size
+        mapping.clear_conversion_cache(other)
+        assert mapping.stormvogel_to_stormpy(other) is not first
+        mapping.set_conversion_cache_size(1)
+        assert mapping.conversion_cache_info()["size"] == 1
+        mapping.set_conversion_cache_size(0)
+        assert mapping.stormvogel_to_stormpy(
+            other
+        ) is not mapping.stormvogel_to_stormpy(other)
+        mapping.set_conversion_cache_size(16)
+        mapping.clear_conversion_cache()
+
+
+def test_conversion_does_not_change_model():
+    if stormpy is not None:
+        dtmc = stormvogel.examples.die.create_die_dtmc()
+        init = dtmc.get_initial_state()
+        # the branch is not sorted by target, stormpy needs sorted rows
+        branch = dtmc.choices[init.id].transition[stormvogel.model.EmptyAction]
+        branch.branch.reverse()
+        before = list(branch.branch)
+
+        stormpy_dtmc = mapping.stormvogel_to_stormpy(dtmc, use_cache=False)
+        assert branch.branch == before
+        row = stormpy_dtmc.transition_matrix.get_row(0)
+        assert [entry.column for entry in row] == list(range(1, 7))
+        assert [entry.value() for entry in row] == [1 / 6] * 6
+
+
+def test_bulk_stormpy_to_stormvogel():
+    if stormpy is not None:
+        options = stormpy.BuilderOptions()
+        options.set_build_state_valuations(True)
+        options.set_build_choice_labels(True)
+        options.set_build_all_reward_models(True)
+        for path in [
+            stormpy.examples.files.prism_dtmc_die,
+            stormpy.examples.files.prism_mdp_coin_2_2,
+            stormpy.examples.files.prism_pomdp_maze,
+        ]:
+            program = stormpy.parse_prism_program(path)
+            stormpy_model = stormpy.build_sparse_model_with_options(program, options)
+
+            compact = mapping.stormpy_to_compact(stormpy_model)
+            assert compact.nr_states == stormpy_model.nr_states
+            assert compact.nr_rows == stormpy_model.transition_matrix.nr_rows
+            assert compact.nr_entries == stormpy_model.transition_matrix.nr_entries
+            assert np.allclose(
+                compact.reduce(compact.multiply(np.ones(compact.nr_states))), 1
+            )
+
+            model = mapping.stormpy_to_stormvogel(stormpy_model)
+            assert model is not None
+            assert model.get_type() == compact.type
+            assert len(model.states) == stormpy_model.nr_states
+            for state in stormpy_model.states:
+                new_state = model.get_state_by_id(state.id)
+                assert set(new_state.labels) == set(state.labels)
+                assert new_state.valuations == json.loads(
+                    str(stormpy_model.state_valuations.get_json(state.id))
+                )
+                choice = model.get_choice(new_state)
+                assert len(choice.transition) == len(state.actions)
+                for action, branch in zip(choice.transition.values(), state.actions):
+                    assert sorted(
+                        (target.id, value) for value, target in action
+                    ) == sorted(
+                        (entry.column, entry.value()) for entry in branch.transitions
+                    )
+
+            # the imported model converts back to the same stormpy model
+            assert sparse_equal(stormpy_model, mapping.stormvogel_to_stormpy(model))
+
+        # the die has state-action rewards, which are the state rewards of the DTMC
+        program = stormpy.parse_prism_program(stormpy.examples.files.prism_dtmc_die)
+        stormpy_model = stormpy.build_sparse_model_with_options(program, options)
+        model = mapping.stormpy_to_stormvogel(stormpy_model)
+        reward_model = stormpy_model.get_reward_model("coin_flips")
+        assert [
+            model.get_default_rewards().get_state_reward(state)
+            for state in model.states.values()
+        ] == list(reward_model.state_action_rewards)
@@ -2,7 +2,11 @@
 import stormvogel.examples.monty_hall
 import stormvogel.examples.die
 import stormvogel.stormpy_utils.model_checking
+import stormvogel.stormpy_utils.profiling as profiling
+import multiprocessing
 import pytest
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 try:
     import stormpy
@@ -66,3 +70,121 @@ def test_model_checking():
             assert stormvogel.stormpy_utils.model_checking.model_checking(
                 dtmc, prop, True
             )
+
+
+def test_model_checking_batch():
+    if stormpy is not None:
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        props = ['Pmax=? [F "done"]', 'Pmin=? [F "target"]', 'Pmax=? [F "target"]']
+        results = stormvogel.stormpy_utils.model_checking.model_checking_batch(
+            mdp, props
+        )
+        assert len(results) == 3
+        for prop, result in zip(props, results):
+            assert result == stormvogel.stormpy_utils.model_checking.model_checking(
+                mdp, prop
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = stormvogel.stormpy_utils.model_checking.model_checking_batch(
+                mdp, props, executor=executor, profile=True
+            )
+        assert parallel == results
+        # the phases in the threads are recorded
+        assert parallel[0].profile["phases"]["solve"]["calls"] == 3
+
+        # with processes, the model is sent to the workers and the results refer to the original model
+        with ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            processes = stormvogel.stormpy_utils.model_checking.model_checking_batch(
+                mdp, props, executor=executor
+            )
+        assert processes == results
+        assert all(result.model is mdp for result in processes)
+
+
+def test_model_checking_uses_original_model():
+    if stormpy is not None:
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        result = stormvogel.stormpy_utils.model_checking.model_checking(
+            mdp, 'Pmax=? [F "target"]'
+        )
+        assert result.model is mdp
+        assert result.scheduler.model is mdp
+        for state_id, state in mdp:
+            assert result.scheduler.get_choice_of_state(state) in (
+                state.available_actions()
+            )
+
+        # the state ids do not have to be the stormpy indices
+        dtmc = stormvogel.examples.die.create_die_dtmc()
+        dtmc.remove_state(dtmc.get_state_by_id(3))
+        result = stormvogel.stormpy_utils.model_checking.model_checking(
+            dtmc, 'P=? [F "rolled6"]'
+        )
+        assert result.model is dtmc
+        assert set(result.values.keys()) == set(dtmc.states.keys())
+        assert result.get_result_of_state(6) == 1
+
+
+def test_model_checking_profile():
+    if stormpy is not None:
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        stormvogel.stormpy_utils.mapping.clear_conversion_cache()
+        with profiling.Profiler(track_allocations=True) as profiler:
+            first = stormvogel.stormpy_utils.model_checking.model_checking(
+                mdp, 'Pmax=? [F "done"]'
+            )
+            second = stormvogel.stormpy_utils.model_checking.model_checking(
+                mdp, 'Pmin=? [F "done"]', profile=True
+            )
+        assert first.profile is None
+
+        profile = profiler.to_dict()
+        for name in [
+            "validation",
+            "conversion",
+            "parsing",
+            "choice_table",
+            "solve",
+            "result_conversion",
+        ]:
+            assert profile["phases"][name]["calls"] == 2
+            assert profile["phases"][name]["time"] >= 0
+            assert "allocated" in profile["phases"][name]
+        assert profile["counters"]["states"] == 2 * len(mdp.states)
+        assert profile["counters"]["conversion_cache_hits"] == 1
+        assert profile["total_time"] > 0
+
+        # the result only has the profile of its own computation
+        assert second.profile["phases"]["solve"]["calls"] == 1
+        assert second.profile["counters"]["states"] == len(mdp.states)
+        assert "allocated" not in second.profile["phases"]["solve"]
+
+
+def test_profiler_threads():
+    # two threads profile at the same time, with overlapping phases
+    barrier = threading.Barrier(2)
+    profiles = {}
+
+    def work(name):
+        with profiling.Profiler(track_allocations=True) as profiler:
+            with profiling.phase(name):
+                barrier.wait()
+                profiling.count(name, 1)
+                barrier.wait()
+        profiles[name] = profiler.to_dict()
+
+    threads = [threading.Thread(target=work, args=(name,)) for name in ["a", "b"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name in ["a", "b"]:
+        assert list(profiles[name]["phases"]) == [name]
+        assert profiles[name]["counters"] == {name: 1}
+        # the allocations of overlapping phases cannot be told apart
+        assert "allocated" not in profiles[name]["phases"][name]
+    assert not profiling.active()
@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.examples.nuclear_fusion_ctmc
+import stormvogel.native.ctmc as ctmc
+from stormvogel.native.compact import to_compact
+
+
+def test_fox_glynn():
+    assert ctmc.fox_glynn(0) == (0, pytest.approx([1.0]))
+    for rate in [0.5, 30, 10_000]:
+        left, weights = ctmc.fox_glynn(rate, 1e-10)
+        ks = np.arange(left, left + len(weights))
+        expected = np.exp(
+            -rate + ks * math.log(rate) - np.array([math.lgamma(k + 1) for k in ks])
+        )
+        assert weights == pytest.approx(expected, abs=1e-10)
+        assert weights.sum() == pytest.approx(1)
+
+
+def test_uniformize():
+    compact = to_compact(
+        stormvogel.examples.nuclear_fusion_ctmc.create_nuclear_fusion_ctmc()
+    )
+    uniformized, rate = ctmc.uniformize(compact)
+    assert rate == 12
+    assert uniformized.multiply(np.ones(uniformized.nr_states)) == pytest.approx(
+        np.ones(uniformized.nr_states)
+    )
+
+    with pytest.raises(RuntimeError):
+        ctmc.uniformize(to_compact(stormvogel.examples.die.create_die_dtmc()))
+
+
+def test_transient_probabilities():
+    fusion = stormvogel.examples.nuclear_fusion_ctmc.create_nuclear_fusion_ctmc()
+    times = [0.0, 0.5, 1.0, 5.0]
+    results = ctmc.transient_probabilities(fusion, times)
+    reachability = ctmc.time_bounded_reachability(fusion, "Supernova", times)
+    for t, result, reach in zip(times, results, reachability):
+        # hydrogen decays with rate 3, helium with rate 2
+        assert result.get_result_of_state(0) == pytest.approx(math.exp(-3 * t))
+        assert result.get_result_of_state(1) == pytest.approx(
+            3 * (math.exp(-2 * t) - math.exp(-3 * t))
+        )
+        assert sum(result.values.values()) == pytest.approx(1)
+        # the supernova is absorbing, so reaching it before t means being there at t
+        assert reach.get_result_of_state(0) == pytest.approx(
+            result.get_result_of_state(4)
+        )
+        assert reach.get_result_of_state(4) == 1
+
+    single = ctmc.time_bounded_reachability(fusion, "Supernova", 1.0)
+    assert single.values == reachability[2].values
@@ -0,0 +1,67 @@
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.model
+import stormvogel.native.fundamental as fundamental
+from stormvogel.native.compact import to_compact
+
+
+def create_gamblers_ruin():
+    """A fair game that starts with 2 coins and stops when there are 0 or 4 coins."""
+    dtmc = stormvogel.model.new_dtmc(create_initial_state=False)
+    states = [
+        dtmc.new_state([f"coins{i}", "init"] if i == 2 else f"coins{i}")
+        for i in range(5)
+    ]
+    for i in range(1, 4):
+        states[i].set_choice([(0.5, states[i - 1]), (0.5, states[i + 1])])
+    dtmc.add_self_loops()
+    return dtmc
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_fundamental_matrix(mocker, use_scipy):
+    if not use_scipy:
+        mocker.patch.object(fundamental, "scipy", None)
+    dtmc = create_gamblers_ruin()
+    compact = to_compact(dtmc)
+    matrix = fundamental.FundamentalMatrix(compact)
+    assert (matrix.lu is not None) == use_scipy
+    assert list(matrix.absorbing) == [True, False, False, False, True]
+
+    assert matrix.expected_visits(2) == pytest.approx([0, 1, 2, 1, 0])
+    assert matrix.expected_visits_to(2) == pytest.approx([0, 1, 2, 1, 0])
+    assert matrix.absorption_probabilities(
+        compact.state_set("coins4")
+    ) == pytest.approx([0, 0.25, 0.5, 0.75, 1])
+    assert matrix.mean_time_to_absorption() == pytest.approx([0, 3, 4, 3, 0])
+
+    with pytest.raises(RuntimeError):
+        matrix.expected_visits_to(0)
+
+    # iterative solves that do not converge in time are reported
+    if not use_scipy:
+        slow = fundamental.FundamentalMatrix(compact, max_iterations=3)
+        with pytest.raises(RuntimeError):
+            slow.mean_time_to_absorption()
+
+
+def test_fundamental_model_functions():
+    dtmc = create_gamblers_ruin()
+    assert fundamental.expected_visits(dtmc).get_result_of_state(2) == pytest.approx(2)
+    assert fundamental.absorption_probabilities(dtmc, "coins0").get_result_of_state(
+        1
+    ) == pytest.approx(0.75)
+    assert fundamental.mean_time_to_absorption(dtmc).get_result_of_state(
+        1
+    ) == pytest.approx(3)
+
+    die = stormvogel.examples.die.create_die_dtmc()
+    assert fundamental.mean_time_to_absorption(die).get_result_of_state(0) == 1
+    # from the initial state, rolled1 is never reached with probability 5/6
+    with pytest.raises(RuntimeError):
+        fundamental.mean_first_passage(die, "rolled1")
+    ends = dtmc.get_states_with_label("coins0") + dtmc.get_states_with_label("coins4")
+    assert fundamental.mean_first_passage(dtmc, ends).values == pytest.approx(
+        fundamental.mean_time_to_absorption(dtmc).values
+    )
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.model
+import stormvogel.native.longrun as longrun
+from stormvogel.native.compact import to_compact
+
+
+def create_cycle_dtmc():
+    """The initial state moves to a periodic cycle {1, 2} or to a cycle {3, 4, 5} with a self loop."""
+    dtmc = stormvogel.model.new_dtmc()
+    init = dtmc.get_initial_state()
+    states = [dtmc.new_state(f"s{i}") for i in range(1, 6)]
+    init.set_choice([(0.25, states[0]), (0.75, states[2])])
+    states[0].set_choice([(1, states[1])])
+    states[1].set_choice([(1, states[0])])
+    states[2].set_choice([(0.5, states[2]), (0.5, states[3])])
+    states[3].set_choice([(1, states[4])])
+    states[4].set_choice([(1, states[2])])
+    reward_model = dtmc.new_reward_model("R")
+    reward_model.set_state_reward(states[0], 4)
+    reward_model.set_state_reward(states[3], 1)
+    reward_model.set_unset_rewards(0)
+    return dtmc
+
+
+def test_bottom_components(mocker):
+    compact = to_compact(create_cycle_dtmc())
+    expected = [[1, 2], [3, 4, 5]]
+    components = longrun.bottom_components(compact)
+    assert sorted(sorted(c.tolist()) for c in components) == expected
+
+    # without scipy, Tarjan's algorithm is used
+    mocker.patch.object(longrun, "scipy", None)
+    components = longrun.bottom_components(compact)
+    assert sorted(sorted(c.tolist()) for c in components) == expected
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_steady_state(mocker, use_scipy):
+    if not use_scipy:
+        mocker.patch.object(longrun, "scipy", None)
+    dtmc = create_cycle_dtmc()
+    result = longrun.steady_state(dtmc, workers=2)
+    assert list(result.values.values()) == pytest.approx(
+        [0, 0.125, 0.125, 0.375, 0.1875, 0.1875], abs=1e-8
+    )
+
+    # long-run average reward: 4 / 2 in the first cycle and 1 / 4 in the second
+    result = longrun.long_run_reward(dtmc)
+    assert result.get_result_of_state(0) == pytest.approx(0.25 * 2 + 0.75 * 0.25)
+    assert result.get_result_of_state(1) == pytest.approx(2)
+    assert result.get_result_of_state(5) == pytest.approx(0.25)
+
+    result = longrun.long_run_probability(dtmc, "s1")
+    assert result.get_result_of_state(0) == pytest.approx(0.125)
+
+    die = stormvogel.examples.die.create_die_dtmc()
+    result = longrun.steady_state(die)
+    assert result.get_result_of_state(0) == 0
+    assert result.get_result_of_state(3) == pytest.approx(1 / 6)
+
+
+def test_steady_state_ctmc():
+    ctmc = stormvogel.model.new_ctmc()
+    init = ctmc.get_initial_state()
+    other = ctmc.new_state("other")
+    init.set_choice([(2, other)])
+    other.set_choice([(3, init)])
+    result = longrun.steady_state(ctmc)
+    assert np.array(list(result.values.values())) == pytest.approx([0.6, 0.4])
+
+    with pytest.raises(RuntimeError):
+        longrun.steady_state(stormvogel.model.new_mdp())
@@ -0,0 +1,107 @@
+import stormvogel.examples.lion
+import stormvogel.examples.monty_hall
+import stormvogel.examples.die
+import stormvogel.extensions.visual_algos as visual_algos
+import stormvogel.native.policies as policies
+from stormvogel.native.compact import to_compact
+from stormvogel.native.iteration import value_iteration
+import stormvogel.model
+import stormvogel.result
+import pytest
+
+
+def test_policy_iteration_matches_value_iteration():
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    for maximize in [True, False]:
+        pi = policies.policy_iteration(lion, "dead", maximize=maximize)
+        vi = value_iteration(lion, "dead", maximize=maximize, epsilon=1e-12)
+        for state_id, value in vi:
+            assert pi.get_result_of_state(state_id) == pytest.approx(value, abs=1e-6)
+        assert pi.scheduler is not None
+
+    dtmc = stormvogel.examples.die.create_die_dtmc()
+    result = policies.policy_iteration(dtmc, "rolled4")
+    assert result.get_result_of_state(0) == pytest.approx(1 / 6)
+    assert result.scheduler is None
+
+
+def test_policy_iteration_scheduler():
+    mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+    result = policies.policy_iteration(mdp, "target")
+    assert result.get_result_of_state(0) == pytest.approx(1)
+    assert result.scheduler is not None
+
+    # the optimal scheduler is a fixpoint when used as a warm start
+    compact = to_compact(mdp)
+    rows = policies.scheduler_to_rows(compact, result.scheduler)
+    _, new_rows, iterations = policies.iterate_policies(
+        compact, compact.state_set("target"), rows=rows
+    )
+    assert iterations == 1
+    assert list(new_rows) == list(rows)
+    assert policies.rows_to_scheduler(mdp, compact, rows) == result.scheduler
+
+    warm = policies.policy_iteration(
+        mdp, "target", scheduler=stormvogel.result.random_scheduler(mdp)
+    )
+    assert warm.values == pytest.approx(result.values)
+
+
+def test_policy_iteration_end_component():
+    # s0 can go to the target or stay in s0 forever, so the minimal probability is 0
+    mdp = stormvogel.model.new_mdp()
+    s0 = mdp.get_initial_state()
+    target = mdp.new_state(labels=["target"])
+    go = mdp.new_action("go")
+    stay = mdp.new_action("stay")
+    mdp.add_choice(
+        s0,
+        stormvogel.model.Choice(
+            {
+                go: stormvogel.model.Branch([(1, target)]),
+                stay: stormvogel.model.Branch([(1, s0)]),
+            }
+        ),
+    )
+    mdp.add_self_loops()
+
+    minimum = policies.policy_iteration(mdp, "target", maximize=False)
+    assert minimum.get_result_of_state(s0.id) == 0
+    assert minimum.scheduler is not None
+    assert minimum.scheduler.taken_actions[s0.id] == stay
+    maximum = policies.policy_iteration(mdp, "target", maximize=True)
+    assert maximum.get_result_of_state(s0.id) == 1
+
+
+def test_policy_iteration_without_scipy(mocker):
+    mocker.patch.object(policies, "scipy", None)
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    pi = policies.policy_iteration(lion, "dead", maximize=False)
+    vi = value_iteration(lion, "dead", maximize=False, epsilon=1e-12)
+    for state_id, value in vi:
+        assert pi.get_result_of_state(state_id) == pytest.approx(value, abs=1e-6)
+
+
+def test_visual_policy_iteration():
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    result = visual_algos.policy_iteration(lion, 'P=?[F "full"]', visualize=False)
+    expected = policies.policy_iteration(lion, "full")
+    assert result.values == pytest.approx(expected.values)
+    assert result.model is lion
+
+
+def test_visual_policy_iteration_model_checking(mocker):
+    # other properties than reachability are model checked on the induced dtmc of every scheduler
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    model_checking = mocker.patch.object(
+        stormvogel,
+        "model_checking",
+        side_effect=lambda dtmc, prop: value_iteration(dtmc, "full", epsilon=1e-12),
+    )
+    result = visual_algos.policy_iteration(lion, 'P=? [F<=10 "full"]', visualize=False)
+    assert model_checking.called
+    assert model_checking.call_args.kwargs["prop"] == 'P=? [F<=10 "full"]'
+    expected = policies.policy_iteration(lion, "full")
+    assert result.get_result_of_state(0) == pytest.approx(
+        expected.get_result_of_state(0), abs=1e-6
+    )
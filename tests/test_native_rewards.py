@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.examples.lion
+import stormvogel.model
+import stormvogel.native.rewards as rewards
+from stormvogel.native.compact import to_compact
+from stormvogel.native.iteration import iterate
+
+
+def create_loop_mdp():
+    mdp = stormvogel.model.new_mdp()
+    init = mdp.get_initial_state()
+    goal = mdp.new_state("goal")
+    sink = mdp.new_state("sink")
+    go = mdp.new_action("go")
+    stay = mdp.new_action("stay")
+    gamble = mdp.new_action("gamble")
+    init.set_choice(
+        stormvogel.model.Choice(
+            {
+                go: stormvogel.model.Branch([(1, goal)]),
+                stay: stormvogel.model.Branch([(1, init)]),
+                gamble: stormvogel.model.Branch([(0.5, goal), (0.5, sink)]),
+            }
+        )
+    )
+    mdp.add_self_loops()
+    reward_model = mdp.new_reward_model("R")
+    reward_model.set_state_action_reward(init, go, 5)
+    reward_model.set_state_action_reward(init, gamble, 1)
+    reward_model.set_unset_rewards(0)
+    return mdp
+
+
+def test_expected_rewards_lion():
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    compact = to_compact(lion)
+    targets = compact.state_set("dead")
+    for maximize in [True, False]:
+        result = rewards.expected_rewards(lion, "dead", maximize=maximize)
+        expected, _ = iterate(
+            compact,
+            np.zeros(compact.nr_states),
+            targets,
+            maximize=maximize,
+            offsets=compact.reward_vector("R"),
+            epsilon=1e-10,
+            max_iterations=10_000_000,
+        )
+        assert list(result.values.values()) == pytest.approx(
+            expected.tolist(), rel=1e-6, abs=1e-6
+        )
+        assert result.scheduler is not None
+    assert result.get_result_of_state(0) == pytest.approx(0)
+
+
+def test_expected_rewards_infinite():
+    mdp = create_loop_mdp()
+    # staying forever is not allowed when minimizing, even though it collects no reward
+    result = rewards.expected_rewards(mdp, "goal", maximize=False)
+    assert result.get_result_of_state(0) == pytest.approx(5)
+    assert result.scheduler.get_choice_of_state(0).labels == frozenset({"go"})
+    assert math.isinf(result.get_result_of_state(2))
+
+    result = rewards.expected_rewards(mdp, "goal", maximize=True)
+    assert math.isinf(result.get_result_of_state(0))
+    assert result.get_result_of_state(1) == 0
+
+    die = stormvogel.examples.die.create_die_dtmc()
+    reward_model = die.new_reward_model("R")
+    reward_model.set_state_reward(die.get_initial_state(), 1)
+    reward_model.set_unset_rewards(0)
+    result = rewards.expected_rewards(die, "rolled1")
+    assert math.isinf(result.get_result_of_state(0))
+    assert result.get_result_of_state(1) == 0
+    assert result.scheduler is None
+
+
+def test_bounded_rewards():
+    mdp = create_loop_mdp()
+    assert rewards.cumulative_rewards(mdp, 0).get_result_of_state(0) == 0
+    assert rewards.cumulative_rewards(mdp, 3).get_result_of_state(0) == 5
+    assert rewards.cumulative_rewards(mdp, 3, maximize=False).get_result_of_state(
+        0
+    ) == pytest.approx(0)
+
+    die = stormvogel.examples.die.create_die_dtmc()
+    reward_model = die.new_reward_model("R")
+    for i in range(1, 7):
+        reward_model.set_state_reward(die.get_states_with_label(f"rolled{i}")[0], i)
+    reward_model.set_unset_rewards(0)
+    assert rewards.instantaneous_rewards(die, 0).get_result_of_state(0) == 0
+    assert rewards.instantaneous_rewards(die, 5).get_result_of_state(
+        0
+    ) == pytest.approx(3.5)
+
+    # the lion has different rewards for different actions in the same state
+    with pytest.raises(RuntimeError):
+        rewards.instantaneous_rewards(stormvogel.examples.lion.create_lion_mdp(), 1)
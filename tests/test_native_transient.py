@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.examples.lion
+import stormvogel.extensions.visual_algos as visual_algos
+import stormvogel.native.transient as transient
+from stormvogel.native.compact import to_compact
+
+
+def test_evolve():
+    die = stormvogel.examples.die.create_die_dtmc()
+    compact = to_compact(die)
+    distributions = list(transient.evolve(compact, 3))
+    assert len(distributions) == 4
+    assert distributions[0][compact.initial_state] == 1
+    for distribution in distributions[1:]:
+        assert distribution.sum() == pytest.approx(1)
+        assert distribution[compact.initial_state] == 0
+
+    # the generator can be streamed without a bound
+    stream = transient.evolve(compact)
+    for _ in range(100):
+        next(stream)
+
+    assert transient.step_distribution(die, 2).get_result_of_state(1) == pytest.approx(
+        1 / 6
+    )
+    with pytest.raises(RuntimeError):
+        next(transient.evolve(to_compact(stormvogel.examples.lion.create_lion_mdp())))
+
+
+def test_dtmc_evolution():
+    die = stormvogel.examples.die.create_die_dtmc()
+    result = visual_algos.dtmc_evolution(die, 3)
+    assert result[0] == [1, 0, 0, 0, 0, 0, 0]
+    assert result[1] == pytest.approx([0] + [1 / 6] * 6)
+    assert result[2] == result[1]
+
+
+def test_bounded_reachability():
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    for maximize in [True, False]:
+        previous = transient.bounded_reachability(lion, "dead", 0, maximize)
+        assert previous.get_result_of_state(0) == 0
+        assert previous.get_result_of_state(4) == 1
+        for steps in [1, 2, 5, 20]:
+            result = transient.bounded_reachability(lion, "dead", steps, maximize)
+            for state_id, value in result:
+                assert value >= previous.get_result_of_state(state_id)
+            previous = result
+
+    # satisfied -> hungry -> starving -> dead takes three steps
+    compact = to_compact(lion)
+    x = transient.iterate_bounded_reachability(compact, compact.state_set("dead"), 3)
+    assert x[0] > 0
+    x = transient.iterate_bounded_reachability(compact, compact.state_set("dead"), 2)
+    assert x[0] == 0
+
+    # the probability to reach rolled1 within k steps is 1/6 for every k >= 1
+    die = stormvogel.examples.die.create_die_dtmc()
+    result = transient.bounded_reachability(die, "rolled1", 10)
+    assert result.get_result_of_state(0) == pytest.approx(1 / 6)
+    assert np.isfinite(list(result.values.values())).all()
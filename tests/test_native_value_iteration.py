@@ -0,0 +1,112 @@
+import stormvogel.examples.die
+import stormvogel.examples.lion
+import stormvogel.examples.monty_hall
+import stormvogel.model
+import stormvogel.extensions.visual_algos as visual_algos
+from stormvogel.native.compact import to_compact
+from stormvogel.native.iteration import iterate, value_iteration
+import numpy as np
+import pytest
+
+
+def test_to_compact():
+    dtmc = stormvogel.examples.die.create_die_dtmc()
+    compact = to_compact(dtmc)
+    assert compact.nr_states == 7
+    assert compact.nr_rows == 7
+    assert compact.nr_entries == 12
+    assert compact.initial_state == 0
+    assert list(compact.state_set("rolled3")) == [
+        False,
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert pytest.approx(compact.multiply(np.ones(7))) == np.ones(7)
+
+    mdp = stormvogel.examples.lion.create_lion_mdp()
+    compact = to_compact(mdp)
+    assert compact.nr_states == 5
+    assert compact.nr_rows == 9
+    assert list(compact.row_states()) == [0, 0, 1, 1, 2, 2, 3, 3, 4]
+
+    # states without outgoing choices are not allowed
+    dtmc = stormvogel.model.new_dtmc()
+    dtmc.new_state()
+    with pytest.raises(RuntimeError):
+        to_compact(dtmc)
+
+
+def test_value_iteration_dtmc():
+    dtmc = stormvogel.examples.die.create_die_dtmc()
+    for method in ["jacobi", "gauss_seidel", "block_jacobi"]:
+        result = value_iteration(dtmc, "rolled1", method=method, workers=2)
+        assert result.get_result_of_state(0) == pytest.approx(1 / 6)
+        assert result.get_result_of_state(1) == pytest.approx(1)
+        assert result.get_result_of_state(2) == pytest.approx(0)
+
+
+def test_value_iteration_methods_agree():
+    mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+    compact = to_compact(mdp)
+    target = compact.state_set("target")
+    results = {}
+    for method in ["jacobi", "gauss_seidel", "block_jacobi"]:
+        for maximize in [True, False]:
+            x, iterations = iterate(
+                compact,
+                target.astype(float),
+                target,
+                maximize=maximize,
+                method=method,
+                epsilon=1e-10,
+                nr_blocks=3,
+            )
+            assert iterations > 0
+            results[method, maximize] = x
+    for method in ["gauss_seidel", "block_jacobi"]:
+        for maximize in [True, False]:
+            assert (
+                pytest.approx(results[method, maximize]) == results["jacobi", maximize]
+            )
+    assert results["jacobi", True][compact.initial_state] == pytest.approx(1)
+    assert results["jacobi", False][compact.initial_state] == pytest.approx(0)
+
+    with pytest.raises(RuntimeError):
+        iterate(compact, target.astype(float), target, method="newton")
+
+
+def test_gauss_seidel_chain():
+    # every state moves to the previous state or to a sink, so in state order gauss_seidel
+    # passes the values along the whole chain in one iteration
+    dtmc = stormvogel.model.new_dtmc()
+    states = [dtmc.get_initial_state()] + [dtmc.new_state() for _ in range(50)]
+    sink = dtmc.new_state()
+    for previous, state in zip(states, states[1:]):
+        state.set_choice([(0.5, previous), (0.5, sink)])
+    dtmc.add_self_loops()
+    compact = to_compact(dtmc)
+    target = np.zeros(compact.nr_states, dtype=bool)
+    target[0] = True
+    iterations = {}
+    for method in ["jacobi", "gauss_seidel"]:
+        x, iterations[method] = iterate(
+            compact, target.astype(float), target, method=method, epsilon=1e-10
+        )
+        assert x[10] == pytest.approx(0.5**10)
+    assert iterations["gauss_seidel"] < iterations["jacobi"]
+    assert iterations["gauss_seidel"] == 2
+
+
+def test_naive_value_iteration_gauss_seidel():
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    target = lion.get_states_with_label("full")[0]
+    jacobi = visual_algos.naive_value_iteration(lion, 1e-8, target)
+    gauss_seidel = visual_algos.naive_value_iteration(
+        lion, 1e-8, target, method="gauss_seidel"
+    )
+    assert len(gauss_seidel) <= len(jacobi)
+    assert pytest.approx(gauss_seidel[-1], abs=1e-5) == jacobi[-1]
@@ -0,0 +1,81 @@
+from concurrent.futures import TimeoutError
+
+import pytest
+
+import stormvogel.examples.die
+import stormvogel.examples.monty_hall
+import stormvogel.model
+import stormvogel.parallel
+import stormvogel.stormpy_utils.model_checking
+
+try:
+    import stormpy
+except ImportError:
+    stormpy = None
+
+
+def create_biased_coin(p: float):
+    dtmc = stormvogel.model.new_dtmc()
+    init = dtmc.get_initial_state()
+    init.valuations = {"flipped": False, "heads": False}
+    init.set_choice(
+        [
+            (p, dtmc.new_state("heads", {"flipped": True, "heads": True})),
+            (1 - p, dtmc.new_state("tails", {"flipped": True, "heads": False})),
+        ]
+    )
+    dtmc.add_self_loops()
+    return dtmc
+
+
+def test_check_many():
+    if stormpy is not None:
+        coins = [create_biased_coin(i / 10) for i in range(10)]
+        prop = 'P=? [F "heads"]'
+        results = list(stormvogel.parallel.check_many(coins, prop, workers=2))
+        assert [result.model for result in results] == coins
+        for i, result in enumerate(results):
+            assert result.get_result_of_state(0) == pytest.approx(i / 10)
+            assert result.scheduler is None
+
+        unordered = list(
+            stormvogel.parallel.check_many(coins, prop, workers=2, ordered=False)
+        )
+        assert sorted(result.get_result_of_state(0) for result in unordered) == [
+            result.get_result_of_state(0) for result in results
+        ]
+
+        # models are only taken from a generator when there is room in the window
+        taken = []
+
+        def generate():
+            for i in range(10):
+                taken.append(i)
+                yield create_biased_coin(i / 10)
+
+        for i, result in enumerate(
+            stormvogel.parallel.check_many(generate(), prop, workers=1, window=2)
+        ):
+            assert len(taken) <= i + 3
+            assert result.get_result_of_state(0) == pytest.approx(i / 10)
+        assert len(taken) == 10
+
+        # models with actions get a scheduler for the original model
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        prop = 'Pmax=? [F "done"]'
+        (result,) = stormvogel.parallel.check_many([mdp], prop, workers=1)
+        expected = stormvogel.stormpy_utils.model_checking.model_checking(mdp, prop)
+        assert result.values == pytest.approx(expected.values)
+        assert result.scheduler.model is mdp
+        assert result.scheduler == expected.scheduler
+
+
+def test_check_many_timeout():
+    if stormpy is not None:
+        coins = [create_biased_coin(0.5) for _ in range(4)]
+        with pytest.raises(TimeoutError):
+            list(
+                stormvogel.parallel.check_many(
+                    coins, 'P=? [F "heads"]', workers=1, timeout=0
+                )
+            )
@@ -1,6 +1,14 @@
 import stormvogel.stormpy_utils.convert_results as convert_results
 import pytest
+import random
+import subprocess
+import sys
+import numpy as np
+import stormvogel.examples.die
 import stormvogel.examples.monty_hall
+import stormvogel.model
+import stormvogel.native
+import stormvogel.result
 from typing import cast
 
 try:
@@ -1001,3 +1009,260 @@ def test_random_scheduler():
     sched = stormvogel.result.random_scheduler(lion)
     for i, _ in lion:
         sched.get_choice_of_state(i)
+
+
+def test_result_array():
+    die = stormvogel.examples.die.create_die_dtmc()
+    values = {state_id: state_id / 10 for state_id in die.states}
+    result = stormvogel.result.Result(die, values)
+    array_result = stormvogel.result.Result(die, np.array(list(values.values())))
+
+    assert result == array_result
+    assert array_result.values == values
+    assert result.array.tolist() == list(values.values())
+    for r in [result, array_result]:
+        assert r.maximum_result() == pytest.approx(0.6)
+        assert r.minimum_result() == 0
+        assert r.mean_result() == pytest.approx(0.3)
+        assert r.argmax_result() == 6
+        assert r.argmin_result() == 0
+        assert r.states_above(0.45) == {5, 6}
+        assert r.states_above(0.5, inclusive=True) == {5, 6}
+        assert r.states_below(0.1, inclusive=True) == {0, 1}
+        assert r.states_below(0.1) == {0}
+        assert r[die.get_initial_state()] == 0
+        assert r[3] == pytest.approx(0.3)
+
+    # changing the values resets the statistics
+    result.values = {state_id: 1 - value for state_id, value in values.items()}
+    assert result.maximum_result() == 1
+    assert result.argmax_result() == 0
+    # also in place
+    result.values[3] = 42
+    assert result.maximum_result() == 42 and result.argmax_result() == 3
+    array_result.values[2] = -1
+    assert array_result.minimum_result() == -1 and array_result.array[2] == -1
+    del result.values[3]
+    assert result.argmax_result() == 0 and np.isnan(result.array[3])
+    # the array is read-only
+    with pytest.raises(ValueError):
+        result.array[0] = 5
+
+    # the maximum has the type of the stored values
+    qualitative = stormvogel.result.Result(
+        die, {state_id: state_id == 6 for state_id in die.states}
+    )
+    assert qualitative.maximum_result() is True
+    assert qualitative.minimum_result() is False
+
+    with pytest.raises(RuntimeError):
+        stormvogel.result.Result(die, np.zeros(3))
+    interval_result = stormvogel.result.Result(
+        die, {state_id: stormvogel.model.Interval(0, 1) for state_id in die.states}
+    )
+    with pytest.raises(RuntimeError):
+        interval_result.maximum_result()
+
+
+def test_state_lookups():
+    mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+    actions = [state.available_actions()[0] for state in mdp.states.values()]
+    scheduler = stormvogel.result.Scheduler(mdp, actions)
+    assert scheduler.actions == actions
+    assert scheduler.taken_actions == dict(zip(mdp.states, actions))
+    assert scheduler == stormvogel.result.Scheduler(mdp, dict(zip(mdp.states, actions)))
+    result = stormvogel.result.Result(mdp, np.arange(len(mdp.states)), scheduler)
+
+    state = mdp.get_state_by_id(5)
+    assert scheduler.get_choice_of_state(state) == actions[5]
+    assert scheduler.get_choice_of_state(5, validate=False) == actions[5]
+    assert result.get_result_of_state(state) == 5
+    assert result.get_result_of_state(state, validate=False) == 5
+
+    # states of other models are rejected, unless they are equal to the state of this model
+    other = stormvogel.examples.die.create_die_dtmc()
+    with pytest.raises(RuntimeError):
+        scheduler.get_choice_of_state(other.get_state_by_id(5))
+    with pytest.raises(RuntimeError):
+        result.get_result_of_state(other.get_state_by_id(5))
+    with pytest.raises(RuntimeError):
+        result.get_result_of_state(len(mdp.states))
+    copy = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+    assert result.get_result_of_state(copy.get_state_by_id(5)) == 5
+
+    with pytest.raises(RuntimeError):
+        stormvogel.result.Scheduler(mdp, actions[1:])
+
+
+def test_induced_dtmc_compact():
+    lion = stormvogel.examples.create_lion_mdp()
+    scheduler = stormvogel.result.random_scheduler(lion)
+    chain = scheduler.generate_induced_dtmc(compact=True)
+    dtmc = scheduler.generate_induced_dtmc()
+    assert chain.type == stormvogel.model.ModelType.DTMC
+    assert chain.nr_rows == chain.nr_states == len(lion.states)
+    assert list(dtmc.states) == list(lion.states)
+    for state_id, state in dtmc:
+        original = lion.get_state_by_id(state_id)
+        assert state.labels == original.labels
+        assert state.valuations == original.valuations
+        action = scheduler.get_choice_of_state(state_id)
+        assert dtmc.get_branch(state) == stormvogel.model.Branch(
+            [
+                (value, dtmc.get_state_by_id(target.id))
+                for value, target in lion.choices[state_id].transition[action]
+            ]
+        )
+        assert dtmc.get_default_rewards().get_state_reward(
+            state
+        ) == lion.get_default_rewards().get_state_action_reward(original, action)
+
+    # a randomized scheduler that takes every action with equal probability
+    compact = stormvogel.native.to_compact(lion)
+    counts = np.diff(compact.row_group_starts)
+    weights = np.repeat(1 / counts, counts)
+    mixed = compact.induced_randomized(weights)
+    assert mixed.nr_rows == mixed.nr_states
+    assert np.allclose(mixed.multiply(np.ones(mixed.nr_states)), 1)
+    x = np.arange(compact.nr_states, dtype=np.float64)
+    assert np.allclose(
+        mixed.multiply(x),
+        np.add.reduceat(compact.multiply(x) * weights, compact.row_group_starts[:-1]),
+    )
+    assert np.allclose(
+        mixed.reward_vector(),
+        np.add.reduceat(
+            compact.reward_vector() * weights, compact.row_group_starts[:-1]
+        ),
+    )
+
+
+def test_randomized_scheduler():
+    lion = stormvogel.examples.create_lion_mdp()
+    compact = stormvogel.native.to_compact(lion)
+    counts = np.diff(compact.row_group_starts)
+    scheduler = stormvogel.result.RandomizedScheduler(
+        lion, np.repeat(1 / counts, counts)
+    )
+    state = lion.get_initial_state()
+    actions = state.available_actions()
+    assert scheduler.distribution(state) == {
+        action: 1 / len(actions) for action in actions
+    }
+    assert scheduler.get_support_of_state(state) == actions
+    rng = random.Random(1)
+    assert {scheduler.choose(state, rng=rng) for _ in range(100)} == set(actions)
+
+    # a distribution given per state that puts all mass on one action is deterministic
+    deterministic = stormvogel.result.random_scheduler(lion)
+    pinned = stormvogel.result.RandomizedScheduler(
+        lion, {s: {a: 1} for s, a in deterministic.taken_actions.items()}
+    )
+    assert pinned.most_likely() == deterministic
+    assert pinned.support() == deterministic.support()
+    assert all(pinned.choose(s) == a for s, a in deterministic.taken_actions.items())
+    chain = pinned.generate_induced_dtmc(compact=True)
+    expected = deterministic.generate_induced_dtmc(compact=True)
+    assert np.allclose(
+        chain.multiply(np.arange(chain.nr_states, dtype=np.float64)),
+        expected.multiply(np.arange(chain.nr_states, dtype=np.float64)),
+    )
+
+    with pytest.raises(RuntimeError):
+        stormvogel.result.RandomizedScheduler(lion, np.zeros(compact.nr_rows))
+
+
+def test_finite_memory_scheduler():
+    lion = stormvogel.examples.create_lion_mdp()
+    compact = stormvogel.native.to_compact(lion)
+    n = compact.nr_states
+    counts = np.diff(compact.row_group_starts)
+    # memory 0 takes the first action, memory 1 the last action, and the memory toggles in every step
+    actions = np.stack((np.zeros(n, dtype=np.int64), counts - 1))
+    updates = np.stack((np.ones(n, dtype=np.int64), np.zeros(n, dtype=np.int64)))
+    scheduler = stormvogel.result.FiniteMemoryScheduler(lion, actions, updates)
+
+    state = lion.get_initial_state()
+    assert scheduler.choose(state, 0) == state.available_actions()[0]
+    assert scheduler.choose(state, 1) == state.available_actions()[-1]
+    assert scheduler.next_memory(0, state) == 1
+    assert scheduler.get_support_of_state(state) == state.available_actions()
+
+    # with a single memory state it is the same as a memoryless scheduler
+    memoryless = stormvogel.result.FiniteMemoryScheduler(
+        lion, actions[:1], np.zeros((1, n), dtype=np.int64)
+    )
+    expected = stormvogel.result.Scheduler(
+        lion, [compact.actions[r] for r in compact.row_group_starts[:-1].tolist()]
+    )
+    assert memoryless.support() == expected.support()
+
+    product = scheduler.generate_induced_dtmc(compact=True)
+    assert product.nr_states == 2 * n
+    assert product.initial_state == compact.initial_state
+    assert np.allclose(product.multiply(np.ones(2 * n)), 1)
+    # from memory 0 every transition moves to memory 1 and vice versa
+    entry_states = np.repeat(np.arange(2 * n), np.diff(product.row_starts))
+    assert ((entry_states < n) == (product.columns >= n)).all()
+
+    dtmc = scheduler.generate_induced_dtmc()
+    assert len(dtmc.states) == 2 * n
+    assert dtmc.get_initial_state().valuations["memory"] == 0
+    assert dtmc.get_state_by_id(n).valuations["memory"] == 1
+
+    with pytest.raises(RuntimeError):
+        stormvogel.result.FiniteMemoryScheduler(lion, actions + 5, updates)
+
+
+def test_scheduler_str():
+    lion = stormvogel.examples.create_lion_mdp()
+    compact = stormvogel.native.to_compact(lion)
+    n = compact.nr_states
+    counts = np.diff(compact.row_group_starts)
+    deterministic = stormvogel.result.random_scheduler(lion)
+    randomized = stormvogel.result.RandomizedScheduler(
+        lion, np.repeat(1 / counts, counts)
+    )
+    finite_memory = stormvogel.result.FiniteMemoryScheduler(
+        lion, np.zeros((1, n), dtype=np.int64), np.zeros((1, n), dtype=np.int64)
+    )
+    result = stormvogel.result.Result(lion, np.zeros(n), deterministic)
+    assert "taken actions" in str(deterministic)
+    assert "distributions" in str(randomized)
+    assert "memory states: 1" in str(finite_memory)
+    assert "values" in str(result)
+
+
+def test_result_to_dataframe(tmp_path):
+    lion = stormvogel.examples.create_lion_mdp()
+    scheduler = stormvogel.result.random_scheduler(lion)
+    values = np.arange(len(lion.states), dtype=np.float64)
+    result = stormvogel.result.Result(lion, values, scheduler)
+
+    df = result.to_dataframe(valuations=True, rewards=True)
+    assert list(df["state"]) == list(lion.states)
+    assert np.array_equal(df["value"].to_numpy(), values)
+    reward_model = lion.get_default_rewards()
+    for (state_id, state), row in zip(lion, df.itertuples(index=False)):
+        action = scheduler.get_choice_of_state(state_id)
+        assert row.action == ",".join(sorted(action.labels))
+        assert row.labels == list(state.labels)
+        assert getattr(row, "reward_" + reward_model.name) == (
+            reward_model.get_state_action_reward(state, action)
+        )
+        for variable, value in state.valuations.items():
+            assert getattr(row, "valuation_" + variable) == value
+
+    # valuations do not clash with the other columns
+    lion.get_initial_state().valuations["value"] = -1
+    df = result.to_dataframe(valuations=True)
+    assert df["value"][0] == 0 and df["valuation_value"][0] == -1
+
+    # importing the results does not import pandas
+    code = "import sys, stormvogel.result; assert 'pandas' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    result.to_npz(tmp_path / "result.npz")
+    archive = np.load(tmp_path / "result.npz")
+    assert np.array_equal(archive["value"], values)
+    assert list(archive["state"]) == list(lion.states)
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+
+import stormvogel.examples.lion
+import stormvogel.examples.monty_hall
+import stormvogel.native
+import stormvogel.result
+import stormvogel.result_cache as result_cache
+import stormvogel.stormpy_utils.model_checking
+
+try:
+    import stormpy
+except ImportError:
+    stormpy = None
+
+
+def test_result_cache_native(tmp_path):
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    cache = result_cache.enable(str(tmp_path))
+    try:
+        first = stormvogel.native.expected_rewards(lion, "dead", maximize=False)
+        second = stormvogel.native.expected_rewards(lion, "dead", maximize=False)
+        assert np.array_equal(first.array, second.array)
+        assert first.scheduler == second.scheduler
+        info = cache.info()
+        assert info["hits"] == 1 and info["misses"] == 1 and info["writes"] == 1
+        assert info["entries"] == 1
+
+        # another setting is another entry
+        stormvogel.native.expected_rewards(lion, "dead", maximize=True)
+        assert cache.info()["entries"] == 2
+
+        # but the number of workers does not change the result
+        stormvogel.native.long_run_reward(
+            first.scheduler.generate_induced_dtmc(), workers=1
+        )
+        stormvogel.native.long_run_reward(
+            first.scheduler.generate_induced_dtmc(), workers=2
+        )
+        assert cache.info()["entries"] == 3 and cache.info()["hits"] == 2
+
+        # a fresh cache on the same directory (e.g., after a restart) finds the results
+        other = result_cache.enable(str(tmp_path))
+        third = stormvogel.native.expected_rewards(lion, "dead", maximize=False)
+        assert np.array_equal(first.array, third.array)
+        assert other.info()["hits"] == 1
+    finally:
+        result_cache.disable()
+
+
+def test_result_cache_eviction(tmp_path):
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    cache = result_cache.ResultCache(str(tmp_path))
+    result = stormvogel.native.value_iteration(lion, "full")
+    cache.put(lion, "a", {}, result)
+    size = cache.info()["size"]
+
+    cache.max_size = 2 * size
+    os.utime(os.path.join(cache.directory, cache.key(lion, "a", {}) + ".npz"), (0, 0))
+    cache.put(lion, "b", {}, result)
+    assert cache.get(lion, "  a ", {}) is not None  # whitespace is normalized
+    os.utime(os.path.join(cache.directory, cache.key(lion, "b", {}) + ".npz"), (1, 1))
+    cache.put(lion, "c", {}, result)
+    # b is the least recently used entry
+    assert cache.get(lion, "b", {}) is None
+    assert cache.get(lion, "c", {}) is not None
+    assert cache.info()["evictions"] == 1
+    assert not [name for name in os.listdir(cache.directory) if name.endswith(".tmp")]
+
+    # int values are restored as ints
+    counts = stormvogel.result.Result(lion, {state_id: 2 for state_id in lion.states})
+    cache.put(lion, "d", {}, counts)
+    restored = cache.get(lion, "d", {}).values.values()
+    assert all(isinstance(v, int) and not isinstance(v, bool) for v in restored)
+
+    cache.clear()
+    assert cache.info()["entries"] == 0
+
+
+def test_result_cache_model_checking(tmp_path):
+    if stormpy is not None:
+        mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+        cache = result_cache.enable(str(tmp_path))
+        try:
+            prop = 'Pmax=? [F "done"]'
+            first = stormvogel.stormpy_utils.model_checking.model_checking(mdp, prop)
+            second = stormvogel.stormpy_utils.model_checking.model_checking(mdp, prop)
+            assert first == second
+            assert cache.info()["hits"] == 1
+
+            # qualitative results keep their bool values
+            prop = 'Pmax>=0.5 [F "done"]'
+            first = stormvogel.stormpy_utils.model_checking.model_checking(mdp, prop)
+            second = stormvogel.stormpy_utils.model_checking.model_checking(mdp, prop)
+            assert cache.info()["hits"] == 2
+            assert first.values == second.values
+            assert all(isinstance(value, bool) for value in second.values.values())
+        finally:
+            result_cache.disable()
+
+
+def test_result_cache_versions(tmp_path, monkeypatch):
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    cache = result_cache.ResultCache(str(tmp_path))
+    key = cache.key(lion, "a", {})
+    # results of other versions of stormvogel or of the cache format are not used
+    monkeypatch.setattr(stormvogel, "__version__", "0.0.0")
+    assert cache.key(lion, "a", {}) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(result_cache, "FORMAT_VERSION", 0)
+    assert cache.key(lion, "a", {}) != key
+
+
+def test_result_cache_fingerprint_once(tmp_path, monkeypatch):
+    import stormvogel.stormpy_utils.mapping as mapping
+
+    calls = []
+    fingerprint = mapping.model_fingerprint
+    monkeypatch.setattr(
+        mapping,
+        "model_fingerprint",
+        lambda model: calls.append(1) or fingerprint(model),
+    )
+    lion = stormvogel.examples.lion.create_lion_mdp()
+    result_cache.enable(str(tmp_path))
+    try:
+        # a miss looks up and stores the result with the same fingerprint
+        stormvogel.native.expected_rewards(lion, "dead", maximize=False)
+        assert len(calls) == 1
+        if stormpy is not None:
+            mdp = stormvogel.examples.monty_hall.create_monty_hall_mdp()
+            props = ['Pmax=? [F "done"]', 'Pmin=? [F "done"]', 'Pmax>=0.5 [F "done"]']
+            stormvogel.stormpy_utils.model_checking.model_checking_batch(mdp, props)
+            assert len(calls) == 2
+    finally:
+        result_cache.disable()
@@ -6,6 +6,8 @@ from stormvogel.examples.lion import create_lion_mdp
 from stormvogel.model import EmptyAction
 import stormvogel.model
 import stormvogel.simulator as simulator
+import stormvogel.result
+import numpy as np
 
 
 def test_simulate():
@@ -318,3 +320,37 @@ def test_simulate_path():
     )
 
     assert path == other_path
+
+
+def test_simulate_memory_scheduler():
+    # a scheduler that alternates between the first and the last action of each state
+    lion = create_lion_mdp()
+    n = len(lion.states)
+    counts = np.array([len(s.available_actions()) for s in lion.states.values()])
+    scheduler = stormvogel.result.FiniteMemoryScheduler(
+        lion,
+        np.stack((np.zeros(n, dtype=np.int64), counts - 1)),
+        np.stack((np.ones(n, dtype=np.int64), np.zeros(n, dtype=np.int64))),
+    )
+    path = simulator.simulate_path(lion, steps=10, seed=1, scheduler=scheduler)
+    memory = 0
+    state = lion.get_initial_state()
+    for i in range(1, len(path) + 1):
+        action = path.get_action_in_step(i)
+        assert action == state.available_actions()[-memory]
+        state = path.get_state_in_step(i)
+        memory = 1 - memory
+
+    # a randomized scheduler only takes actions in its support
+    pinned = stormvogel.result.RandomizedScheduler(
+        lion, {s.id: {s.available_actions()[0]: 1} for s in lion.states.values()}
+    )
+    path = simulator.simulate_path(lion, steps=10, seed=1, scheduler=pinned)
+    state = lion.get_initial_state()
+    for i in range(1, len(path) + 1):
+        assert path.get_action_in_step(i) == state.available_actions()[0]
+        state = path.get_state_in_step(i)
+    partial_model = simulator.simulate(
+        lion, steps=10, runs=3, seed=1, scheduler=scheduler
+    )
+    assert partial_model is not None